@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'SaaS.api.middleware.timing.TimingMiddleware',
+    'SaaS.api.middleware.connections.ConnectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,10 +79,16 @@ WSGI_APPLICATION = 'SaaS.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#database
+# persistent connections, recycled by SaaS.api.middleware.connections (0 - connection per request)
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 600))
+
 DATABASES = {
-    'default': dj_database_url.config()
+    'default': dj_database_url.config(conn_max_age=DATABASE_CONN_MAX_AGE)
 }
 
+# idle seconds after which connection is checked before use
+API_DB_HEALTH_CHECK_INTERVAL = 30
+
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
 
@@ -120,7 +128,7 @@ STATIC_URL = '/static/'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'SaaS.api.authentication.token.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -143,3 +151,8 @@ SWAGGER_SETTINGS = {
 }
 
 django_heroku.settings(locals())
+
+# django_heroku configures DATABASE_URL with its own CONN_MAX_AGE
+for database in DATABASES.values():
+    if database:
+        database['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
@@ -0,0 +1,146 @@
+"""
+Token authentication with cache of token -> user
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_CACHE_ALIAS = getattr(settings, 'API_TOKEN_CACHE_ALIAS', None)  # django cache alias, shared between workers
+# seconds, entries of in-process cache are not evicted by logout in other processes, so they expire sooner
+TOKEN_CACHE_TTL = getattr(settings, 'API_TOKEN_CACHE_TTL', 300 if TOKEN_CACHE_ALIAS else 15)
+TOKEN_CACHE_SIZE = getattr(settings, 'API_TOKEN_CACHE_SIZE', 1024)   # entries of in-process cache
+
+
+class TokenCache:
+    """
+    LRU+TTL cache of token key -> (user field values, token creation date)
+
+    Mention: Users are stored as plain field values, so every request gets its own User instance.
+             If shared cache alias is set it is used instead of in-process storage,
+             so eviction is visible to all workers. Without it revoked token is accepted by other processes
+             until its entry expires, so the default ttl is short then.
+    """
+    key_prefix = 'api:token:'
+
+    def __init__(self, ttl: float = TOKEN_CACHE_TTL, max_size: int = TOKEN_CACHE_SIZE, alias: str = TOKEN_CACHE_ALIAS):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def get(self, key: str):
+        if self.shared:
+            entry = self.shared.get(self.key_prefix + key)
+        else:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[2] < time.monotonic():
+                        del self._entries[key]
+                        entry = None
+                    else:
+                        self._entries.move_to_end(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def set(self, key: str, user_values: tuple, created):
+        if self.shared:
+            self.shared.set(self.key_prefix + key, (user_values, created, None), self.ttl)
+            return
+        with self._lock:
+            self._entries[key] = (user_values, created, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, key: str):
+        self.evictions += 1
+        if self.shared:
+            self.shared.delete(self.key_prefix + key)
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def evict_user(self, user_id: int):
+        if self.shared:     # keys of shared cache can not be scanned, tokens are looked up
+            for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+                self.evict(key)
+            return
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[0][0] == user_id]
+            for key in keys:
+                del self._entries[key]
+            self.evictions += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared:
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'ttl': self.ttl,
+            'shared': self.alias is not None,
+        }
+
+
+token_cache = TokenCache()
+
+_user_field_names = [field.attname for field in User._meta.concrete_fields]   # first one is 'id'
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication which does not query database for recently seen tokens
+    """
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, tuple(getattr(user, name) for name in _user_field_names), token.created)
+            return user, token
+
+        user_values, created = entry
+        user = User.from_db('default', _user_field_names, user_values)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return user, Token(key=key, user=user, created=created)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user_tokens(sender, instance, **kwargs):
+    token_cache.evict_user(instance.pk)
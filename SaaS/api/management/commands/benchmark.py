@@ -0,0 +1,91 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...utils.benchmark.dataset import Dataset
+from ...utils.benchmark.routes import get_routes
+from ...utils.benchmark.runner import Runner, compare, is_failed
+from ...utils.benchmark.serializers import benchmark_serializers
+from ...utils.benchmark.contention import benchmark_contention
+
+
+class Command(BaseCommand):
+    help = "Benchmarks every api route against seeded test database (SQLite or PostgreSQL from settings)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help="Scale factor of dataset.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed of dataset random generator.")
+        parser.add_argument('--iterations', type=int, default=20, help="Measured requests per route.")
+        parser.add_argument('--route', default=None, help="Only routes containing this substring.")
+        parser.add_argument('--output', default=None, help="Path of json file results are written to.")
+        parser.add_argument('--baseline', default=None, help="Path of json file results are compared with.")
+        parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed relative latency growth.")
+        parser.add_argument('--serializers', action='store_true',
+                            help="Also compare list serialization by DRF and by compiled serializers.")
+        parser.add_argument('--contention', action='store_true',
+                            help="Also measure concurrent accepts of suggestions of popular themes.")
+        parser.add_argument('--threads', type=int, default=8, help="Worker threads of contention benchmark.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(os.path.abspath(options['baseline']), encoding='utf8') as file:
+                baseline = json.load(file)['routes']
+
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            dataset = Dataset(options['scale'], options['seed']).seed()
+            routes = [route for route in get_routes() if not options['route'] or options['route'] in route.pattern]
+            results = Runner(dataset, routes, options['iterations']).run()
+            serializer_results = benchmark_serializers(options['iterations']) if options['serializers'] else None
+            contention_results = benchmark_contention(themes=5 * options['scale'], students=20,
+                                                      threads=options['threads'], seed=options['seed']) \
+                if options['contention'] else None
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results)
+        if serializer_results:
+            self.report_serializers(serializer_results)
+        if contention_results:
+            self.report_contention(contention_results)
+        if options['output']:
+            with open(os.path.abspath(options['output']), 'w', encoding='utf8') as file:
+                json.dump({'scale': options['scale'], 'vendor': connection.vendor, 'routes': results,
+                           'serializers': serializer_results, 'contention': contention_results}, file, indent=2, sort_keys=True)
+
+        for name, result in results.items():
+            if is_failed(result):
+                self.stderr.write("Failed: {} {}".format(name, " ".join(result['errors'])))
+        regressions = compare(results, baseline, options['tolerance']) if baseline else []
+        for regression in regressions:
+            self.stderr.write("Regression: {}".format(regression))
+        if regressions:
+            raise CommandError("{} regressions.".format(len(regressions)))
+
+    def report(self, results: dict):
+        self.stdout.write("{:<95} {:>8} {:>8} {:>8} {:>7} {}".format("route", "p50 ms", "p90 ms", "p99 ms",
+                                                                     "queries", "status"))
+        for name, result in results.items():
+            self.stdout.write("{:<95} {:>8.2f} {:>8.2f} {:>8.2f} {:>7} {}".format(
+                name, result['p50'], result['p90'], result['p99'], result['queries'],
+                ",".join(str(code) for code in result['statuses'])))
+
+    def report_serializers(self, results: dict):
+        self.stdout.write("{:<50} {:>8} {:>8} {:>11} {:>8}".format("serializer", "entries", "drf ms",
+                                                                   "compiled ms", "speedup"))
+        for name, result in results.items():
+            self.stdout.write("{:<50} {:>8} {:>8.2f} {:>11.2f} {:>7.1f}x".format(
+                name, result['entries'], result['drf'], result['compiled'], result['speedup'] or 0))
+
+    def report_contention(self, result: dict):
+        self.stdout.write("contention: {} requests for {} themes, accepted {}, taken {}, errors {}, "
+                          "{:.2f}s, {:.1f} requests/s".format(result['requests'], result['themes'], result['accepted'],
+                                                             result['taken'], result['errors'], result['seconds'],
+                                                             result['throughput'] or 0))
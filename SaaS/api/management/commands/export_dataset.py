@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.export import EXPORT_CHUNK_SIZE, export_lines, parse_watermark
+
+
+class Command(BaseCommand):
+    help = "Exports themes, works, steps, comments, materials and suggestions as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', default=None, help="Watermark of previous export, only changed rows are exported.")
+        parser.add_argument('--output', default=None, help="Path of file lines are written to (stdout by default).")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_watermark(options['since'])
+            except ValueError as error:
+                raise CommandError(error)
+
+        lines = export_lines(since, chunk_size=options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf8') as file:
+            file.writelines(lines)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ...utils.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds full-text search index of themes and comments (needed after bulk loading)."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write("{} entries indexed.".format(count))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...utils.retention import RETENTION_BATCH_SIZE, REJECTED_RETENTION_DAYS, TOKEN_IDLE_DAYS, RETENTION_TASKS, \
+    run_task
+
+
+class Command(BaseCommand):
+    help = "Deletes rejected suggestions, orphaned progress, expired sessions and idle tokens by small batches (for cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', action='append', default=None,
+                            choices=[task.name for task in RETENTION_TASKS], help="Only this task (repeatable).")
+        parser.add_argument('--rejected-days', type=int, default=REJECTED_RETENTION_DAYS,
+                            help="Rejected suggestions unchanged for longer are deleted.")
+        parser.add_argument('--token-idle-days', type=int, default=TOKEN_IDLE_DAYS,
+                            help="Tokens of users not logged in for longer are deleted.")
+        parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument('--pause', type=float, default=0, help="Seconds between batches.")
+        parser.add_argument('--archive', default=None,
+                            help="Path of NDJSON file deleted suggestions, comments and progress are appended to.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count rows to delete.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("Batch size must be positive.")
+        tasks = [task for task in RETENTION_TASKS if not options['task'] or task.name in options['task']]
+        archive = open(options['archive'], 'a', encoding='utf8') if options['archive'] and not options['dry_run'] else None
+        try:
+            for task in tasks:
+                count = run_task(task, batch_size=options['batch_size'], pause=options['pause'], archive=archive,
+                                 dry_run=options['dry_run'], rejected_days=options['rejected_days'],
+                                 token_idle_days=options['token_idle_days'])
+                self.stdout.write("{}: {} {}.".format(task.name, count, "to delete" if options['dry_run'] else "deleted"))
+        finally:
+            if archive is not None:
+                archive.close()
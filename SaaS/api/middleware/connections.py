@@ -0,0 +1,121 @@
+"""
+Lifetime management of persistent database connections (CONN_MAX_AGE) and per-worker statistics
+
+Mention: Django keeps one connection per alias and thread (per gunicorn worker), this middleware
+         checks health of connections idle for longer than API_DB_HEALTH_CHECK_INTERVAL before the view,
+         and recycles connections after errors or after CONN_MAX_AGE when response is returned.
+         Connections in atomic blocks (test cases, ATOMIC_REQUESTS) are left alone.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+HEALTH_CHECK_INTERVAL = getattr(settings, 'API_DB_HEALTH_CHECK_INTERVAL', 30)     # idle seconds, None disables
+
+
+class ConnectionStatistics:
+    """
+    Counters of this worker process, 'age' is the age of the oldest open connection in seconds
+    """
+    COUNTERS = ('connects', 'requests', 'reused', 'health_checks', 'health_check_failures',
+                'recycled_age', 'recycled_error')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+        self._opened = {}   # id of connection wrapper -> monotonic time of connect
+
+    def increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def opened(self, connection):
+        with self._lock:
+            self._counters['connects'] += 1
+            self._opened[id(connection)] = time.monotonic()
+
+    def closed(self, connection):
+        with self._lock:
+            self._opened.pop(id(connection), None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return dict(self._counters, open=len(self._opened),
+                        age=max((now - opened for opened in self._opened.values()), default=0.0))
+
+    def clear(self):
+        with self._lock:
+            self._counters = dict.fromkeys(self.COUNTERS, 0)
+            self._opened.clear()
+
+
+connection_statistics = ConnectionStatistics()
+
+
+def count_connect(sender, connection, **kwargs):
+    connection_statistics.opened(connection)
+
+
+connection_created.connect(count_connect, weak=False)
+
+
+class ConnectionMiddleware:
+    """
+    Follows TimingMiddleware, health checks use raw cursors, so they are not counted as queries of request
+    """
+    def __init__(self, get_response, health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        self.get_response = get_response
+        self.health_check_interval = health_check_interval
+
+    def __call__(self, request):
+        connection_statistics.increment('requests')
+        for connection in connections.all():
+            self.check(connection)
+        response = self.get_response(request)
+        for connection in connections.all():
+            self.recycle(connection)
+        return response
+
+    def close(self, connection, counter: str):
+        connection.close()
+        connection_statistics.closed(connection)
+        connection_statistics.increment(counter)
+
+    def check(self, connection):
+        """
+        Closes broken idle connection, so the request opens a new one instead of failing
+        """
+        if connection.connection is None:
+            connection_statistics.closed(connection)    # closed by close_old_connections
+            return
+        if connection.in_atomic_block:
+            return
+        connection_statistics.increment('reused')
+        idle = time.monotonic() - getattr(connection, 'api_last_used', 0)
+        if self.health_check_interval is None or idle < self.health_check_interval:
+            return
+        connection_statistics.increment('health_checks')
+        if not connection.is_usable():
+            self.close(connection, 'health_check_failures')
+
+    def recycle(self, connection):
+        """
+        As close_if_unusable_or_obsolete (called again on request_finished), but counted
+        """
+        if connection.connection is None or connection.in_atomic_block:
+            return
+        if connection.errors_occurred:
+            if connection.is_usable():
+                connection.errors_occurred = False
+            else:
+                self.close(connection, 'recycled_error')
+                return
+        if connection.close_at is not None and time.monotonic() >= connection.close_at:
+            self.close(connection, 'recycled_age')
+            return
+        connection.api_last_used = time.monotonic()
@@ -0,0 +1,145 @@
+"""
+Per-request SQL and timing instrumentation (works with DEBUG off)
+
+Mention: Queries are timed by database execute wrapper, so connection.queries is not needed.
+         Timings are reported in Server-Timing header, the slowest requests are kept with their SQL
+         (served to staff by metrics/requests).
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+SLOW_REQUESTS_SIZE = getattr(settings, 'API_SLOW_REQUESTS_SIZE', 20)         # kept slowest requests
+TIMING_SQL_LIMIT = getattr(settings, 'API_TIMING_SQL_LIMIT', 100)            # kept statements per request
+
+
+class RequestTiming:
+    """
+    Query count, SQL time, view time and render time of single request
+    """
+    def __init__(self, sql_limit: int = TIMING_SQL_LIMIT):
+        self.sql_limit = sql_limit
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.render_started = None
+        self.finished = None
+        self.queries = 0
+        self.db = 0.0
+        self.sql = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db += duration
+            if len(self.sql) < self.sql_limit:
+                self.sql.append((sql, duration))
+
+    @property
+    def total(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def serialize(self) -> float:
+        """
+        Time of view without SQL (serialization for api views)
+        """
+        if self.view_started is None:
+            return 0.0
+        view = (self.render_started or self.finished or time.perf_counter()) - self.view_started
+        return max(view - self.db, 0.0)
+
+    @property
+    def render(self) -> float:
+        if self.render_started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.render_started
+
+    def server_timing(self) -> str:
+        return 'db;dur={:.2f};desc="{} queries", serialize;dur={:.2f}, render;dur={:.2f}, total;dur={:.2f}'.format(
+            self.db * 1000, self.queries, self.serialize * 1000, self.render * 1000, self.total * 1000)
+
+
+class SlowRequestLog:
+    """
+    Bounded min-heap of the slowest requests
+    """
+    def __init__(self, size: int = SLOW_REQUESTS_SIZE):
+        self.size = size
+        self._heap = []
+        self._counter = itertools.count()   # breaks ties of equal durations
+        self._lock = threading.Lock()
+
+    def add(self, request, response, timing: RequestTiming):
+        total = timing.total
+        heap = self._heap
+        if self.size <= 0 or (len(heap) >= self.size and total <= heap[0][0]):
+            return  # fast path, nothing is built for usual requests
+        entry = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total': total,
+            'db': timing.db,
+            'serialize': timing.serialize,
+            'render': timing.render,
+            'queries': timing.queries,
+            'sql': timing.sql,
+        }
+        with self._lock:
+            item = (total, next(self._counter), entry)
+            if len(heap) < self.size:
+                heapq.heappush(heap, item)
+            elif total > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+    def snapshot(self) -> list:
+        """
+        Slowest requests first
+        """
+        with self._lock:
+            return [entry for total, i, entry in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+
+slow_requests = SlowRequestLog()
+
+
+class TimingMiddleware:
+    """
+    Must be the first middleware, so total time covers the others
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        request.timing = timing
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = self.get_response(request)
+        timing.finished = time.perf_counter()
+
+        response['Server-Timing'] = timing.server_timing()
+        slow_requests.add(request, response, timing)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        request.timing.render_started = time.perf_counter()     # response is rendered right after
+        return response
@@ -0,0 +1,100 @@
+# Generated by Django 2.1.3 on 2026-10-18 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# work triggers of mylog/db/sql/DDL_function_trigger.sql maintain the versioned columns of rows they write
+# (the installed functions would insert works without date_update/version after the columns are added)
+WORK_TRIGGER_FUNCTIONS = '''
+CREATE OR REPLACE FUNCTION create_theme_based_work() RETURNS trigger AS $BODY$
+BEGIN
+    INSERT INTO "Work"(date_start, theme_id{work_columns})
+    VALUES (now() AT TIME ZONE 'Europe/Moscow', NEW.id{work_values});
+    RETURN NEW;
+END;
+$BODY$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_theme_date_acceptance_based_work() RETURNS trigger AS $BODY$
+BEGIN
+    UPDATE "Theme" SET date_acceptance = now() AT TIME ZONE 'Europe/Moscow'{theme_updates}
+    WHERE id = NEW.theme_id;
+    RETURN NEW;
+END;
+$BODY$ LANGUAGE plpgsql;
+'''
+
+
+def replace_work_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(WORK_TRIGGER_FUNCTIONS.format(
+        work_columns=', date_update, version', work_values=', now(), 1',
+        theme_updates=', date_update = now(), version = version + 1'))
+
+
+def restore_work_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(WORK_TRIGGER_FUNCTIONS.format(work_columns='', work_values='', theme_updates=''))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestiontheme',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='suggestiontheme',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='theme',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='theme',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='work',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='work',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='workstep',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='workstep',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='suggestiontheme',
+            name='progress',
+            field=models.ForeignKey(db_column='progress_id', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suggestion', to='api.SuggestionThemeProgress'),
+        ),
+        migrations.AlterField(
+            model_name='theme',
+            name='subject',
+            field=models.ForeignKey(db_column='subject_id', on_delete=django.db.models.deletion.CASCADE, to='api.Subject'),
+        ),
+        migrations.RunPython(replace_work_triggers, restore_work_triggers),
+    ]
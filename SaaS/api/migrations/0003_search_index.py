@@ -0,0 +1,61 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    'CREATE TABLE "Search_index" ('
+    ' kind varchar(30) NOT NULL,'
+    ' object_id integer NOT NULL,'
+    ' title text NOT NULL,'
+    ' body text NOT NULL,'
+    ' document tsvector NOT NULL,'
+    ' PRIMARY KEY (kind, object_id))',
+    'CREATE INDEX "Search_index_document_gin" ON "Search_index" USING GIN (document)',
+]
+POSTGRESQL_DOCUMENT = "setweight(to_tsvector('russian', {0}) || to_tsvector('english', {0}), 'A') || " \
+                      "setweight(to_tsvector('russian', {1}) || to_tsvector('english', {1}), 'B')"
+
+SQLITE_FORWARD = [
+    'CREATE VIRTUAL TABLE "Search_index" USING fts5('
+    'kind UNINDEXED, object_id UNINDEXED, title, body, tokenize = \'porter unicode61\')',
+]
+
+# kind, source table, title expression, body expression
+SOURCES = [
+    ('theme', '"Theme"', 'title', 'description'),
+    ('work_step_comment', '"Work_step_comment"', "''", 'content'),
+    ('suggestion_theme_comment', '"Suggestion_theme_comment"', "''", 'content'),
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = list(POSTGRESQL_FORWARD)
+        for kind, table, title, body in SOURCES:
+            statements.append('INSERT INTO "Search_index" (kind, object_id, title, body, document) '
+                              "SELECT '{}', id, {}, {}, {} FROM {}"
+                              .format(kind, title, body, POSTGRESQL_DOCUMENT.format(title, body), table))
+    elif vendor == 'sqlite':
+        statements = list(SQLITE_FORWARD)
+        for kind, table, title, body in SOURCES:
+            statements.append('INSERT INTO "Search_index" (kind, object_id, title, body) '
+                              "SELECT '{}', id, {}, {} FROM {}".format(kind, title, body, table))
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute('DROP TABLE IF EXISTS "Search_index"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_versioned'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
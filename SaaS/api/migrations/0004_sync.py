@@ -0,0 +1,200 @@
+# Generated by Django 2.1.3 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+# kind, table, owner column expression of deleted row (column is curator_id or student_id), direct owner
+SYNCED = [
+    ('themes', '"Theme"', 'OLD.{column}', True),
+    ('works', '"Work"', '(SELECT t.{column} FROM "Theme" t WHERE t.id = OLD.theme_id)', False),
+    ('steps', '"Work_step"', '(SELECT t.{column} FROM "Work" w JOIN "Theme" t ON t.id = w.theme_id '
+                             'WHERE w.id = OLD.work_id)', False),
+    ('materials', '"Work_step_material"', '(SELECT t.{column} FROM "Work_step" s JOIN "Work" w ON w.id = s.work_id '
+                                          'JOIN "Theme" t ON t.id = w.theme_id WHERE s.id = OLD.step_id)', False),
+    ('comments', '"Work_step_comment"', '(SELECT t.{column} FROM "Work_step" s JOIN "Work" w ON w.id = s.work_id '
+                                        'JOIN "Theme" t ON t.id = w.theme_id WHERE s.id = OLD.work_step_id)', False),
+    ('suggestions', '"Suggestion_theme"', 'OLD.{column}', True),
+    ('suggestion_comments', '"Suggestion_theme_comment"',
+     '(SELECT g.{column} FROM "Suggestion_theme" g WHERE g.id = OLD.suggestion_id)', False),
+]
+# entry left owner, 'distinct' is null-safe inequality of vendor
+OWNER_CHANGED = 'OLD.curator_id {distinct} NEW.curator_id OR OLD.student_id {distinct} NEW.student_id'
+LEFT_OWNER = 'CASE WHEN OLD.{column} {distinct} NEW.{column} THEN OLD.{column} END'
+# progress is represented in suggestions
+PROGRESS_UPDATED = 'UPDATE "Suggestion_theme" SET sequence = sequence WHERE progress_id = NEW.id'
+
+
+def get_tombstone_insert(kind: str, curator_id: str, student_id: str, sequence: str) -> str:
+    return 'INSERT INTO "Tombstone" (kind, object_id, curator_id, student_id, sequence) ' \
+           "VALUES ('{}', OLD.id, {}, {}, {})".format(kind, curator_id, student_id, sequence)
+
+
+def get_postgresql_forward() -> list:
+    next_value = 'nextval(\'"Change_sequence"\')'
+    distinct = 'IS DISTINCT FROM'
+    statements = [
+        'CREATE SEQUENCE "Change_sequence"',
+        'CREATE FUNCTION sync_sequence() RETURNS trigger AS $$ '
+        'BEGIN NEW.sequence := {}; RETURN NEW; END $$ LANGUAGE plpgsql'.format(next_value),
+        'CREATE FUNCTION sync_progress() RETURNS trigger AS $$ '
+        'BEGIN {}; RETURN NEW; END $$ LANGUAGE plpgsql'.format(PROGRESS_UPDATED),
+        'CREATE TRIGGER "Suggestion_theme_progress_sync" AFTER UPDATE ON "Suggestion_theme_progress" '
+        'FOR EACH ROW EXECUTE PROCEDURE sync_progress()',
+    ]
+    for kind, table, owner, direct in SYNCED:
+        name = table.strip('"')
+        statements += [
+            'CREATE TRIGGER "{}_sync" BEFORE INSERT OR UPDATE ON {} '
+            'FOR EACH ROW EXECUTE PROCEDURE sync_sequence()'.format(name, table),
+            'CREATE FUNCTION "{}_tombstone"() RETURNS trigger AS $$ BEGIN {}; RETURN OLD; END $$ LANGUAGE plpgsql'
+            .format(name, get_tombstone_insert(kind, owner.format(column='curator_id'),
+                                               owner.format(column='student_id'), next_value)),
+            'CREATE TRIGGER "{0}_tombstone" AFTER DELETE ON {1} '
+            'FOR EACH ROW EXECUTE PROCEDURE "{0}_tombstone"()'.format(name, table),
+        ]
+        if direct:
+            statements += [
+                'CREATE FUNCTION "{}_owner"() RETURNS trigger AS $$ BEGIN IF {} THEN {}; END IF; RETURN NEW; END $$ '
+                'LANGUAGE plpgsql'.format(name, OWNER_CHANGED.format(distinct=distinct), get_tombstone_insert(
+                    kind, LEFT_OWNER.format(column='curator_id', distinct=distinct),
+                    LEFT_OWNER.format(column='student_id', distinct=distinct), next_value)),
+                'CREATE TRIGGER "{0}_owner" AFTER UPDATE ON {1} '
+                'FOR EACH ROW EXECUTE PROCEDURE "{0}_owner"()'.format(name, table),
+            ]
+    return statements
+
+
+def get_sqlite_forward() -> list:
+    """
+    Sequence is a single row table, rows are numbered after insert/update (triggers are not recursive)
+    """
+    increment = 'UPDATE "Change_sequence" SET value = value + 1'
+    value = '(SELECT value FROM "Change_sequence")'
+    distinct = 'IS NOT'
+    statements = [
+        'CREATE TABLE "Change_sequence" (value integer NOT NULL)',
+        'INSERT INTO "Change_sequence" (value) VALUES (0)',
+        'CREATE TRIGGER "Suggestion_theme_progress_sync" AFTER UPDATE ON "Suggestion_theme_progress" '
+        'BEGIN {}; END'.format(PROGRESS_UPDATED),
+    ]
+    for kind, table, owner, direct in SYNCED:
+        name = table.strip('"')
+        for event in ('INSERT', 'UPDATE'):
+            statements.append('CREATE TRIGGER "{}_sync_{}" AFTER {} ON {} BEGIN {}; '
+                              'UPDATE {} SET sequence = {} WHERE id = NEW.id; END'
+                              .format(name, event.lower(), event, table, increment, table, value))
+        statements.append('CREATE TRIGGER "{}_tombstone" AFTER DELETE ON {} BEGIN {}; {}; END'.format(
+            name, table, increment, get_tombstone_insert(kind, owner.format(column='curator_id'),
+                                                         owner.format(column='student_id'), value)))
+        if direct:
+            statements.append('CREATE TRIGGER "{}_owner" AFTER UPDATE OF curator_id, student_id ON {} WHEN {} '
+                              'BEGIN {}; {}; END'.format(
+                                  name, table, OWNER_CHANGED.format(distinct=distinct), increment,
+                                  get_tombstone_insert(kind, LEFT_OWNER.format(column='curator_id', distinct=distinct),
+                                                       LEFT_OWNER.format(column='student_id', distinct=distinct),
+                                                       value)))
+    return statements
+
+
+def create_sync_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = get_postgresql_forward()
+    elif vendor == 'sqlite':
+        statements = get_sqlite_forward()
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_sync_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    statements = ['DROP TRIGGER IF EXISTS "Suggestion_theme_progress_sync"{}'.format(
+        ' ON "Suggestion_theme_progress"' if vendor == 'postgresql' else '')]
+    for kind, table, owner, direct in SYNCED:
+        name = table.strip('"')
+        triggers = ['_tombstone'] + (['_owner'] if direct else [])
+        triggers += ['_sync'] if vendor == 'postgresql' else ['_sync_insert', '_sync_update']
+        for trigger in triggers:
+            statements.append('DROP TRIGGER IF EXISTS "{}{}"{}'.format(
+                name, trigger, ' ON ' + table if vendor == 'postgresql' else ''))
+        if vendor == 'postgresql':
+            statements.append('DROP FUNCTION IF EXISTS "{}_tombstone"()'.format(name))
+            statements.append('DROP FUNCTION IF EXISTS "{}_owner"()'.format(name))
+    if vendor == 'postgresql':
+        statements += ['DROP FUNCTION IF EXISTS sync_sequence()', 'DROP FUNCTION IF EXISTS sync_progress()',
+                       'DROP SEQUENCE IF EXISTS "Change_sequence"']
+    else:
+        statements.append('DROP TABLE IF EXISTS "Change_sequence"')
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=30)),
+                ('object_id', models.IntegerField()),
+                ('curator_id', models.IntegerField(null=True)),
+                ('student_id', models.IntegerField(null=True)),
+                ('sequence', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'Tombstone',
+            },
+        ),
+        migrations.AddField(
+            model_name='suggestiontheme',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='suggestionthemecomment',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='theme',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='work',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workstep',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workstepcomment',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workstepmaterial',
+            name='sequence',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['curator_id', 'sequence'], name='Tombstone_curator_sequence'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['student_id', 'sequence'], name='Tombstone_student_sequence'),
+        ),
+        migrations.RunPython(create_sync_triggers, drop_sync_triggers),
+    ]
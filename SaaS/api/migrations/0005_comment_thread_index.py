@@ -0,0 +1,21 @@
+# Generated by Django 2.1.3 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='suggestionthemecomment',
+            index=models.Index(fields=['suggestion', 'date_creation', 'id'], name='Suggestion_comment_thread'),
+        ),
+        migrations.AddIndex(
+            model_name='workstepcomment',
+            index=models.Index(fields=['step', 'date_creation', 'id'], name='Work_step_comment_thread'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.1.3 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_comment_thread_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='suggestiontheme',
+            index=models.Index(fields=['curator', 'date_creation', 'id'], name='Suggestion_curator_creation'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontheme',
+            index=models.Index(fields=['student', 'date_creation', 'id'], name='Suggestion_student_creation'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontheme',
+            index=models.Index(fields=['theme', 'curator', 'student'], name='Suggestion_theme_owner'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontheme',
+            index=models.Index(fields=['status', 'date_update'], name='Suggestion_status_update'),
+        ),
+        migrations.AddIndex(
+            model_name='theme',
+            index=models.Index(fields=['curator', 'date_creation', 'id'], name='Theme_curator_creation'),
+        ),
+        migrations.AddIndex(
+            model_name='theme',
+            index=models.Index(fields=['student', 'date_creation', 'id'], name='Theme_student_creation'),
+        ),
+        migrations.AddIndex(
+            model_name='workstep',
+            index=models.Index(fields=['work', 'id'], name='Work_step_work_order'),
+        ),
+        migrations.AddIndex(
+            model_name='workstepmaterial',
+            index=models.Index(fields=['step', 'id'], name='Work_step_material_step_order'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 2.1.3 on 2026-10-18 14:02
+
+from django.db import migrations
+
+# kind, table and join of entries nested in theme "t" (NEW.id) by alias "e"
+NESTED = [
+    ('works', '"Work"', '"Work" e JOIN "Theme" t ON t.id = e.theme_id'),
+    ('steps', '"Work_step"', '"Work_step" e JOIN "Work" w ON w.id = e.work_id JOIN "Theme" t ON t.id = w.theme_id'),
+    ('materials', '"Work_step_material"', '"Work_step_material" e JOIN "Work_step" s ON s.id = e.step_id '
+                                          'JOIN "Work" w ON w.id = s.work_id JOIN "Theme" t ON t.id = w.theme_id'),
+    ('comments', '"Work_step_comment"', '"Work_step_comment" e JOIN "Work_step" s ON s.id = e.work_step_id '
+                                        'JOIN "Work" w ON w.id = s.work_id JOIN "Theme" t ON t.id = w.theme_id'),
+]
+OWNER_CHANGED = 'OLD.curator_id {distinct} NEW.curator_id OR OLD.student_id {distinct} NEW.student_id'
+LEFT_OWNER = 'CASE WHEN OLD.{column} {distinct} NEW.{column} THEN OLD.{column} END'
+# some owner left theme (not only a new student assigned)
+OWNER_LEFT = '(OLD.curator_id IS NOT NULL AND OLD.curator_id {distinct} NEW.curator_id) ' \
+             'OR (OLD.student_id IS NOT NULL AND OLD.student_id {distinct} NEW.student_id)'
+
+
+def get_cascade(distinct: str, sequence: str) -> list:
+    """
+    Tombstones of nested entries for owner that left theme, nested entries are renumbered for the new owner
+    """
+    statements = []
+    for kind, table, join in NESTED:
+        statements.append(
+            'INSERT INTO "Tombstone" (kind, object_id, curator_id, student_id, sequence) '
+            "SELECT '{}', e.id, {}, {}, {} FROM {} WHERE t.id = NEW.id AND ({})".format(
+                kind, LEFT_OWNER.format(column='curator_id', distinct=distinct),
+                LEFT_OWNER.format(column='student_id', distinct=distinct), sequence, join,
+                OWNER_LEFT.format(distinct=distinct)))
+        statements.append('UPDATE {0} SET sequence = sequence WHERE id IN (SELECT e.id FROM {1} WHERE t.id = NEW.id)'
+                          .format(table, join))
+    return statements
+
+
+def create_owner_cascade(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        distinct = 'IS DISTINCT FROM'
+        statements = [
+            'CREATE FUNCTION "Theme_owner_cascade"() RETURNS trigger AS $$ BEGIN IF {} THEN {}; END IF; '
+            'RETURN NEW; END $$ LANGUAGE plpgsql'.format(
+                OWNER_CHANGED.format(distinct=distinct),
+                '; '.join(get_cascade(distinct, 'nextval(\'"Change_sequence"\')'))),
+            'CREATE TRIGGER "Theme_owner_cascade" AFTER UPDATE OF curator_id, student_id ON "Theme" '
+            'FOR EACH ROW EXECUTE PROCEDURE "Theme_owner_cascade"()',
+        ]
+    elif vendor == 'sqlite':
+        distinct = 'IS NOT'
+        statements = [
+            'CREATE TRIGGER "Theme_owner_cascade" AFTER UPDATE OF curator_id, student_id ON "Theme" WHEN {} '
+            'BEGIN UPDATE "Change_sequence" SET value = value + 1; {}; END'.format(
+                OWNER_CHANGED.format(distinct=distinct),
+                '; '.join(get_cascade(distinct, '(SELECT value FROM "Change_sequence")'))),
+        ]
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_owner_cascade(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS "Theme_owner_cascade" ON "Theme"')
+        schema_editor.execute('DROP FUNCTION IF EXISTS "Theme_owner_cascade"()')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TRIGGER IF EXISTS "Theme_owner_cascade"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_ownership_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_owner_cascade, drop_owner_cascade),
+    ]
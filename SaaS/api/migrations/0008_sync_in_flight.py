@@ -0,0 +1,46 @@
+# Generated by Django 2.1.3 on 2026-10-18 14:31
+
+from django.db import migrations
+
+SYNCED_TABLES = ['"Theme"', '"Work"', '"Work_step"', '"Work_step_material"', '"Work_step_comment"',
+                 '"Suggestion_theme"', '"Suggestion_theme_comment"']
+
+# the first statement of transaction writing synced rows holds shared advisory lock keyed by the last
+# allocated sequence number until commit, every number of transaction is greater (see models.sync.get_sequence)
+IN_FLIGHT = 'CREATE FUNCTION sync_in_flight() RETURNS trigger AS $$ BEGIN ' \
+            "IF COALESCE(current_setting('sync.in_flight', true), '') = '' THEN " \
+            'PERFORM pg_advisory_xact_lock_shared(last_value) FROM "Change_sequence"; ' \
+            "PERFORM set_config('sync.in_flight', 'on', true); " \
+            'END IF; RETURN NULL; END $$ LANGUAGE plpgsql'
+
+
+def create_in_flight_triggers(apps, schema_editor):
+    """
+    Statement triggers fire before row triggers and tombstone inserts allocate sequence numbers
+    (SQLite holds the write lock from allocation to commit, numbers are committed in order there)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(IN_FLIGHT)
+    for table in SYNCED_TABLES:
+        schema_editor.execute('CREATE TRIGGER "{}_in_flight" BEFORE INSERT OR UPDATE OR DELETE ON {} '
+                              'FOR EACH STATEMENT EXECUTE PROCEDURE sync_in_flight()'.format(table.strip('"'), table))
+
+
+def drop_in_flight_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SYNCED_TABLES:
+        schema_editor.execute('DROP TRIGGER IF EXISTS "{}_in_flight" ON {}'.format(table.strip('"'), table))
+    schema_editor.execute('DROP FUNCTION IF EXISTS sync_in_flight()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_sync_theme_owner'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_in_flight_triggers, drop_in_flight_triggers),
+    ]
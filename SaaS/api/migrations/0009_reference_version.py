@@ -0,0 +1,66 @@
+# Generated by Django 2.1.3 on 2026-10-18 12:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# unversioned tables nested in representations of themes, works, steps and suggestions
+NESTED_TABLES = ['"Curator"', '"Student"', '"Group"', '"Subject"', '"Skill"', '"Suggestion_theme_status"',
+                 '"Work_step_status"']
+
+
+def create_reference_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = ['CREATE FUNCTION reference_version() RETURNS trigger AS $$ BEGIN '
+                      'UPDATE "Reference_version" SET value = value + 1, date_update = now(); '
+                      'RETURN NULL; END $$ LANGUAGE plpgsql']
+        for table in NESTED_TABLES:
+            statements.append('CREATE TRIGGER "{}_reference_version" AFTER UPDATE OR DELETE ON {} '
+                              'FOR EACH STATEMENT EXECUTE PROCEDURE reference_version()'.format(table.strip('"'), table))
+    elif vendor == 'sqlite':
+        statements = []
+        for table in NESTED_TABLES:
+            for event in ('UPDATE', 'DELETE'):
+                statements.append('CREATE TRIGGER "{}_reference_version_{}" AFTER {} ON {} BEGIN '
+                                  'UPDATE "Reference_version" SET value = value + 1, '
+                                  "date_update = strftime('%Y-%m-%d %H:%M:%f', 'now'); END"
+                                  .format(table.strip('"'), event.lower(), event, table))
+    else:
+        return
+    apps.get_model('api', 'ReferenceVersion').objects.create()
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_reference_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in NESTED_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute('DROP TRIGGER IF EXISTS "{}_reference_version" ON {}'.format(table.strip('"'), table))
+        elif vendor == 'sqlite':
+            for event in ('update', 'delete'):
+                schema_editor.execute('DROP TRIGGER IF EXISTS "{}_reference_version_{}"'.format(table.strip('"'), event))
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP FUNCTION IF EXISTS reference_version()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_sync_in_flight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceVersion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('date_update', models.DateTimeField(default=django.utils.timezone.localtime)),
+            ],
+            options={
+                'db_table': 'Reference_version',
+            },
+        ),
+        migrations.RunPython(create_reference_triggers, drop_reference_triggers),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.1.3 on 2026-10-18 15:20
+
+from django.db import migrations
+
+# kind, kind code (SQLite rowid = id * 4 + code), source table, title expression, body expression
+SOURCES = [
+    ('theme', 1, '"Theme"', 'title', 'description'),
+    ('work_step_comment', 2, '"Work_step_comment"', "''", 'content'),
+    ('suggestion_theme_comment', 3, '"Suggestion_theme_comment"', "''", 'content'),
+]
+
+
+def create_delete_triggers(apps, schema_editor):
+    """
+    Index entries are removed with their rows (also by cascades and queryset deletes),
+    SQLite entries are renumbered by kind and id, FTS5 tables are searched only by rowid
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = ['CREATE FUNCTION search_index_delete() RETURNS trigger AS $$ BEGIN '
+                      'DELETE FROM "Search_index" WHERE kind = TG_ARGV[0] AND object_id = OLD.id; '
+                      'RETURN NULL; END $$ LANGUAGE plpgsql']
+        for kind, code, table, title, body in SOURCES:
+            statements.append('CREATE TRIGGER "{}_search_delete" AFTER DELETE ON {} '
+                              "FOR EACH ROW EXECUTE PROCEDURE search_index_delete('{}')".format(table.strip('"'), table, kind))
+    elif vendor == 'sqlite':
+        statements = ['DELETE FROM "Search_index"']
+        for kind, code, table, title, body in SOURCES:
+            statements.append('INSERT INTO "Search_index" (rowid, kind, object_id, title, body) '
+                              "SELECT id * 4 + {}, '{}', id, {}, {} FROM {}".format(code, kind, title, body, table))
+            statements.append('CREATE TRIGGER "{}_search_delete" AFTER DELETE ON {} BEGIN '
+                              'DELETE FROM "Search_index" WHERE rowid = OLD.id * 4 + {}; END'
+                              .format(table.strip('"'), table, code))
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_delete_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for kind, code, table, title, body in SOURCES:
+        if vendor == 'postgresql':
+            schema_editor.execute('DROP TRIGGER IF EXISTS "{}_search_delete" ON {}'.format(table.strip('"'), table))
+        elif vendor == 'sqlite':
+            schema_editor.execute('DROP TRIGGER IF EXISTS "{}_search_delete"'.format(table.strip('"')))
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP FUNCTION IF EXISTS search_index_delete()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_reference_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_delete_triggers, drop_delete_triggers),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 2.1.3 on 2026-10-18 15:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# unversioned tables nested in representations of themes, works, steps and suggestions (as in 0009_reference_version)
+NESTED_TABLES = ['"Curator"', '"Student"', '"Group"', '"Subject"', '"Skill"', '"Suggestion_theme_status"',
+                 '"Work_step_status"']
+# theme that lost a skill (also by cascade of skill deletion) is renumbered
+SKILL_REMOVED = 'UPDATE "Theme" SET sequence = sequence WHERE id = OLD.theme_id'
+
+
+def drop_reference_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in NESTED_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute('DROP TRIGGER IF EXISTS "{}_reference_version" ON {}'.format(table.strip('"'), table))
+        elif vendor == 'sqlite':
+            for event in ('update', 'delete'):
+                schema_editor.execute('DROP TRIGGER IF EXISTS "{}_reference_version_{}"'.format(table.strip('"'), event))
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP FUNCTION IF EXISTS reference_version()')
+
+
+def create_reference_triggers(apps, schema_editor):
+    """
+    Row of reference version is recreated empty, as before 0009_reference_version was applied
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = ['CREATE FUNCTION reference_version() RETURNS trigger AS $$ BEGIN '
+                      'UPDATE "Reference_version" SET value = value + 1, date_update = now(); '
+                      'RETURN NULL; END $$ LANGUAGE plpgsql']
+        for table in NESTED_TABLES:
+            statements.append('CREATE TRIGGER "{}_reference_version" AFTER UPDATE OR DELETE ON {} '
+                              'FOR EACH STATEMENT EXECUTE PROCEDURE reference_version()'.format(table.strip('"'), table))
+    elif vendor == 'sqlite':
+        statements = []
+        for table in NESTED_TABLES:
+            for event in ('UPDATE', 'DELETE'):
+                statements.append('CREATE TRIGGER "{}_reference_version_{}" AFTER {} ON {} BEGIN '
+                                  'UPDATE "Reference_version" SET value = value + 1, '
+                                  "date_update = strftime('%Y-%m-%d %H:%M:%f', 'now'); END"
+                                  .format(table.strip('"'), event.lower(), event, table))
+    else:
+        return
+    apps.get_model('api', 'ReferenceVersion').objects.create()
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_date_triggers(apps, schema_editor):
+    """
+    Nested rows are dated by row triggers, so no write waits for a lock of a shared row
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = [
+            'CREATE FUNCTION nested_date_update() RETURNS trigger AS $$ '
+            'BEGIN NEW.date_update := now(); RETURN NEW; END $$ LANGUAGE plpgsql',
+            'CREATE FUNCTION theme_skill_removed() RETURNS trigger AS $$ '
+            'BEGIN {}; RETURN NULL; END $$ LANGUAGE plpgsql'.format(SKILL_REMOVED),
+            'CREATE TRIGGER "Theme_skills_removed" AFTER DELETE ON "Theme_skills" '
+            'FOR EACH ROW EXECUTE PROCEDURE theme_skill_removed()',
+        ]
+        for table in NESTED_TABLES:
+            statements.append('CREATE TRIGGER "{}_date_update" BEFORE UPDATE ON {} '
+                              'FOR EACH ROW EXECUTE PROCEDURE nested_date_update()'.format(table.strip('"'), table))
+    elif vendor == 'sqlite':
+        statements = ['CREATE TRIGGER "Theme_skills_removed" AFTER DELETE ON "Theme_skills" '
+                      'BEGIN {}; END'.format(SKILL_REMOVED)]
+        for table in NESTED_TABLES:
+            statements.append('CREATE TRIGGER "{}_date_update" AFTER UPDATE ON {} BEGIN '
+                              "UPDATE {} SET date_update = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id; END"
+                              .format(table.strip('"'), table, table))
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_date_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    on = (lambda table: ' ON ' + table) if vendor == 'postgresql' else (lambda table: '')
+    schema_editor.execute('DROP TRIGGER IF EXISTS "Theme_skills_removed"{}'.format(on('"Theme_skills"')))
+    for table in NESTED_TABLES:
+        schema_editor.execute('DROP TRIGGER IF EXISTS "{}_date_update"{}'.format(table.strip('"'), on(table)))
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP FUNCTION IF EXISTS nested_date_update()')
+        schema_editor.execute('DROP FUNCTION IF EXISTS theme_skill_removed()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_search_index_delete'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_reference_triggers, create_reference_triggers),
+        migrations.DeleteModel(
+            name='ReferenceVersion',
+        ),
+        migrations.AddField(
+            model_name='curator',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='suggestionthemestatus',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.AddField(
+            model_name='workstepstatus',
+            name='date_update',
+            field=models.DateTimeField(default=django.utils.timezone.localtime),
+        ),
+        migrations.RunPython(create_date_triggers, drop_date_triggers),
+    ]
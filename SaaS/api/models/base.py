@@ -1,10 +1,27 @@
 from django.db import models
+from django.db.models import Case, F, Value, When
 from django.contrib.auth.models import User
+from django.dispatch import Signal
 from django.forms import ValidationError
 from django.utils.timezone import localtime
 
 
-class Man(models.Model):
+class Nested(models.Model):
+    """
+    Modification date of unversioned row nested in representations of versioned entries
+    (curators, students, groups, subjects, skills, statuses)
+
+    Mention: Date is set on every update by database trigger (migration 0011_nested_date_update),
+             so queryset updates and SET_NULL cascades are covered. Fingerprints of versioned entries
+             fold in dates of the rows they join (see 'date_fields' of their serializers).
+    """
+    date_update = models.DateTimeField(default=localtime)
+
+    class Meta:
+        abstract = True
+
+
+class Man(Nested):
     credentials = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=35)
     last_name = models.CharField(max_length=35)
@@ -15,7 +32,74 @@ class Man(models.Model):
         abstract = True
 
 
-class Comment(models.Model):
+# sent after queryset writes that bypass post_save/post_delete (update, bulk_create),
+# 'fields' are names of updated fields (None for created rows), 'objs' are created rows (None for updates)
+bulk_changed = Signal(providing_args=['model', 'fields', 'objs'])
+
+
+class VersionedQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        kwargs.setdefault('date_update', localtime())
+        kwargs.setdefault('version', F('version') + 1)
+        rows = super().update(**kwargs)
+        bulk_changed.send(sender=self.model, model=self.model, fields=set(kwargs), objs=None)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bulk_changed.send(sender=self.model, model=self.model, fields=None, objs=objs)
+        return objs
+
+    def bulk_update(self, objs, fields) -> int:
+        """
+        Updates fields of objs by one query (backport of QuerySet.bulk_update of Django 2.2)
+        """
+        objs = list(objs)
+        if not objs or not fields:
+            return 0
+        cases = {}
+        for name in fields:
+            field = self.model._meta.get_field(name)
+            whens = [When(pk=obj.pk, then=Value(getattr(obj, field.attname), output_field=field)) for obj in objs]
+            cases[field.attname] = Case(*whens, default=F(field.attname), output_field=field)
+        return self.filter(pk__in=[obj.pk for obj in objs]).update(**cases)
+
+
+class Synced(models.Model):
+    """
+    Change sequence number of entry (for delta sync), set on every insert/update by database trigger
+
+    Mention: Triggers and tombstones of deleted entries are created by migration 0004_sync,
+             entries nested in theme are renumbered (and tombstoned) on theme owner change by 0007_sync_theme_owner.
+    """
+    sequence = models.BigIntegerField(default=0, db_index=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class Versioned(Synced):
+    """
+    Tracks modification date and version of entry (for conditional requests)
+    """
+    date_update = models.DateTimeField(default=localtime)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.date_update = localtime()
+        if not self._state.adding:
+            self.version += 1
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'date_update', 'version'}
+        super().save(*args, **kwargs)
+
+
+class Comment(Synced):
     author_name = models.CharField(max_length=35)
     content = models.CharField(max_length=200)
     date_creation = models.DateTimeField()
@@ -1,7 +1,9 @@
 from django.db import models
 
+from .base import Nested
 
-class Skill(models.Model):
+
+class Skill(Nested):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
 
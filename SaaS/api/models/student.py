@@ -1,11 +1,11 @@
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 
-from .base import Man
+from .base import Man, Nested
 from .skill import Skill
 
 
-class Group(models.Model):
+class Group(Nested):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=30)
 
@@ -2,13 +2,13 @@ from django.db import models
 from django.forms import ValidationError
 from django.utils.timezone import localtime
 
-from .base import Comment
+from .base import Comment, Nested, Versioned
 from .theme import Theme
 from .student import Student
 from .curator import Curator
 
 
-class SuggestionThemeStatus(models.Model):
+class SuggestionThemeStatus(Nested):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50)
 
@@ -31,7 +31,7 @@ class SuggestionThemeProgress(models.Model):
         super().save(*args, **kwargs)
 
 
-class SuggestionTheme(models.Model):
+class SuggestionTheme(Versioned):
     id = models.AutoField(primary_key=True)
     theme = models.ForeignKey(Theme, on_delete=models.CASCADE, db_column='theme_id')
     student = models.ForeignKey(Student, on_delete=models.CASCADE, db_column='student_id', null=True)
@@ -42,6 +42,12 @@ class SuggestionTheme(models.Model):
 
     class Meta:
         db_table = "Suggestion_theme"
+        indexes = [
+            models.Index(fields=['curator', 'date_creation', 'id'], name='Suggestion_curator_creation'),
+            models.Index(fields=['student', 'date_creation', 'id'], name='Suggestion_student_creation'),
+            models.Index(fields=['theme', 'curator', 'student'], name='Suggestion_theme_owner'),
+            models.Index(fields=['status', 'date_update'], name='Suggestion_status_update'),
+        ]
 
     def save(self, *args, **kwargs):
         if self.date_creation:
@@ -61,3 +67,6 @@ class SuggestionThemeComment(Comment):
 
     class Meta:
         db_table = "Suggestion_theme_comment"
+        indexes = [
+            models.Index(fields=['suggestion', 'date_creation', 'id'], name='Suggestion_comment_thread'),    # comment thread pages
+        ]
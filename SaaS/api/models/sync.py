@@ -0,0 +1,49 @@
+from django.db import connection, models
+
+
+class Tombstone(models.Model):
+    """
+    Deleted synced entry (or entry that left curator/student), written by database trigger
+
+    Mention: Owner is the curator/student entry belonged to, owner that kept entry is null.
+    """
+    id = models.AutoField(primary_key=True)
+    kind = models.CharField(max_length=30)
+    object_id = models.IntegerField()
+    curator_id = models.IntegerField(null=True)
+    student_id = models.IntegerField(null=True)
+    sequence = models.BigIntegerField()
+
+    class Meta:
+        db_table = "Tombstone"
+        indexes = [
+            models.Index(fields=['curator_id', 'sequence'], name='Tombstone_curator_sequence'),
+            models.Index(fields=['student_id', 'sequence'], name='Tombstone_student_sequence'),
+        ]
+
+
+def get_sequence() -> int:
+    """
+    Change sequence number all smaller numbers of which are committed (0 if database has no sync triggers)
+
+    Mention: PostgreSQL allocates numbers in statement order, not in commit order. Transactions in flight hold
+             shared advisory locks keyed by the last number allocated before their own (migration 0008_sync_in_flight),
+             so the result is below the oldest of them. The sequence is read before locks: a transaction that
+             allocated a number read has its lock taken already. Bigint advisory lock keys are reserved for sync.
+             SQLite holds the write lock from allocation to commit, numbers are committed in order.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM "Change_sequence"')
+            sequence = cursor.fetchone()[0]
+            cursor.execute("SELECT MIN((classid::bigint << 32) | objid::bigint) FROM pg_locks "
+                           "WHERE locktype = 'advisory' AND objsubid = 1 "
+                           "AND database = (SELECT oid FROM pg_database WHERE datname = current_database())")
+            in_flight = cursor.fetchone()[0]
+            return sequence if in_flight is None else max(min(sequence, in_flight - 1), 0)
+        elif connection.vendor == 'sqlite':
+            cursor.execute('SELECT value FROM "Change_sequence"')
+        else:
+            return 0
+        row = cursor.fetchone()
+    return row[0] if row else 0
@@ -1,13 +1,16 @@
 from django.db import models
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.forms import ValidationError
 from django.utils.timezone import localtime
 
+from .base import Nested, Versioned
 from .curator import Curator
 from .student import Student
 from .skill import Skill
 
 
-class Subject(models.Model):
+class Subject(Nested):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
 
@@ -15,7 +18,7 @@ class Subject(models.Model):
         db_table = "Subject"
 
 
-class Theme(models.Model):
+class Theme(Versioned):
     id = models.AutoField(primary_key=True)
     curator = models.ForeignKey(Curator, on_delete=models.SET_NULL, db_column="curator_id", null=True)
     student = models.ForeignKey(Student, on_delete=models.SET_NULL, db_column="student_id", null=True)
@@ -28,6 +31,10 @@ class Theme(models.Model):
 
     class Meta:
         db_table = "Theme"
+        indexes = [
+            models.Index(fields=['curator', 'date_creation', 'id'], name='Theme_curator_creation'),
+            models.Index(fields=['student', 'date_creation', 'id'], name='Theme_student_creation'),
+        ]
 
     def save(self, *args, **kwargs):
         if self.date_creation:
@@ -46,3 +53,13 @@ class Theme(models.Model):
             raise ValidationError('Date creation is in future.')
 
         super().save(*args, **kwargs)
+
+
+@receiver(m2m_changed, sender=Theme.skills.through)
+def update_theme_version_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        Theme.objects.filter(pk=instance.pk).update()
+    elif pk_set:
+        Theme.objects.filter(pk__in=pk_set).update()
@@ -2,11 +2,11 @@ from django.db import models
 from django.forms import ValidationError
 from django.utils.timezone import localtime
 
-from .base import Comment
+from .base import Comment, Nested, Synced, Versioned
 from .theme import Theme
 
 
-class Work(models.Model):
+class Work(Versioned):
     id = models.AutoField(primary_key=True)
     theme = models.ForeignKey(Theme, on_delete=models.CASCADE, db_column='theme_id')
     date_start = models.DateTimeField()
@@ -30,7 +30,7 @@ class Work(models.Model):
         super().save(*args, **kwargs)
 
 
-class WorkStepStatus(models.Model):
+class WorkStepStatus(Nested):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50)
 
@@ -38,7 +38,7 @@ class WorkStepStatus(models.Model):
         db_table = "Work_step_status"
 
 
-class WorkStep(models.Model):
+class WorkStep(Versioned):
     id = models.AutoField(primary_key=True)
     work = models.ForeignKey(Work, on_delete=models.CASCADE, db_column='work_id', related_name='step_set')
     status = models.ForeignKey(WorkStepStatus, on_delete=models.DO_NOTHING, db_column='status_id')
@@ -49,8 +49,11 @@ class WorkStep(models.Model):
 
     class Meta:
         db_table = "Work_step"
+        indexes = [
+            models.Index(fields=['work', 'id'], name='Work_step_work_order'),
+        ]
 
-    def save(self, *args, **kwargs):
+    def clean_dates(self):
         if self.date_start:
             self.date_start = localtime(self.date_start)
         if self.date_finish:
@@ -60,6 +63,9 @@ class WorkStep(models.Model):
             raise ValidationError('Date start is greater than date acceptance.')
         if self.date_start > localtime():
             raise ValidationError('Date start is in future.')
+
+    def save(self, *args, **kwargs):
+        self.clean_dates()
         super().save(*args, **kwargs)
 
 
@@ -69,12 +75,18 @@ class WorkStepComment(Comment):
 
     class Meta:
         db_table = "Work_step_comment"
+        indexes = [
+            models.Index(fields=['step', 'date_creation', 'id'], name='Work_step_comment_thread'),    # comment thread pages
+        ]
 
 
-class WorkStepMaterial(models.Model):
+class WorkStepMaterial(Synced):
     id = models.AutoField(primary_key=True)
     content = models.CharField(max_length=200)
     step = models.ForeignKey(WorkStep, on_delete=models.CASCADE, db_column='step_id', related_name='material_set')
 
     class Meta:
         db_table = "Work_step_material"
+        indexes = [
+            models.Index(fields=['step', 'id'], name='Work_step_material_step_order'),
+        ]
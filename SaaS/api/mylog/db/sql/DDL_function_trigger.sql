@@ -8,8 +8,8 @@ CREATE OR REPLACE FUNCTION create_theme_based_work()
 $BODY$
 BEGIN
     -- create new work based on theme
-    INSERT INTO "Work"(date_start, theme_id)
-    VALUES (now() AT TIME ZONE 'Europe/Moscow', NEW.id);
+    INSERT INTO "Work"(date_start, theme_id, date_update, version)
+    VALUES (now() AT TIME ZONE 'Europe/Moscow', NEW.id, now(), 1);
 
     RETURN NEW;
 END;
@@ -32,7 +32,9 @@ CREATE OR REPLACE FUNCTION update_theme_date_acceptance_based_work()
   RETURNS trigger AS
 $BODY$
 BEGIN
-    UPDATE "Theme" SET date_acceptance = now() AT TIME ZONE 'Europe/Moscow'
+    UPDATE "Theme" SET date_acceptance = now() AT TIME ZONE 'Europe/Moscow',
+                       date_update = now(),
+                       version = version + 1
     WHERE id = NEW.theme_id;
 
     RETURN NEW;
@@ -0,0 +1,186 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, _positive_int, _reverse_ordering
+from rest_framework.response import Response
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Opt-in keyset pagination on 'id'
+
+    Mention: Page is returned only if 'cursor' or 'page_size' query param is passed,
+             otherwise whole list is returned (backward compatible).
+             Cursors are opaque, neither COUNT(*) nor deep OFFSET are performed.
+    """
+    ordering = ('id', )
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_page_size(self, request):
+        if self.cursor_query_param not in request.query_params and \
+                self.page_size_query_param not in request.query_params:
+            return None
+        return super().get_page_size(request)
+
+
+class DateCreationCursorPagination(IdCursorPagination):
+    """
+    Opt-in keyset pagination on ('date_creation', 'id'), newest first
+
+    Mention: Cursor position is the pair (unique), so pages are range scans of the pair
+             even when many entries have the same date, cursors never have offsets.
+    """
+    ordering = ('-date_creation', '-id')
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            date_creation, entry_id = instance['date_creation'], instance['id']
+        else:
+            date_creation, entry_id = instance.date_creation, instance.id
+        return "{}|{}".format(date_creation.isoformat(), entry_id)
+
+    def decode_position(self, position: str) -> tuple:
+        date, _, entry_id = position.partition('|')
+        try:
+            date, entry_id = parse_datetime(date), int(entry_id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return date, entry_id
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        CursorPagination.paginate_queryset filtering by the pair instead of the first ordering field
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor if self.cursor is not None else (0, False, None)
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            date, entry_id = self.decode_position(current_position)
+            if reverse:     # newer entries
+                queryset = queryset.filter(date_creation__gte=date).filter(Q(date_creation__gt=date) | Q(id__gt=entry_id))
+            else:
+                queryset = queryset.filter(date_creation__lte=date).filter(Q(date_creation__lt=date) | Q(id__lt=entry_id))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = self._get_position_from_instance(results[-1], self.ordering) \
+            if len(results) > len(self.page) else None
+
+        has_position = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_position, following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next, self.has_previous = following_position is not None, has_position
+            self.next_position, self.previous_position = following_position, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class ThreadCursorPagination(BasePagination):
+    """
+    Opt-in keyset pagination of comment threads on ('date_creation', 'id'), newest first
+
+    Mention: 'before' cursor pages to older comments, 'after' cursor - to newer ones (polling),
+             response has both cursors of page ('before' is null when there are no older comments).
+             Page is returned only if 'before', 'after' or 'page_size' query param is passed,
+             otherwise whole list is returned (backward compatible).
+             Pages are range scans of composite index (thread, date_creation, id).
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    before_query_param = 'before'
+    after_query_param = 'after'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def get_page_size(self, request):
+        params = request.query_params
+        if not any(param in params for param in (self.before_query_param, self.after_query_param,
+                                                 self.page_size_query_param)):
+            return None
+        try:
+            return _positive_int(params[self.page_size_query_param], strict=True, cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    @staticmethod
+    def encode_cursor(comment) -> str:
+        position = "{}|{}".format(comment.date_creation.isoformat(), comment.id)
+        return urlsafe_b64encode(position.encode('ascii')).decode('ascii')   # passed in query strings as is
+
+    def decode_cursor(self, request, param: str):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            date, _, comment_id = urlsafe_b64decode(value.encode('ascii')).decode('ascii').partition('|')
+            date, comment_id = parse_datetime(date), int(comment_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return date, comment_id
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        before = self.decode_cursor(request, self.before_query_param)
+        after = self.decode_cursor(request, self.after_query_param)
+        self.after = request.query_params.get(self.after_query_param)
+        if after is not None:
+            date, comment_id = after
+            queryset = queryset.filter(date_creation__gte=date).filter(Q(date_creation__gt=date) | Q(id__gt=comment_id))
+            page = list(queryset.order_by('date_creation', 'id')[:page_size])
+            page.reverse()
+            has_older = True
+        else:
+            if before is not None:
+                date, comment_id = before
+                queryset = queryset.filter(date_creation__lte=date).filter(Q(date_creation__lt=date) | Q(id__lt=comment_id))
+            page = list(queryset.order_by('-date_creation', '-id')[:page_size + 1])
+            has_older = len(page) > page_size
+            page = page[:page_size]
+        self.before = self.encode_cursor(page[-1]) if page and has_older else None
+        if page:
+            self.after = self.encode_cursor(page[0])
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            (self.before_query_param, self.before),
+            (self.after_query_param, self.after),
+            ('results', data),
+        ]))
+
+
+class CursorPaginatedListMixin:
+    """
+    Pagination of hand-written list views (GenericAPIView and FieldSelectionMixin based)
+    """
+    pagination_class = IdCursorPagination
+
+    def get_list_response(self, queryset, serializer_class) -> Response:
+        if not self.paginator.get_page_size(self.request):
+            return Response(self.get_list_data(queryset, serializer_class), status=status.HTTP_200_OK)
+        page = self.paginate_queryset(self.get_read_queryset(queryset, serializer_class))
+        serializer = self.get_read_serializer(serializer_class, page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,89 @@
+"""
+Process-local cache of user roles (names of auth groups user is member of)
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+ROLE_CACHE_TTL = getattr(settings, 'API_ROLE_CACHE_TTL', 300)   # seconds, bounds staleness between workers
+
+
+class RoleCache:
+    """
+    user_id -> (frozenset of group names, expiration time)
+    """
+    def __init__(self, ttl: float = ROLE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, user_id: int, roles: frozenset):
+        with self._lock:
+            self._entries[user_id] = (roles, time.monotonic() + self.ttl)
+
+    def discard(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+role_cache = RoleCache()
+
+
+def get_user_roles(user) -> frozenset:
+    """
+    Resolves user roles once per request (memoized on user instance), at most one indexed query per cache miss
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_api_roles', None)
+    if roles is None:
+        roles = role_cache.get(user.pk)
+        if roles is None:
+            roles = frozenset(Group.objects.filter(user__id=user.pk).values_list('name', flat=True))
+            role_cache.set(user.pk, roles)
+        user._api_roles = roles
+    return roles
+
+
+def has_role(user, role: str) -> bool:
+    return role in get_user_roles(user)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:     # user.groups changed
+        role_cache.discard(instance.pk)
+    elif pk_set:        # group.user_set changed
+        role_cache.discard(*pk_set)
+    else:               # group.user_set cleared
+        role_cache.clear()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    role_cache.discard(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    role_cache.clear()
@@ -0,0 +1,240 @@
+import datetime
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, models
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework import serializers
+from rest_framework.settings import api_settings, ISO_8601
+
+from .selection import FieldSelection, select_fields
+
+COMPILED_CACHE_SIZE = getattr(settings, 'API_COMPILED_SERIALIZERS_CACHE_SIZE', 256)
+
+# fields which representation of database value is the value itself
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+class CompileError(Exception):
+    pass
+
+
+def get_datetime_converter(field: serializers.DateTimeField, database_timezone=None):
+    """
+    DateTimeField.to_representation without per value settings lookups and timezone transitions search
+
+    Mention: Raw text values (SQLite) are in database_timezone, text of every minute is converted once,
+             seconds and microseconds are copied from the database text.
+    """
+    def parse(value: str) -> datetime.datetime:
+        value = parse_datetime(value)
+        if database_timezone is not None and timezone.is_naive(value):
+            value = timezone.make_aware(value, database_timezone)
+        return value
+
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return lambda value: field.to_representation(parse(value) if isinstance(value, str) else value)
+
+    # offsets of (pytz) timezone per quarter of hour, fixed offset timezones convert much faster
+    offsets = {}
+    minutes = {}    # database text of minute -> (local text of minute, offset text) or None
+
+    def get_minute(text: str):
+        if database_timezone is None:
+            return None
+        value = timezone.make_aware(datetime.datetime.strptime(text, '%Y-%m-%d %H:%M'), database_timezone)
+        value = value.astimezone(field_timezone)
+        if value.utcoffset().seconds % 60:
+            return None
+        value = value.isoformat()
+        return value[:16], 'Z' if value.endswith('+00:00') else value[19:]
+
+    def to_representation(value):
+        if isinstance(value, str):
+            if len(value) in (19, 26) and value[10] == ' ':     # 'YYYY-MM-DD HH:MM:SS[.ffffff]'
+                minute = value[:16]
+                if minute not in minutes:
+                    minutes[minute] = get_minute(minute)
+                local = minutes[minute]
+                if local is not None:
+                    return local[0] + value[16:] + local[1]
+            value = parse(value)
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        bucket = value.timestamp() // 900
+        offset = offsets.get(bucket)
+        if offset is None:
+            offset = offsets[bucket] = datetime.timezone(value.astimezone(field_timezone).utcoffset())
+        value = value.astimezone(offset).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+class ManyRelation:
+    """
+    Nested list of related entries, read by one query for all parents
+    """
+    def __init__(self, model, source: str, compiled: 'CompiledSerializer'):
+        relation = model._meta.get_field(source)
+        if relation.many_to_many and not relation.auto_created:   # forward many-to-many
+            self.query_name = relation.related_query_name()
+        elif relation.auto_created and (relation.one_to_many or relation.many_to_many):   # reverse relations
+            self.query_name = relation.field.name
+        else:
+            raise CompileError("'{}' is not a many relation of {}.".format(source, model.__name__))
+        self.related_model = relation.related_model
+        self.compiled = compiled
+
+    def get_grouped(self, keys: set) -> dict:
+        """
+        Returns {parent key: [representation]}, entries are in database order (as prefetch_related reads them)
+        """
+        grouped = defaultdict(list)
+        if keys:
+            queryset = self.related_model._default_manager.filter(**{self.query_name + '__in': keys})
+            for key, representation in self.compiled.serialize_grouped(queryset, self.query_name):
+                grouped[key].append(representation)
+        return grouped
+
+
+class CompiledSerializer:
+    """
+    Read path of ModelSerializer (list of entries) generated from its fields
+
+    Mention: Entries are read as values rows (tuples), dicts are emitted by generated function
+             with precomputed row indexes and converters, nested serializers of foreign keys are joined,
+             many relations are read by one query per relation. Output is equal to serializer output.
+             SQLite datetime columns are read as text, without regex parsing of the database backend,
+             and formatted by converters.
+             Serializer with unsupported fields (methods, properties, dotted sources) raises CompileError.
+    """
+    def __init__(self, serializer: serializers.Field, grouped: bool = False, model=None):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        self.columns = ['__group__'] if grouped else []     # values lookups, group lookup is set per query
+        self.fields = []        # fields with converters
+        self.datetime_columns = set()   # indexes of columns read as text where backend parses datetimes
+        self.relations = []     # (ManyRelation, index of parent key column)
+        if isinstance(serializer, serializers.PrimaryKeyRelatedField) and model is not None:
+            if serializer.pk_field is not None:
+                raise CompileError("Primary key fields are not supported.")
+            self.model = model
+            expression = "row[{}]".format(self.get_column('pk'))
+        elif isinstance(serializer, serializers.ModelSerializer):
+            self.model = serializer.Meta.model
+            expression = self.compile_serializer(serializer, self.model, '')
+        else:
+            raise CompileError("{} is not a model serializer.".format(type(serializer).__name__))
+        source = "def emit(row, converters, many):\n    return {}\n".format(expression)
+        namespace = {}
+        exec(compile(source, '<compiled {}>'.format(type(serializer).__name__), 'exec'), namespace)
+        self.emit = namespace['emit']
+
+    def get_column(self, lookup: str) -> int:
+        if lookup not in self.columns:
+            self.columns.append(lookup)
+        return self.columns.index(lookup)
+
+    def compile_value(self, field: serializers.Field, model_field, index: int) -> str:
+        if isinstance(field, serializers.DateTimeField) and isinstance(model_field, models.DateTimeField):
+            self.datetime_columns.add(index)
+        if type(field) in IDENTITY_FIELDS:
+            return "row[{}]".format(index)
+        self.fields.append(field)
+        return "(None if row[{0}] is None else converters[{1}](row[{0}]))".format(index, len(self.fields) - 1)
+
+    def compile_serializer(self, serializer: serializers.ModelSerializer, model, prefix: str) -> str:
+        items = []
+        for field in serializer._readable_fields:
+            if field.source == '*' or '.' in field.source:
+                raise CompileError("Field '{}' has unsupported source.".format(field.field_name))
+            try:
+                model_field = model._meta.get_field(field.source)
+            except models.FieldDoesNotExist:
+                raise CompileError("Field '{}' is not a model field.".format(field.field_name))
+            lookup = prefix + ('pk' if model_field.primary_key else field.source)
+
+            if isinstance(field, serializers.ListSerializer) or isinstance(field, serializers.ManyRelatedField):
+                child = field.child if isinstance(field, serializers.ListSerializer) else field.child_relation
+                compiled = CompiledSerializer(child, grouped=True, model=model_field.related_model)
+                self.relations.append((ManyRelation(model, field.source, compiled), self.get_column(prefix + 'pk')))
+                expression = "many[{}].get(row[{}], [])".format(len(self.relations) - 1, self.get_column(prefix + 'pk'))
+            elif isinstance(field, serializers.ModelSerializer):
+                if not (model_field.many_to_one or model_field.one_to_one):
+                    raise CompileError("Field '{}' is not a foreign key.".format(field.field_name))
+                expression = "(None if row[{}] is None else {})".format(
+                    self.get_column(lookup + '__pk'), self.compile_serializer(field, model_field.related_model, lookup + '__'))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                if not (model_field.many_to_one or model_field.one_to_one):
+                    raise CompileError("Field '{}' is not a foreign key.".format(field.field_name))
+                expression = "row[{}]".format(self.get_column(lookup))
+            elif isinstance(field, (serializers.RelatedField, serializers.BaseSerializer)) or model_field.is_relation:
+                raise CompileError("Field '{}' is not supported.".format(field.field_name))
+            else:
+                expression = self.compile_value(field, model_field, self.get_column(lookup))
+            items.append("{!r}: {}".format(field.field_name, expression))
+        return "{" + ", ".join(items) + "}"
+
+    def get_converters(self, database: str) -> tuple:
+        connection = connections[database]
+        database_timezone = connection.timezone if settings.USE_TZ else None
+        return tuple(get_datetime_converter(field, database_timezone) if isinstance(field, serializers.DateTimeField)
+                     else field.to_representation for field in self.fields)
+
+    def get_rows(self, queryset, group: str = None) -> list:
+        columns = [group] + self.columns[1:] if group else self.columns
+        if connections[queryset.db].vendor == 'sqlite':     # text without declared type is not parsed by sqlite3 module
+            columns = [Cast(column, models.TextField()) if index in self.datetime_columns
+                       else column for index, column in enumerate(columns)]
+        return list(queryset.prefetch_related(None).values_list(*columns))
+
+    def emit_rows(self, rows: list, database: str):
+        converters = self.get_converters(database)
+        many = [relation.get_grouped({row[index] for row in rows if row[index] is not None})
+                for relation, index in self.relations]
+        emit = self.emit
+        return (emit(row, converters, many) for row in rows)
+
+    def serialize(self, queryset) -> list:
+        if isinstance(queryset, models.Manager):
+            queryset = queryset.all()
+        return list(self.emit_rows(self.get_rows(queryset), queryset.db))
+
+    def serialize_grouped(self, queryset, group: str):
+        """
+        Returns (group value, representation) of entries
+        """
+        rows = self.get_rows(queryset, group)
+        return zip((row[0] for row in rows), self.emit_rows(rows, queryset.db))
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_serializer(serializer_class, selection: FieldSelection = None):
+    """
+    Returns cached CompiledSerializer of serializer class (with selected fields) or None if it is not supported
+    """
+    key = (serializer_class, selection.key if selection is not None else None)
+    with _compiled_lock:
+        if key in _compiled:
+            return _compiled[key]
+    serializer = serializer_class()
+    if selection is not None:
+        select_fields(serializer, selection)
+    try:
+        compiled = CompiledSerializer(serializer)
+    except CompileError:
+        compiled = None
+    with _compiled_lock:
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.clear()
+        _compiled[key] = compiled
+    return compiled
@@ -0,0 +1,110 @@
+import json
+from collections import OrderedDict
+
+from rest_framework import serializers
+
+
+def parse_paths(value: str) -> dict:
+    """
+    'id,title,curator.name' -> {'id': {}, 'title': {}, 'curator': {'name': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class FieldSelection:
+    """
+    Sparse fieldset ('fields') and expanded relations ('expand') of representation
+
+    Mention: Nested serializers are represented by primary keys unless expanded,
+             relation is expanded by 'expand' path or by dotted 'fields' path.
+             fields=None means all fields.
+    """
+    def __init__(self, fields: dict = None, expand: dict = None):
+        self.fields = fields or None
+        self.expand = expand or {}
+
+    @classmethod
+    def from_params(cls, fields: str = None, expand: str = None) -> 'FieldSelection':
+        return cls(parse_paths(fields or ''), parse_paths(expand or ''))
+
+    @property
+    def key(self) -> str:
+        return json.dumps([self.fields, self.expand], sort_keys=True)
+
+    def allows(self, name: str) -> bool:
+        return self.fields is None or name in self.fields
+
+    def is_expanded(self, name: str) -> bool:
+        return name in self.expand or bool(self.fields and self.fields.get(name))
+
+    def nested(self, name: str) -> 'FieldSelection':
+        return FieldSelection(self.fields.get(name) if self.fields else None, self.expand.get(name))
+
+
+def select_fields(serializer: serializers.BaseSerializer, selection: FieldSelection) -> serializers.BaseSerializer:
+    """
+    Drops unselected fields of serializer instance, replaces not expanded nested serializers by primary keys
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        select_fields(serializer.child, selection)
+        return serializer
+
+    fields = serializer.fields
+    for name in list(fields):
+        if not selection.allows(name):
+            del fields[name]
+            continue
+        field = fields[name]
+        many = isinstance(field, serializers.ListSerializer)
+        if not isinstance(field.child if many else field, serializers.BaseSerializer):
+            continue
+        if selection.is_expanded(name):
+            select_fields(field, selection.nested(name))
+        else:
+            kwargs = {} if field.source == name else {'source': field.source}
+            fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, **kwargs)
+    return serializer
+
+
+def get_related_lookups(serializer: serializers.BaseSerializer, prefix: str = '', prefetch: bool = False,
+                        lookups: OrderedDict = None) -> OrderedDict:
+    """
+    Returns {lookup: is prefetched} of relations that (already selected) serializer represents
+    """
+    lookups = OrderedDict() if lookups is None else lookups
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+        lookup = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.ListSerializer):
+            lookups[lookup] = True
+            get_related_lookups(field.child, lookup + '__', True, lookups)
+        elif isinstance(field, serializers.BaseSerializer):
+            lookups[lookup] = prefetch
+            get_related_lookups(field, lookup + '__', prefetch, lookups)
+        elif isinstance(field, serializers.ManyRelatedField):
+            lookups[lookup] = True
+    return lookups
+
+
+def setup_eager_loading(queryset, serializer: serializers.BaseSerializer):
+    """
+    Joins/prefetches exactly the relations serializer represents (hand-written eager loading is dropped)
+    """
+    queryset = queryset.select_related(None).prefetch_related(None)
+    lookups = get_related_lookups(serializer)
+    select = [lookup for lookup, prefetch in lookups.items() if not prefetch]
+    prefetch = [lookup for lookup, prefetch in lookups.items() if prefetch]
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
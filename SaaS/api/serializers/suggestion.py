@@ -1,6 +1,13 @@
+from django.db import connection, transaction
+
 from rest_framework import serializers
 
 from ..models.suggestion import *
+from ..utils.reference_data import reference_data
+from ..utils.recommendation import theme_skill_index
+from ..utils.assignment import ASSIGNMENT_MAX_STUDENTS, ASSIGNMENT_MAX_THEMES, assign
+from ..utils.acceptance import accept_suggestions, lock_themes
+from ..utils.events import publish_suggestions
 
 from .theme import ThemeSerializerNoSkills
 from .student import StudentSerializerNoSkills
@@ -59,40 +66,137 @@ class SuggestionThemeSerializerRelatedChangeable(serializers.ModelSerializer):
 
     def update(self, instance: SuggestionTheme, validated_data):
         status_name = validated_data["status"].name
-        if status_name == "WAITING_STUDENT" or status_name == "WAITING_CURATOR":
-            pass
-        elif status_name == "IN_PROGRESS_STUDENT" or status_name == "IN_PROGRESS_CURATOR":
-            # create SuggestionThemeProgress if it does not exist
-            if not instance.progress:
-                instance.progress = SuggestionThemeProgress.objects.create(
-                    title=instance.theme.title,
-                    description=instance.theme.description,
-                    date_update=localtime())
-                instance.save()
-        elif status_name == "REJECTED_STUDENT" or status_name == "REJECTED_CURATOR":
-            pass
-        elif status_name == "ACCEPTED_BOTH":
-            # merge updated data with related theme (through UPDATE)
-            if instance.progress:
-                instance.theme.title = instance.progress.title
-                instance.theme.description = instance.progress.description
+        if status_name == "ACCEPTED_BOTH":
+            return self.accept(instance, validated_data["status"])
 
-            instance.theme.curator = instance.curator
-            instance.theme.student = instance.student
-            instance.theme.save()   # it calls sql UPDATE. it is IMPORTANT for database trigger
+        with transaction.atomic():
+            if status_name == "WAITING_STUDENT" or status_name == "WAITING_CURATOR":
+                pass
+            elif status_name == "IN_PROGRESS_STUDENT" or status_name == "IN_PROGRESS_CURATOR":
+                # create SuggestionThemeProgress if it does not exist
+                if not instance.progress:
+                    instance.progress = SuggestionThemeProgress.objects.create(
+                        title=instance.theme.title,
+                        description=instance.theme.description,
+                        date_update=localtime())
+                    instance.save()
+            elif status_name == "REJECTED_STUDENT" or status_name == "REJECTED_CURATOR":
+                pass
+
+            # change date_update field
+            if instance.progress:
+                instance.progress.date_update = localtime()
+                instance.progress.save()
 
-            # reject rest of suggestions
-            SuggestionTheme.objects \
-                .exclude(student=instance.student) \
-                .filter(curator=instance.curator, theme=instance.theme) \
-                .update(status=SuggestionThemeStatus.objects.get(name__exact="REJECTED_CURATOR"))
+            super().update(instance, validated_data)
 
-        # change date_update field
+    def accept(self, instance: SuggestionTheme, status: SuggestionThemeStatus):
+        """
+        Merges progress with related theme and rejects rest of suggestions (set-based, see utils.acceptance)
+        """
+        if accept_suggestions([instance]).taken:
+            raise serializers.ValidationError({'status_id': ["Theme {} is already accepted.".format(instance.theme_id)]})
+        # response shows theme changed by database (triggers)
+        instance.refresh_from_db()
+        instance.status = status
+        instance.theme.refresh_from_db()
         if instance.progress:
-            instance.progress.date_update = localtime()
-            instance.progress.save()
+            instance.progress.refresh_from_db()
+        return instance
+
+
+# POST (bulk)
+class SuggestionThemeTransitionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status_id = serializers.IntegerField()
+
+
+# POST (bulk)
+class SuggestionThemeSerializerBulkStatus(serializers.Serializer):
+    """
+    Changes statuses of suggestions at once, grouped by target status
+
+    Mention: Context contains 'suggestions' - queryset of related suggestions, it is run in one transaction.
+             Accepts are applied first (utils.acceptance, theme locks go before row locks as in single PUT),
+             suggestions rejected by them keep REJECTED_CURATOR. Result of item is 'changed', 'rejected'
+             or 'taken' (theme is accepted by another suggestion).
+    """
+    transitions = SuggestionThemeTransitionSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        transitions = attrs['transitions']
+        suggestion_ids = [entry['id'] for entry in transitions]
+        if len(set(suggestion_ids)) != len(suggestion_ids):
+            raise serializers.ValidationError("Each suggestion can be changed once.")
+        statuses = {status.id: status for status in reference_data.table(SuggestionThemeStatus).rows}
+        unknown_id = sorted({entry['status_id'] for entry in transitions} - set(statuses))
+        if unknown_id:
+            raise serializers.ValidationError("Statuses {} do not exist.".format(unknown_id))
+        suggestions = self.context['suggestions'].select_related('theme').in_bulk(suggestion_ids)
+        unknown_id = sorted(set(suggestion_ids) - set(suggestions))
+        if unknown_id:
+            raise serializers.ValidationError("Suggestions {} are not related to curator.".format(unknown_id))
+
+        groups = {}
+        for entry in transitions:
+            groups.setdefault(statuses[entry['status_id']], []).append(suggestions[entry['id']])
+        attrs['groups'] = groups
+        return attrs
+
+    def create(self, validated_data) -> list:
+        """
+        Returns [{'id', 'status_id', 'result'}] in order of transitions
+        """
+        groups = validated_data['groups']
+        results = {}
+        rejected_ids = set()
+        for status, suggestions in groups.items():
+            if status.name == "ACCEPTED_BOTH":
+                acceptance = accept_suggestions(suggestions)
+                results.update((suggestion.id, (status.id, 'changed')) for suggestion in acceptance.accepted)
+                results.update((suggestion.id, (suggestion.status_id, 'taken')) for suggestion in acceptance.taken)
+                rejected_ids.update(acceptance.rejected)
+
+        rejected_status_id = reference_data.get_id(SuggestionThemeStatus, "REJECTED_CURATOR")
+        changed, without_progress = [], []
+        for status, suggestions in groups.items():
+            if status.name == "ACCEPTED_BOTH":
+                continue
+            for suggestion in suggestions:
+                if suggestion.id in rejected_ids:
+                    results[suggestion.id] = (rejected_status_id, 'rejected')
+                    continue
+                touched = suggestion.progress_id is not None
+                suggestion.status = status
+                if status.name in ("IN_PROGRESS_STUDENT", "IN_PROGRESS_CURATOR") and not touched:
+                    without_progress.append(suggestion)
+                changed.append(suggestion)
+                results[suggestion.id] = (status.id, 'changed')
+
+        touched_ids = [suggestion.progress_id for suggestion in changed if suggestion.progress_id is not None]
+        if touched_ids:
+            SuggestionThemeProgress.objects.filter(pk__in=touched_ids).update(date_update=localtime())
+        self.create_progress(without_progress)
+        SuggestionTheme.objects.bulk_update(changed, ['status', 'progress'])
+        publish_suggestions(suggestion.id for suggestion in changed)
+        return [{'id': entry['id'], 'status_id': results[entry['id']][0], 'result': results[entry['id']][1]}
+                for entry in validated_data['transitions']]
 
-        super().update(instance, validated_data)
+    @staticmethod
+    def create_progress(suggestions: list):
+        """
+        Progress rows of suggestions from their themes, by one INSERT where database returns ids of bulk inserts
+        """
+        date_update = localtime()
+        progresses = [SuggestionThemeProgress(title=suggestion.theme.title, description=suggestion.theme.description,
+                                              date_update=date_update) for suggestion in suggestions]
+        if connection.features.can_return_ids_from_bulk_insert:
+            SuggestionThemeProgress.objects.bulk_create(progresses)
+        else:
+            for progress in progresses:
+                progress.save()
+        for suggestion, progress in zip(suggestions, progresses):
+            suggestion.progress = progress
 
 
 # GET
@@ -108,6 +212,13 @@ class SuggestionThemeSerializerRelatedIntermediate(serializers.ModelSerializer):
         fields = ('id', 'date_creation',
                   'theme', 'student', 'curator', 'status', 'progress')
 
+    version_fields = ('version', 'theme__version')
+    date_fields = ('date_update', 'theme__date_update', 'progress__date_update', 'status__date_update',
+                   'curator__date_update', 'student__date_update', 'student__group__date_update',
+                   'theme__curator__date_update', 'theme__student__date_update', 'theme__student__group__date_update',
+                   'theme__subject__date_update')
+    sequence_fields = ('sequence', 'theme__sequence')     # progress updates change sequence of suggestion
+
 
 # GET
 class SuggestionThemeCommentSerializer(serializers.ModelSerializer):
@@ -123,3 +234,80 @@ class SuggestionThemeCommentSerializerNoRelated(serializers.ModelSerializer):
     class Meta:
         model = SuggestionThemeComment
         fields = ('id', 'author_name', 'content')
+
+
+# POST
+class SuggestionThemeAssignSerializer(serializers.Serializer):
+    """
+    Assigns open themes to students by skill overlap at once
+
+    Mention: 'capacities' limits number of themes assigned per curator ({curator_id: count}),
+             'dry_run' proposes assignments without creating suggestions.
+             Matching is solved without locks, themes are locked and validated again on create.
+    """
+    student_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False,
+                                        max_length=ASSIGNMENT_MAX_STUDENTS)
+    theme_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False,
+                                      max_length=ASSIGNMENT_MAX_THEMES)
+    capacities = serializers.DictField(child=serializers.IntegerField(min_value=0), required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_capacities(self, value):
+        try:
+            return {int(curator_id): capacity for curator_id, capacity in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Keys must be curator ids.")
+
+    def validate(self, attrs):
+        student_ids = set(attrs['student_ids'])
+        theme_ids = set(attrs['theme_ids'])
+
+        student_skills = {student_id: set() for student_id in Student.objects.filter(pk__in=student_ids).values_list('id', flat=True)}
+        unknown_id = sorted(student_ids - set(student_skills))
+        if unknown_id:
+            raise serializers.ValidationError({'student_ids': "Students {} do not exist.".format(unknown_id)})
+
+        themes = {theme_id: (curator_id, student_id) for theme_id, curator_id, student_id
+                  in Theme.objects.filter(pk__in=theme_ids).values_list('id', 'curator_id', 'student_id')}
+        unknown_id = sorted(theme_ids - set(themes))
+        if unknown_id:
+            raise serializers.ValidationError({'theme_ids': "Themes {} do not exist.".format(unknown_id)})
+        taken_id = sorted(theme_id for theme_id, (curator_id, student_id) in themes.items() if student_id is not None)
+        if taken_id:
+            raise serializers.ValidationError({'theme_ids': "Themes {} are already taken.".format(taken_id)})
+        orphan_id = sorted(theme_id for theme_id, (curator_id, student_id) in themes.items() if curator_id is None)
+        if orphan_id:
+            raise serializers.ValidationError({'theme_ids': "Themes {} have no curator.".format(orphan_id)})
+
+        for student_id, skill_id in Student.skills.through.objects.filter(student_id__in=student_ids).values_list('student_id', 'skill_id'):
+            student_skills[student_id].add(skill_id)
+        attrs['student_skills'] = student_skills
+        attrs['theme_curators'] = {theme_id: curator_id for theme_id, (curator_id, student_id) in themes.items()}
+        return attrs
+
+    def get_assignments(self) -> list:
+        """
+        Best-fit pairs, students without common skills with any theme stay unassigned
+        """
+        theme_curators = self.validated_data['theme_curators']
+        scores = {student_id: theme_skill_index.similarities(skill_ids, theme_curators)
+                  for student_id, skill_ids in self.validated_data['student_skills'].items()}
+        return assign(scores, theme_curators, self.validated_data.get('capacities'))
+
+    def create(self, validated_data):
+        """
+        Themes of assignments are locked (in transaction) and must still be open with the same curator
+        """
+        assignments = validated_data['assignments']
+        themes = lock_themes(assignment.theme_id for assignment in assignments)
+        changed_id = sorted(assignment.theme_id for assignment in assignments
+                            if themes.get(assignment.theme_id) != (assignment.curator_id, None))
+        if changed_id:
+            raise serializers.ValidationError({'theme_ids': "Themes {} were taken while assigning.".format(changed_id)})
+
+        status_id = reference_data.get_id(SuggestionThemeStatus, "WAITING_STUDENT")
+        date_creation = localtime()
+        suggestions = [SuggestionTheme(theme_id=assignment.theme_id, student_id=assignment.student_id,
+                                       curator_id=assignment.curator_id, status_id=status_id, date_creation=date_creation)
+                       for assignment in assignments]
+        return SuggestionTheme.objects.bulk_create(suggestions)
@@ -43,6 +43,15 @@ class ThemeSerializerRelatedIntermediate(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'date_creation', 'date_acceptance',
                   'curator', 'student', 'subject', 'skills')
 
+    version_fields = ('version', )
+    date_fields = ('date_update', 'curator__date_update', 'student__date_update', 'student__group__date_update',
+                   'subject__date_update', 'skills__date_update')
+    sequence_fields = ('sequence', )
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('curator', 'student__group', 'subject').prefetch_related('skills')
+
 
 # GET
 class ThemeSerializerNoSkills(serializers.ModelSerializer):
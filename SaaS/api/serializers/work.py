@@ -1,6 +1,9 @@
 from rest_framework import serializers
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+
 from ..models.work import *
+from ..utils.reference_data import reference_data
 
 from .theme import ThemeSerializerRelatedID, ThemeSerializerRelatedIntermediate
 
@@ -30,6 +33,20 @@ class WorkSerializerRelatedIntermediate(serializers.ModelSerializer):
         model = Work
         fields = ('id', 'date_start', 'date_finish', 'theme')
 
+    version_fields = ('version', 'theme__version')
+    date_fields = ('date_update', 'theme__date_update', 'theme__curator__date_update', 'theme__student__date_update',
+                   'theme__student__group__date_update', 'theme__subject__date_update', 'theme__skills__date_update')
+    sequence_fields = ('sequence', 'theme__sequence')
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Joins/prefetches everything nested theme representation needs
+        """
+        return queryset \
+            .select_related('theme__curator', 'theme__student__group', 'theme__subject') \
+            .prefetch_related('theme__skills')
+
 
 # GET
 class WorkStepSerializer(serializers.ModelSerializer):
@@ -40,11 +57,31 @@ class WorkStepSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'date_start', 'date_finish',
                   'status')
 
+    version_fields = ('version', )
+    date_fields = ('date_update', 'status__date_update')
+    sequence_fields = ('sequence', )
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('status')
+
+
+# GET (sync)
+class WorkStepSerializerWorkID(WorkStepSerializer):
+    work_id = serializers.PrimaryKeyRelatedField(read_only=True, source="work")
+
+    class Meta(WorkStepSerializer.Meta):
+        fields = WorkStepSerializer.Meta.fields + ('work_id', )
+
+
+def default_work_step_status() -> WorkStepStatus:
+    return reference_data.get(WorkStepStatus, "В процессе")
+
 
 # POST
 class WorkStepSerializerRelatedIDNoStatus(serializers.ModelSerializer):
     status_id = serializers.PrimaryKeyRelatedField(allow_null=True, required=False, queryset=WorkStepStatus.objects.all(), source="status",
-                                                   default=WorkStepStatus.objects.get(name__exact="В процессе"))
+                                                   default=default_work_step_status)
 
     class Meta:
         model = WorkStep
@@ -64,6 +101,76 @@ class WorkStepSerializerRelatedID(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'date_start', 'date_finish', 'status_id')
 
 
+# PUT (bulk)
+class WorkStepSerializerBulkUpdate(WorkStepSerializerRelatedID):
+    id = serializers.IntegerField()
+
+
+# POST (bulk)
+class WorkStepSerializerBulk(serializers.Serializer):
+    """
+    Creates, updates and deletes steps of work at once
+
+    Mention: Context contains 'work' and 'steps' - its existing steps by id.
+             Steps are validated together by the date rules of WorkStep.save.
+    """
+    creates = WorkStepSerializerRelatedIDNoStatus(many=True, required=False)
+    updates = WorkStepSerializerBulkUpdate(many=True, required=False)
+    deletes = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, attrs):
+        steps = self.context['steps']
+        update = attrs.get('updates', [])
+        delete = attrs.get('deletes', [])
+
+        update_id = [entry['id'] for entry in update]
+        unknown_id = sorted(set(update_id + delete) - set(steps))
+        if unknown_id:
+            raise serializers.ValidationError("Steps {} are not related to work.".format(unknown_id))
+        if len(set(update_id)) != len(update_id) or set(update_id) & set(delete):
+            raise serializers.ValidationError("Each step can be updated or deleted once.")
+
+        created_steps = [WorkStep(work=self.context['work'], **entry) for entry in attrs.get('creates', [])]
+        updated_steps = []
+        updated_fields = set()
+        for entry in update:
+            step = steps[entry['id']]
+            for field, value in entry.items():
+                if field != 'id' and value is not None:    # null means unchanged
+                    setattr(step, field, value)
+                    updated_fields.add(field)
+            updated_steps.append(step)
+
+        errors = {}
+        for name, changed_steps in (('creates', created_steps), ('updates', updated_steps)):
+            step_errors = [self.get_date_errors(step) for step in changed_steps]
+            if any(step_errors):
+                errors[name] = step_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs['created_steps'] = created_steps
+        attrs['updated_steps'] = updated_steps
+        attrs['updated_fields'] = sorted(updated_fields)
+        return attrs
+
+    @staticmethod
+    def get_date_errors(step: WorkStep) -> dict:
+        try:
+            step.clean_dates()
+        except DjangoValidationError as e:
+            return {'date_start': e.messages}
+        return {}
+
+    def create(self, validated_data):
+        work = self.context['work']
+        steps = work.step_set.all()     # deleted steps keep cached work (and theme) for signal handlers
+        if validated_data.get('deletes'):
+            steps.filter(pk__in=validated_data['deletes']).delete()
+        steps.bulk_update(validated_data['updated_steps'], validated_data['updated_fields'])
+        return WorkStep.objects.bulk_create(validated_data['created_steps'])
+
+
 # GET
 class WorkStepCommentSerializer(serializers.ModelSerializer):
     step_id = serializers.PrimaryKeyRelatedField(read_only=False, queryset=WorkStep.objects.all(), source="step")
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from ...authentication.token import CachedTokenAuthentication, TokenCache, token_cache
+
+
+class TestCachedTokenAuthentication(TestCase):
+    """
+    Token -> user cache of token authentication
+
+    Mention: Cache is evicted on token deletion (logout) and on user change.
+    """
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username="curator", password="curator")
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def test_miss_then_hit(self):
+        stats = token_cache.stats()
+        with self.assertNumQueries(1):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(cached_user, user)
+        self.assertEqual(cached_user.username, "curator")
+        self.assertIsNot(cached_user, user)
+        self.assertEqual(cached_token.key, self.token.key)
+        self.assertEqual(token_cache.stats()["misses"], stats["misses"] + 1)
+        self.assertEqual(token_cache.stats()["hits"], stats["hits"] + 1)
+
+    def test_invalid_token(self):
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials("invalid")
+
+    def test_evict_on_token_delete(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_evict_on_user_deactivation(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_evict_on_logout(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        response = client.post("/api/v1/logout")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(token_cache.get(self.token.key))
+        response = client.post("/api/v1/logout")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_metrics(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.assertEqual(client.get("/api/v1/metrics/tokens").status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = client.get("/api/v1/metrics/tokens")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["misses"], token_cache.stats()["misses"])
+        self.assertEqual(response.data["size"], 1)
+        self.assertFalse(response.data["shared"])
+
+
+class TestTokenCache(TestCase):
+    """
+    LRU+TTL behavior of in-process token cache
+    """
+    def test_lru_bound(self):
+        cache = TokenCache(ttl=60, max_size=2, alias=None)
+        cache.set("a", (1, ), None)
+        cache.set("b", (2, ), None)
+        cache.get("a")
+        cache.set("c", (3, ), None)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_ttl(self):
+        cache = TokenCache(ttl=-1, max_size=2, alias=None)
+        cache.set("a", (1, ), None)
+        self.assertIsNone(cache.get("a"))
+
+    def test_evict_user(self):
+        cache = TokenCache(ttl=60, max_size=10, alias=None)
+        cache.set("a", (1, ), None)
+        cache.set("b", (1, ), None)
+        cache.set("c", (2, ), None)
+        cache.evict_user(1)
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.stats()["evictions"], 2)
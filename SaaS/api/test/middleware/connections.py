@@ -0,0 +1,59 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+
+from ...authentication.token import token_cache
+from ...middleware.connections import ConnectionMiddleware, connection_statistics
+
+
+class TestConnectionMiddleware(APITransactionTestCase):
+    """
+    Persistent connections are reused across requests, recycled after max age and after failed health checks
+
+    Mention: Test case is not atomic, connections in atomic blocks are left alone by the middleware.
+    """
+    def setUp(self):
+        token_cache.clear()
+        user = User.objects.create_user(username="staff", password="staff", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+        connection.ensure_connection()
+        connection.close_at = None      # CONN_MAX_AGE=None
+        connection_statistics.clear()
+
+    def tearDown(self):
+        connection.__dict__.pop('is_usable', None)
+
+    def get_metrics(self) -> dict:
+        response = self.client.get("/api/v1/metrics/connections")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_reused(self):
+        database_connection = connection.connection
+        for i in range(3):
+            metrics = self.get_metrics()
+        self.assertIs(connection.connection, database_connection)
+        self.assertEqual(metrics['connects'], 0)
+        self.assertEqual(metrics['requests'], 3)
+        self.assertEqual(metrics['reused'], 3)
+
+    def test_recycled_by_age(self):
+        connection.close_at = time.monotonic() - 1
+        self.get_metrics()
+        self.assertEqual(connection_statistics.snapshot()['recycled_age'], 1)
+
+    def test_health_check(self):
+        middleware = ConnectionMiddleware(lambda request: HttpResponse(), health_check_interval=0)
+        middleware(RequestFactory().get("/"))
+        connection.is_usable = lambda: False
+        middleware(RequestFactory().get("/"))
+        metrics = connection_statistics.snapshot()
+        self.assertEqual(metrics['health_checks'], 2)
+        self.assertEqual(metrics['health_check_failures'], 1)
@@ -0,0 +1,56 @@
+import re
+
+from django.test import override_settings
+from rest_framework import status
+
+from ...middleware.timing import SlowRequestLog, slow_requests
+from ..views.base import ViewTestCase
+
+
+@override_settings(DEBUG=False)
+class TestTimingMiddleware(ViewTestCase):
+    """
+    Server-Timing header and log of the slowest requests
+    """
+    def setUp(self):
+        super().setUp()
+        slow_requests.clear()
+        self.work = self.create_works(1)[0]
+        self.url = "/api/v1/curators/{}/works/{}/steps".format(self.curator.id, self.work.id)
+
+    def test_server_timing(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header = response['Server-Timing']
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="4 queries"')
+        for metric in ('serialize', 'render', 'total'):
+            self.assertRegex(header, metric + r';dur=[\d.]+')
+
+    def test_slow_requests(self):
+        self.client.get(self.url)
+        entry = slow_requests.snapshot()[0]
+        self.assertEqual(entry['path'], self.url)
+        self.assertEqual(entry['queries'], 4)
+        self.assertEqual(len(entry['sql']), 4)
+        self.assertTrue(re.match(r'SELECT', entry['sql'][0][0]))
+
+    def test_slow_requests_route(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get("/api/v1/metrics/requests").status_code, status.HTTP_403_FORBIDDEN)
+
+        self.curator.credentials.is_staff = True
+        self.curator.credentials.save()
+        response = self.client.get("/api/v1/metrics/requests")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(self.url, [entry['path'] for entry in response.data])
+
+
+class TestSlowRequestLog(ViewTestCase):
+    def test_bounded(self):
+        log = SlowRequestLog(size=3)
+        response = self.client.get("/api/v1/skills")
+        for total in (5, 1, 4, 2, 3):
+            timing = response.wsgi_request.timing
+            timing.started, timing.finished = 0, total
+            log.add(response.wsgi_request, response, timing)
+        self.assertEqual([entry['total'] for entry in log.snapshot()], [5, 4, 3])
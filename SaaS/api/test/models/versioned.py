@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.utils.timezone import localtime, timedelta
+
+from ...models.theme import Theme, Subject
+from ...models.skill import Skill
+
+
+class TestVersioned(TestCase):
+    """
+    Modification date and version tracking of versioned models (Theme as example)
+    """
+    def setUp(self):
+        self.subject = Subject.objects.create(name='Robotics')
+        self.theme = Theme.objects.create(title='T', description='D', subject=self.subject,
+                                          date_creation=localtime() - timedelta(days=1))
+
+    def test_create(self):
+        self.assertEqual(self.theme.version, 1)
+        self.assertIsNotNone(self.theme.date_update)
+
+    def test_save(self):
+        date_update = self.theme.date_update
+        self.theme.title = 'T1'
+        self.theme.save()
+        theme = Theme.objects.get(pk=self.theme.id)
+        self.assertEqual(theme.version, 2)
+        self.assertGreater(theme.date_update, date_update)
+
+    def test_save_update_fields(self):
+        self.theme.title = 'T1'
+        self.theme.save(update_fields=['title'])
+        self.assertEqual(Theme.objects.get(pk=self.theme.id).version, 2)
+
+    def test_queryset_update(self):
+        Theme.objects.filter(pk=self.theme.id).update(title='T1')
+        theme = Theme.objects.get(pk=self.theme.id)
+        self.assertEqual(theme.version, 2)
+        self.assertGreater(theme.date_update, self.theme.date_update)
+
+    def test_related_manager_update(self):
+        self.subject.theme_set.update(title='T1')
+        self.assertEqual(Theme.objects.get(pk=self.theme.id).version, 2)
+
+    def test_skills_change(self):
+        skill = Skill.objects.create(name='Cpp')
+        self.theme.skills.add(skill)
+        self.assertEqual(Theme.objects.get(pk=self.theme.id).version, 2)
+        skill.theme_set.remove(self.theme)
+        self.assertEqual(Theme.objects.get(pk=self.theme.id).version, 3)
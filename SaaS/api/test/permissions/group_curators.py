@@ -0,0 +1,60 @@
+from django.test import TestCase, RequestFactory
+from django.contrib.auth.models import User, Group
+
+from ...permissions.group_curators import IsMemberOfCuratorsGroup
+from ...permissions.roles import role_cache
+
+
+class TestIsMemberOfCuratorsGroup(TestCase):
+    """
+    Role resolution of curators group permission
+
+    Mention: Roles are resolved with at most one query per user,
+             cache is invalidated on group membership change.
+    """
+    def setUp(self):
+        role_cache.clear()
+        self.group_curators = Group.objects.create(name="curators")
+        self.user = User.objects.create_user(username="curator", password="curator")
+        self.user.groups.add(self.group_curators)
+        self.permission = IsMemberOfCuratorsGroup()
+
+    def has_permission(self, user) -> bool:
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=user.pk)     # new instance per request
+        return self.permission.has_permission(request, None)
+
+    def test_member(self):
+        with self.assertNumQueries(2):  # user, roles
+            self.assertTrue(self.has_permission(self.user))
+
+    def test_member_cached(self):
+        self.has_permission(self.user)
+        with self.assertNumQueries(1):  # user only
+            self.assertTrue(self.has_permission(self.user))
+
+    def test_not_member(self):
+        user = User.objects.create_user(username="student", password="student")
+        self.assertFalse(self.has_permission(user))
+
+    def test_invalidate_on_remove(self):
+        self.assertTrue(self.has_permission(self.user))
+        self.user.groups.remove(self.group_curators)
+        self.assertFalse(self.has_permission(self.user))
+
+    def test_invalidate_on_add_reverse(self):
+        user = User.objects.create_user(username="student", password="student")
+        self.assertFalse(self.has_permission(user))
+        self.group_curators.user_set.add(user)
+        self.assertTrue(self.has_permission(user))
+
+    def test_invalidate_on_clear_reverse(self):
+        self.assertTrue(self.has_permission(self.user))
+        self.group_curators.user_set.clear()
+        self.assertFalse(self.has_permission(self.user))
+
+    def test_invalidate_on_group_rename(self):
+        self.assertTrue(self.has_permission(self.user))
+        self.group_curators.name = "former curators"
+        self.group_curators.save()
+        self.assertFalse(self.has_permission(self.user))
@@ -0,0 +1,86 @@
+import datetime
+
+import pytz
+from rest_framework.renderers import JSONRenderer
+
+from ..views.base import ViewTestCase
+from ...models.curator import Curator
+from ...models.student import Student
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
+from ...models.theme import Theme
+from ...models.work import Work, WorkStep, WorkStepComment, WorkStepMaterial
+from ...serializers.compiled import CompiledSerializer, get_compiled_serializer
+from ...serializers.selection import FieldSelection, select_fields
+from ...serializers.curator import CuratorSerializerNoSkills, CuratorSerializerSkillsIntermediate
+from ...serializers.student import StudentSerializerSkillIDGroupIntermediate
+from ...serializers.theme import ThemeSerializerRelatedIntermediate
+from ...serializers.work import (WorkSerializerRelatedIntermediate, WorkStepSerializer,
+                                 WorkStepCommentSerializer, WorkStepMaterialSerializer)
+from ...serializers.suggestion import SuggestionThemeSerializerRelatedIntermediate
+
+
+class TestCompiledSerializer(ViewTestCase):
+    """
+    Compiled serializers render the same bytes as DRF serializers
+
+    Mention: Dataset has null foreign keys (theme without student, suggestion without progress)
+             and entries with empty many relations.
+    """
+    def setUp(self):
+        super().setUp()
+        self.create_works(2)
+        self.create_theme(self.curator)
+        self.create_theme()
+        status = SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+        progress = SuggestionThemeProgress.objects.create(title="P", description="D")
+        theme = Theme.objects.first()
+        SuggestionTheme.objects.create(theme=theme, student=self.student, curator=self.curator,
+                                       status=status, progress=progress)
+        SuggestionTheme.objects.create(theme=theme, curator=self.curator, status=status)
+
+    def assertRenderedEqual(self, serializer_class, queryset, selection: FieldSelection = None):
+        serializer = serializer_class(queryset, many=True)
+        compiled = get_compiled_serializer(serializer_class, selection)
+        if selection is not None:
+            select_fields(serializer, selection)
+        self.assertIsNotNone(compiled)
+        self.assertEqual(JSONRenderer().render(serializer.data), JSONRenderer().render(compiled.serialize(queryset)))
+
+    def test_flat(self):
+        self.assertRenderedEqual(CuratorSerializerNoSkills, Curator.objects.order_by('id'))
+        self.assertRenderedEqual(WorkStepCommentSerializer, WorkStepComment.objects.order_by('id'))
+        self.assertRenderedEqual(WorkStepMaterialSerializer, WorkStepMaterial.objects.order_by('id'))
+
+    def test_nested(self):
+        self.assertRenderedEqual(StudentSerializerSkillIDGroupIntermediate, Student.objects.order_by('id'))
+        self.assertRenderedEqual(ThemeSerializerRelatedIntermediate, Theme.objects.order_by('id'))
+        self.assertRenderedEqual(SuggestionThemeSerializerRelatedIntermediate, SuggestionTheme.objects.order_by('id'))
+        self.assertRenderedEqual(WorkSerializerRelatedIntermediate, Work.objects.order_by('id'))
+        self.assertRenderedEqual(WorkStepSerializer, WorkStep.objects.order_by('id'))
+
+    def test_selection(self):
+        self.assertRenderedEqual(ThemeSerializerRelatedIntermediate, Theme.objects.order_by('id'),
+                                 FieldSelection.from_params('id,title,skills'))
+        self.assertRenderedEqual(WorkSerializerRelatedIntermediate, Work.objects.order_by('id'),
+                                 FieldSelection.from_params('id,theme.title,theme.curator.name'))
+        self.assertRenderedEqual(SuggestionThemeSerializerRelatedIntermediate, SuggestionTheme.objects.order_by('id'),
+                                 FieldSelection.from_params(None, 'progress'))
+
+    def test_datetime_text(self):
+        """
+        SQLite datetimes are formatted from text: whole seconds and summer time offsets
+        """
+        step = WorkStep.objects.first()
+        WorkStepComment.objects.create(step=step, author_name="V", content="C",
+                                       date_creation=datetime.datetime(2010, 7, 1, 12, 30, tzinfo=pytz.utc))
+        WorkStepComment.objects.create(step=step, author_name="V", content="C",
+                                       date_creation=datetime.datetime(2010, 12, 1, 23, 59, 59, 5, tzinfo=pytz.utc))
+        self.assertRenderedEqual(WorkStepCommentSerializer, WorkStepComment.objects.order_by('id'))
+
+    def test_query_count(self):
+        compiled = CompiledSerializer(ThemeSerializerRelatedIntermediate())
+        with self.assertNumQueries(2):     # themes with joined relations, skills
+            compiled.serialize(Theme.objects.all())
+
+    def test_unsupported(self):
+        self.assertIsNone(get_compiled_serializer(CuratorSerializerSkillsIntermediate))
@@ -0,0 +1,79 @@
+from django.db import connection
+
+from rest_framework import status
+
+from ..views.base import ViewTestCase
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
+from ...models.theme import Theme
+from ...utils.acceptance import accept_suggestions
+from ...utils.reference_data import reference_data
+
+
+class TestAcceptance(ViewTestCase):
+    """
+    Acceptance of suggestions locks themes and runs the same statements for any number of suggestions
+    """
+    def setUp(self):
+        super().setUp()
+        for name in ("WAITING_STUDENT", "ACCEPTED_BOTH", "REJECTED_CURATOR"):
+            SuggestionThemeStatus.objects.create(name=name)
+        self.theme = self.create_theme(self.curator)
+        self.other_student = self.create_student("other_student")
+        self.suggestion = self.create_suggestion(self.theme, self.student,
+                                                 SuggestionThemeProgress.objects.create(title="New", description="ND"))
+        self.other = self.create_suggestion(self.theme, self.other_student)
+
+    def create_suggestion(self, theme: Theme, student, progress: SuggestionThemeProgress = None) -> SuggestionTheme:
+        return SuggestionTheme.objects.create(theme=theme, curator=self.curator, student=student, progress=progress,
+                                              status=SuggestionThemeStatus.objects.get(name="WAITING_STUDENT"))
+
+    def get_status(self, suggestion: SuggestionTheme) -> str:
+        return SuggestionTheme.objects.get(pk=suggestion.pk).status.name
+
+    def put(self, suggestion: SuggestionTheme):
+        return self.client.put("/api/v1/curators/{}/suggestions/{}".format(self.curator.id, suggestion.id),
+                               {'status_id': SuggestionThemeStatus.objects.get(name="ACCEPTED_BOTH").id}, format='json')
+
+    def test_accept(self):
+        response = self.put(self.suggestion)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status']['name'], "ACCEPTED_BOTH")
+        self.assertEqual((response.data['theme']['title'], response.data['theme']['description']), ("New", "ND"))
+
+        theme = Theme.objects.get(pk=self.theme.pk)
+        self.assertEqual((theme.title, theme.curator_id, theme.student_id), ("New", self.curator.id, self.student.id))
+        self.assertEqual(self.get_status(self.suggestion), "ACCEPTED_BOTH")
+        self.assertEqual(self.get_status(self.other), "REJECTED_CURATOR")
+
+    def test_taken(self):
+        self.assertEqual(self.put(self.suggestion).status_code, status.HTTP_202_ACCEPTED)
+        response = self.put(self.other)     # as the loser of concurrent accepts after the lock is released
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Theme.objects.get(pk=self.theme.pk).student_id, self.student.id)
+        self.assertEqual(self.get_status(self.other), "REJECTED_CURATOR")
+
+    def test_batch(self):
+        theme = self.create_theme(self.curator)
+        suggestions = [self.suggestion, self.other, self.create_suggestion(theme, self.other_student)]
+        acceptance = accept_suggestions(suggestions)
+        self.assertEqual(acceptance.accepted, [self.suggestion, suggestions[2]])
+        self.assertEqual(acceptance.taken, [self.other])
+        self.assertEqual(acceptance.rejected, [self.other.id])
+        self.assertEqual(Theme.objects.get(pk=theme.pk).student_id, self.other_student.id)
+
+    def test_query_count(self):
+        themes = [self.create_theme(self.curator) for i in range(3)]
+        suggestions = [self.create_suggestion(theme, self.student) for theme in themes]
+        reference_data.get_id(SuggestionThemeStatus, "ACCEPTED_BOTH")     # statuses are cached by process
+        index = 3 if connection.vendor == 'sqlite' else 2     # themes read, (delete), insert of search index
+        # savepoint, theme lock, rejected ids, themes, search index, suggestions, release (no progress)
+        with self.assertNumQueries(6 + index):
+            accept_suggestions(suggestions)
+        with self.assertNumQueries(7 + index):      # and progress
+            accept_suggestions([self.suggestion])
+
+    def test_search_index(self):
+        self.assertEqual(self.put(self.suggestion).status_code, status.HTTP_202_ACCEPTED)
+        response = self.client.get("/api/v1/themes/search", {'q': "New"})
+        self.assertEqual([result['entry']['id'] for result in response.data], [self.theme.id])
+        self.assertEqual(self.client.get("/api/v1/themes/search", {'q': "T"}).data, [])
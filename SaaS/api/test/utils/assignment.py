@@ -0,0 +1,50 @@
+import itertools
+import random
+
+from django.test import SimpleTestCase
+
+from ...utils.assignment import assign
+
+
+class TestAssignment(SimpleTestCase):
+    """
+    Matching assigns as many students as possible with maximal total score
+    """
+    def get_best(self, scores: dict, theme_curators: dict, capacities: dict) -> tuple:
+        """
+        (number of pairs, total score) of the best matching by brute force
+        """
+        students = sorted(scores)
+        best = (0, 0)
+        for themes in itertools.product(*[[None] + sorted(scores[student_id]) for student_id in students]):
+            chosen = [theme_id for theme_id in themes if theme_id is not None]
+            curators = [theme_curators[theme_id] for theme_id in chosen]
+            if len(set(chosen)) < len(chosen) or \
+                    any(curators.count(curator_id) > capacity for curator_id, capacity in capacities.items()):
+                continue
+            total = sum(scores[student_id][theme_id] for student_id, theme_id in zip(students, themes) if theme_id is not None)
+            best = max(best, (len(chosen), round(total, 6)))
+        return best
+
+    def test_optimal(self):
+        generator = random.Random(5)
+        for case in range(100):
+            themes = range(generator.randint(1, 5))
+            scores = {student_id: {theme_id: round(generator.random(), 3) for theme_id in themes if generator.random() < 0.6}
+                      for student_id in range(generator.randint(1, 5))}
+            theme_curators = {theme_id: generator.randint(0, 2) for theme_id in themes}
+            capacities = {curator_id: generator.randint(0, 2) for curator_id in range(3) if generator.random() < 0.5}
+            assignments = assign(scores, theme_curators, capacities)
+            self.assertEqual((len(assignments), round(sum(assignment.score for assignment in assignments), 6)),
+                             self.get_best(scores, theme_curators, capacities), case)
+
+    def test_cardinality_first(self):
+        # the only theme of the second student goes to it, though the first one fits it better
+        scores = {1: {10: 0.9, 11: 0.1}, 2: {10: 0.2}}
+        self.assertEqual([(assignment.student_id, assignment.theme_id) for assignment in assign(scores, {10: 1, 11: 1})],
+                         [(1, 11), (2, 10)])
+
+    def test_candidates(self):
+        scores = {1: {10: 0.9, 11: 0.5, 12: 0.1}, 2: {10: 0.8, 11: 0.7, 12: 0.6}}
+        assignments = assign(scores, {10: 1, 11: 1, 12: 1}, candidates=1)
+        self.assertEqual([(assignment.student_id, assignment.theme_id) for assignment in assignments], [(1, 10)])
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from ...authentication.token import token_cache
+from ...permissions.roles import role_cache
+from ...utils.benchmark.dataset import Dataset
+from ...utils.benchmark.routes import PAYLOADS, get_routes
+from ...utils.benchmark.runner import Runner, compare, percentile
+from ...utils.benchmark.serializers import SERIALIZERS, benchmark_serializers
+from ...utils.benchmark.contention import benchmark_contention
+
+
+class TestBenchmark(TestCase):
+    """
+    Every api route is reachable with seeded dataset
+    """
+    def setUp(self):
+        token_cache.clear()
+        role_cache.clear()
+        self.dataset = Dataset(scale=1).seed()
+        self.routes = get_routes()
+
+    def test_get_routes(self):
+        routes = [route for route in self.routes if not route.is_write]
+        results = Runner(self.dataset, routes, iterations=1, warmup=0).run()
+        self.assertEqual(len(results), len(routes))
+        for name, result in results.items():
+            self.assertEqual(result['statuses'], [200], name)
+
+    def test_write_payloads(self):
+        routes = {(route.pattern, route.method) for route in self.routes if route.method in ('post', 'put')}
+        self.assertEqual(routes - set(PAYLOADS), {('logout', 'post')})
+
+    def test_serializers(self):
+        results = benchmark_serializers(iterations=1)
+        self.assertEqual(len(results), len(SERIALIZERS))
+        for name, result in results.items():
+            self.assertGreater(result['entries'], 0, name)
+
+    def test_contention(self):
+        result = benchmark_contention(themes=2, students=3, threads=1)
+        self.assertEqual((result['requests'], result['accepted'], result['taken'], result['errors']), (6, 2, 4, 0))
+
+
+class TestBenchmarkReport(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 90), 5)
+
+    def test_compare(self):
+        baseline = {'GET works': {'p50': 10, 'p90': 20, 'queries': 2, 'statuses': [200]}}
+        results = {'GET works': {'p50': 11, 'p90': 40, 'queries': 3, 'statuses': [200]}}
+        regressions = compare(results, baseline, tolerance=0.5)
+        self.assertEqual(regressions, ["GET works: queries 2 -> 3", "GET works: p90 20.00ms -> 40.00ms"])
@@ -0,0 +1,30 @@
+from django.test import TestCase
+
+from ...utils.benchmark.dataset import Dataset
+from ...utils.benchmark.plans import ORDERED_QUERIES, explain, get_full_scans, get_hot_queries, has_sort
+
+
+class TestQueryPlans(TestCase):
+    """
+    Hot lookups of views are index range scans on seeded dataset (EXPLAIN)
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = Dataset(scale=1).seed()
+
+    def setUp(self):
+        self.queries = get_hot_queries(self.dataset.ids)
+
+    def test_no_full_scans(self):
+        for name, queryset in self.queries.items():
+            plan = explain(queryset)
+            self.assertEqual(get_full_scans(plan), [], "{}:\n{}".format(name, plan))
+
+    def test_ordered_pages(self):
+        for name in ORDERED_QUERIES:
+            plan = explain(self.queries[name])
+            self.assertFalse(has_sort(plan), "{}:\n{}".format(name, plan))
+
+    def test_full_scan_detected(self):
+        plan = explain(self.queries['curator themes'].model.objects.filter(title="T"))
+        self.assertEqual(get_full_scans(plan), ['Theme'])
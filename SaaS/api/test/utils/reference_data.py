@@ -0,0 +1,48 @@
+from django.test import TestCase
+
+from ...models.suggestion import SuggestionThemeStatus
+from ...serializers.suggestion import SuggestionThemeStatusSerializer
+from ...utils.reference_data import ReferenceRegistry
+
+
+class TestReferenceRegistry(TestCase):
+    """
+    Lookups of reference data registry
+
+    Mention: Table is loaded once, reloaded after save/delete of its rows.
+    """
+    def setUp(self):
+        self.registry = ReferenceRegistry()
+        self.table = self.registry.register(SuggestionThemeStatus, SuggestionThemeStatusSerializer)
+        self.status = SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+
+    def tearDown(self):
+        self.table.invalidate()
+
+    def test_get_id(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.registry.get_id(SuggestionThemeStatus, "WAITING_STUDENT"), self.status.id)
+            self.assertEqual(self.registry.get_id(SuggestionThemeStatus, "WAITING_STUDENT"), self.status.id)
+
+    def test_get_missing(self):
+        with self.assertRaises(SuggestionThemeStatus.DoesNotExist):
+            self.registry.get(SuggestionThemeStatus, "ACCEPTED_BOTH")
+
+    def test_invalidate_on_save(self):
+        version = self.table.version
+        etag = self.table.etag
+        SuggestionThemeStatus.objects.create(name="ACCEPTED_BOTH")
+        self.assertGreater(self.table.version, version)
+        self.assertIsNotNone(self.registry.get(SuggestionThemeStatus, "ACCEPTED_BOTH"))
+        self.assertNotEqual(self.table.etag, etag)
+
+    def test_invalidate_on_delete(self):
+        self.registry.get(SuggestionThemeStatus, "WAITING_STUDENT")
+        self.status.delete()
+        with self.assertRaises(SuggestionThemeStatus.DoesNotExist):
+            self.registry.get(SuggestionThemeStatus, "WAITING_STUDENT")
+
+    def test_etag_stable(self):
+        etag = self.table.etag
+        self.table.invalidate()
+        self.assertEqual(self.table.etag, etag)
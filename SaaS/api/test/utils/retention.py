@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils.timezone import localtime, timedelta
+
+from rest_framework.authtoken.models import Token
+
+from ..views.base import ViewTestCase
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress, \
+    SuggestionThemeComment
+from ...utils.retention import RETENTION_TASKS, run_task
+
+
+class TestRetention(ViewTestCase):
+    """
+    Retention command deletes by small batches and archives deleted suggestions
+    """
+    def setUp(self):
+        super().setUp()
+        statuses = {name: SuggestionThemeStatus.objects.create(name=name)
+                    for name in ("WAITING_STUDENT", "REJECTED_CURATOR", "REJECTED_STUDENT")}
+        theme = self.create_theme(self.curator)
+        self.suggestions = {}
+        for name, days in (("WAITING_STUDENT", 60), ("REJECTED_CURATOR", 60), ("REJECTED_STUDENT", 60),
+                           ("REJECTED_CURATOR", 1)):
+            suggestion = SuggestionTheme.objects.create(
+                theme=theme, curator=self.curator, student=self.student, status=statuses[name],
+                progress=SuggestionThemeProgress.objects.create(title="P", description="D"))
+            SuggestionTheme.objects.filter(pk=suggestion.pk).update(date_update=localtime() - timedelta(days=days))
+            SuggestionThemeComment.objects.create(suggestion=suggestion, author_name="V", content="C")
+            self.suggestions[(name, days)] = suggestion
+
+        now = localtime()
+        Session.objects.create(session_key="expired", session_data="", expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key="active", session_data="", expire_date=now + timedelta(days=1))
+        User.objects.filter(pk=self.student.credentials_id).update(last_login=now - timedelta(days=100))
+        Token.objects.create(user=self.student.credentials)
+        User.objects.filter(pk=self.curator.credentials_id).update(last_login=now)
+
+    def test_command(self):
+        path = os.path.join(tempfile.mkdtemp(), "archive.ndjson")
+        output = StringIO()
+        call_command('retention', '--batch-size', '1', '--archive', path, stdout=output)
+        self.assertEqual(output.getvalue().splitlines(), [
+            "rejected_suggestions: 2 deleted.", "orphaned_progress: 2 deleted.",
+            "expired_sessions: 1 deleted.", "idle_tokens: 1 deleted."])
+
+        self.assertEqual(set(SuggestionTheme.objects.values_list('id', flat=True)),
+                         {self.suggestions[("WAITING_STUDENT", 60)].id, self.suggestions[("REJECTED_CURATOR", 1)].id})
+        self.assertEqual(SuggestionThemeProgress.objects.count(), 2)
+        self.assertEqual(SuggestionThemeComment.objects.count(), 2)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ["active"])
+        self.assertEqual(list(Token.objects.values_list('user_id', flat=True)), [self.curator.credentials_id])
+
+        with open(path, encoding='utf8') as file:
+            kinds = [json.loads(line)['type'] for line in file]
+        self.assertEqual(sorted(kinds), ["suggestion"] * 2 + ["suggestion_comment"] * 2 + ["suggestion_progress"] * 2)
+
+    def test_dry_run(self):
+        counts = {task.name: run_task(task, dry_run=True) for task in RETENTION_TASKS}
+        self.assertEqual(counts, {'rejected_suggestions': 2, 'orphaned_progress': 0,
+                                  'expired_sessions': 1, 'idle_tokens': 1})
+        self.assertEqual(SuggestionTheme.objects.count(), 4)
+
+    def test_rejected_days(self):
+        task = RETENTION_TASKS[0]
+        self.assertEqual(run_task(task, rejected_days=0), 3)
+        self.assertEqual(list(SuggestionTheme.objects.values_list('id', flat=True)),
+                         [self.suggestions[("WAITING_STUDENT", 60)].id])
@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ...models.curator import Curator
+from ...models.skill import Skill
+from ...models.student import Student
+from ...models.student import Group as AcademicGroup
+from ...models.theme import Subject, Theme
+from ...utils.scripts.db.models import migrate_to_db, migrate_to_db_user, link_related_to_man
+
+
+class TestSeeding(TestCase):
+    """
+    Chunked loading of test data from csv files
+
+    Mention: Query count depends on number of chunks, not on number of rows.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_csv(self, name: str, lines: list) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf8') as file:
+            file.write("\n".join(lines) + "\n")
+        return path
+
+    def test_migrate_to_db(self):
+        path = self.write_csv('skill.csv', ["name"] + ["skill {}".format(i) for i in range(25)])
+        with CaptureQueriesContext(connection) as context:
+            migrate_to_db(Skill.objects, path, chunk_size=10, use_copy=False)
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)   # 3 chunks of at most 10 entries
+        self.assertEqual(Skill.objects.count(), 25)
+
+    def test_migrate_to_db_related(self):
+        Subject.objects.create(name="Робототехника")
+        path = self.write_csv('theme.csv', [
+            "title,description,date_creation,date_acceptance",
+            "Робот,Описание,2018-05-09T19:17:25.473086Z,",
+            "Сайт,Описание,2018-05-10T19:17:25.473086Z,2018-05-11T19:17:25.473086Z",
+        ])
+        migrate_to_db(Theme.objects, path, Subject.objects, "subject_id", "id", use_copy=False)
+
+        themes = Theme.objects.order_by('title')
+        self.assertEqual([theme.title for theme in themes], ["Робот", "Сайт"])
+        self.assertIsNone(themes[0].date_acceptance)
+        self.assertIsNotNone(themes[1].date_acceptance)
+        self.assertTrue(all(theme.subject_id for theme in themes))
+
+    def test_migrate_to_db_user(self):
+        group = Group.objects.create(name="curators")
+        path = self.write_csv('curator.csv', [
+            "last_name,name,patronymic,description",
+            "Иванов,Иван,Иванович,Описание",
+            "Петров,Пётр,Петрович,Описание",
+        ])
+        migrate_to_db_user(Curator.objects, User.objects, group, path, hash_passwords=False)
+
+        curator = Curator.objects.select_related('credentials').get(last_name="Иванов")
+        self.assertEqual(curator.credentials.username, "Иван.Иванов.Иванович")
+        self.assertEqual(User.objects.filter(groups=group).count(), 2)
+
+    def test_link_related_to_man(self):
+        group = Group.objects.create(name="students")
+        path = self.write_csv('student.csv', [
+            "last_name,name,patronymic,description,course_number",
+            "Иванов,Иван,Иванович,Описание,1",
+            "Петров,Пётр,Петрович,Описание,2",
+        ])
+        migrate_to_db_user(Student.objects, User.objects, group, path, hash_passwords=False)
+        skills = [Skill.objects.create(name="skill {}".format(i)) for i in range(3)]
+        academic_groups = [AcademicGroup.objects.create(name="group {}".format(i)) for i in range(2)]
+
+        link_related_to_man(list(Student.objects.all()), skills, academic_groups)
+        for student in Student.objects.all():
+            self.assertTrue(1 <= student.skills.count() <= 3)
+            self.assertIsNotNone(student.group_id)
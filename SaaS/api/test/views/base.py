@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User, Group
+from django.utils.timezone import localtime, timedelta
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from ...authentication.token import token_cache
+from ...permissions.roles import role_cache
+from ...utils.summary import summary_cache
+from ...utils.recommendation import theme_skill_index
+from ...models.curator import Curator
+from ...models.student import Student, Group as AcademicGroup
+from ...models.skill import Skill
+from ...models.theme import Theme, Subject
+from ...models.work import Work, WorkStep, WorkStepStatus, WorkStepComment, WorkStepMaterial
+
+
+class ViewTestCase(APITestCase):
+    """
+    Base of api views tests
+
+    Mention: Creates curator and student with credentials,
+             authenticates client with curator token.
+    """
+    def setUp(self):
+        token_cache.clear()
+        role_cache.clear()
+        summary_cache.clear()
+        theme_skill_index.invalidate()
+        self.group_curators = Group.objects.create(name="curators")
+        self.group_students = Group.objects.create(name="students")
+        self.academic_group = AcademicGroup.objects.create(name="11-601")
+        self.subject = Subject.objects.create(name="Robotics")
+        self.skills = [Skill.objects.create(name="Cpp"), Skill.objects.create(name="Python")]
+        self.step_status = WorkStepStatus.objects.create(name="В процессе")
+
+        self.curator = self.create_curator("curator")
+        self.student = self.create_student("student")
+
+        self.token = Token.objects.create(user=self.curator.credentials)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+
+    def create_curator(self, username: str) -> Curator:
+        user = User.objects.create_user(username=username, password=username)
+        user.groups.add(self.group_curators)
+        return Curator.objects.create(credentials=user, name="V", last_name="P", patronymic="V", description="D")
+
+    def create_student(self, username: str) -> Student:
+        user = User.objects.create_user(username=username, password=username)
+        user.groups.add(self.group_students)
+        return Student.objects.create(credentials=user, name="V", last_name="P", patronymic="V", description="D",
+                                      course_number=3, group=self.academic_group)
+
+    def create_theme(self, curator: Curator = None, student: Student = None) -> Theme:
+        theme = Theme.objects.create(title="T", description="D", subject=self.subject,
+                                     curator=curator, student=student,
+                                     date_creation=localtime() - timedelta(days=10))
+        theme.skills.add(*self.skills)
+        return theme
+
+    def create_work(self, theme: Theme) -> Work:
+        return Work.objects.create(theme=theme, date_start=localtime() - timedelta(days=5))
+
+    def create_step(self, work: Work) -> WorkStep:
+        step = WorkStep.objects.create(work=work, status=self.step_status, title="S", description="D",
+                                       date_start=localtime() - timedelta(days=4),
+                                       date_finish=localtime() + timedelta(days=4))
+        WorkStepComment.objects.create(step=step, author_name="V", content="C")
+        WorkStepMaterial.objects.create(step=step, content="http://example.com/")
+        return step
+
+    def create_works(self, count: int, curator: Curator = None, student: Student = None) -> list:
+        works = []
+        for i in range(count):
+            work = self.create_work(self.create_theme(curator or self.curator, student or self.student))
+            self.create_step(work)
+            self.create_step(work)
+            works.append(work)
+        return works
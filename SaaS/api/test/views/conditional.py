@@ -0,0 +1,119 @@
+from django.utils.http import http_date
+from django.utils.timezone import localtime, timedelta
+
+from rest_framework import status
+
+from ...models.curator import Curator
+from ...models.skill import Skill
+from ...models.work import Work, WorkStep
+
+from .base import ViewTestCase
+
+
+class TestConditionalGet(ViewTestCase):
+    """
+    ETag/Last-Modified of curator/student detail and list views
+
+    Mention: Not modified response is computed by one aggregate query (token, roles are cached).
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(3)
+        self.work = self.works[0]
+        self.work_url = "/api/v1/curators/{}/works/{}".format(self.curator.id, self.work.id)
+        self.works_url = "/api/v1/curators/{}/works".format(self.curator.id)
+
+    def test_detail_etag(self):
+        response = self.client.get(self.work_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.work_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_detail_modified_since(self):
+        last_modified = self.client.get(self.work_url)["Last-Modified"]
+        response = self.client.get(self.work_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        since = http_date((localtime() - timedelta(days=1)).timestamp())
+        response = self.client.get(self.work_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_modified(self):
+        etag = self.client.get(self.work_url)["ETag"]
+        self.work.theme.title = "T1"
+        self.work.theme.save()
+        response = self.client.get(self.work_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["theme"]["title"], "T1")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_not_found(self):
+        response = self.client.get("/api/v1/curators/{}/works/0".format(self.curator.id), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_etag(self):
+        response = self.client.get(self.works_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.works_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Work.objects.filter(pk=self.works[1].id).update(date_finish=localtime())
+        response = self.client.get(self.works_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_after_delete(self):
+        etag = self.client.get(self.works_url)["ETag"]
+        self.works[2].delete()
+        response = self.client.get(self.works_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_student_step_list_etag(self):
+        url = "/api/v1/students/{}/works/{}/steps".format(self.student.id, self.work.id)
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        step = WorkStep.objects.filter(work=self.work).first()
+        step.title = "S1"
+        step.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_nested_renamed(self):
+        etag = self.client.get(self.works_url)["ETag"]
+        self.curator.name = "N"
+        self.curator.save()
+        response = self.client.get(self.works_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["theme"]["curator"]["name"], "N")
+
+        etag = self.client.get(self.work_url)["ETag"]
+        Skill.objects.filter(pk=self.skills[0].id).update(name="C")    # lookup rows are unversioned
+        response = self.client.get(self.work_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("C", [skill["name"] for skill in response.data["theme"]["skills"]])
+
+    def test_nested_deleted(self):
+        url = "/api/v1/students/{}/works".format(self.student.id)
+        etag = self.client.get(url)["ETag"]
+        Curator.objects.filter(pk=self.curator.id).delete()     # themes keep no curator (SET_NULL)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data[0]["theme"]["curator"])
+
+        url = "/api/v1/students/{}/works/{}".format(self.student.id, self.work.id)
+        etag = self.client.get(url)["ETag"]
+        Skill.objects.filter(pk=self.skills[0].id).delete()     # themes lose skill (cascade of m2m rows)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.skills[0].id, [skill["id"] for skill in response.data["theme"]["skills"]])
@@ -0,0 +1,367 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, timedelta
+
+from rest_framework import status
+
+from ...models.theme import Theme
+from ...models.work import WorkStep, WorkStepComment
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeComment
+from .base import ViewTestCase
+
+
+class TestCuratorWorkViews(ViewTestCase):
+    """
+    Query budget of curator related work views
+
+    Mention: Budget includes token authentication and role resolution,
+             it must not depend on the number of related themes, works, steps.
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(5)
+        self.work = self.works[0]
+        self.step = self.work.step_set.first()
+        self.create_works(2, curator=self.create_curator("other_curator"))   # must not be listed
+
+    def test_work_list(self):
+        url = "/api/v1/curators/{}/works".format(self.curator.id)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([work["id"] for work in response.data], [work.id for work in self.works])
+        self.assertEqual(len(response.data[0]["theme"]["skills"]), len(self.skills))
+
+        self.create_works(5)
+        with self.assertNumQueries(3):     # token, roles are cached
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 10)
+
+    def test_work_step_list(self):
+        url = "/api/v1/curators/{}/works/{}/steps".format(self.curator.id, self.work.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]["status"]["id"], self.step_status.id)
+
+    def test_work_step_material_list(self):
+        url = "/api/v1/curators/{}/works/{}/steps/{}/materials".format(self.curator.id, self.work.id, self.step.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_work_step_comment_list(self):
+        url = "/api/v1/curators/{}/works/{}/steps/{}/comments".format(self.curator.id, self.work.id, self.step.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_foreign_work_step_list(self):
+        other_work = self.create_works(1, curator=self.create_curator("third_curator"))[0]
+        url = "/api/v1/curators/{}/works/{}/steps".format(self.curator.id, other_work.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestCuratorListPagination(ViewTestCase):
+    """
+    Opt-in cursor pagination of hand-written curator lists
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(5)
+
+    def test_work_list_paginated(self):
+        url = "/api/v1/curators/{}/works?page_size=2".format(self.curator.id)
+        received = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            received.extend(work["id"] for work in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(received, [work.id for work in self.works])
+
+    def test_theme_list_paginated(self):
+        url = "/api/v1/curators/{}/themes?page_size=4".format(self.curator.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_theme_list_same_date(self):
+        Theme.objects.update(date_creation=localtime() - timedelta(days=1))    # pages by id within the date
+        expected = sorted((work.theme_id for work in self.works), reverse=True)
+        url, received, pages = "/api/v1/curators/{}/themes?page_size=2".format(self.curator.id), [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse(any("OFFSET" in query['sql'] for query in queries))
+            received.extend(theme["id"] for theme in response.data["results"])
+            pages.append(response.data)
+            url = response.data["next"]
+        self.assertEqual(received, expected)
+
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual([theme["id"] for theme in response.data["results"]], expected[2:4])
+        self.assertEqual(self.client.get(response.data["previous"]).data["results"], pages[0]["results"])
+
+
+class TestCuratorCommentThreadPagination(ViewTestCase):
+    """
+    Comment threads newest first with 'before'/'after' cursors on (date_creation, id)
+    """
+    def setUp(self):
+        super().setUp()
+        self.step = self.create_works(1)[0].step_set.order_by('id').first()
+        date = localtime() - timedelta(days=1)
+        for i in range(6):     # pairs of comments with the same date, ties are resolved by id
+            WorkStepComment.objects.create(step=self.step, author_name="V", content=str(i),
+                                           date_creation=date + timedelta(minutes=i // 2))
+        self.comments = list(self.step.comment_set.order_by('-date_creation', '-id').values_list('id', flat=True))
+        self.url = "/api/v1/curators/{}/works/{}/steps/{}/comments".format(
+            self.curator.id, self.step.work_id, self.step.id)
+
+    def get(self, **params) -> dict:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_before(self):
+        received, params = [], {'page_size': 2}
+        while True:
+            data = self.get(**params)
+            received.extend(comment['id'] for comment in data['results'])
+            if data['before'] is None:
+                break
+            params['before'] = data['before']
+        self.assertEqual(received, self.comments)
+
+    def test_after(self):
+        page = self.get(page_size=3)
+        comment = WorkStepComment.objects.create(step=self.step, author_name="V", content="New")
+        data = self.get(after=page['after'])
+        self.assertEqual([entry['id'] for entry in data['results']], [comment.id])
+        self.assertEqual(self.get(after=data['after'])['results'], [])
+
+        data = self.get(after=self.get(page_size=3, before=page['before'])['after'], page_size=2)
+        self.assertEqual([entry['id'] for entry in data['results']], self.comments[1:3])   # oldest newer comments
+
+    def test_cursor_in_query_string(self):
+        received, url = [], self.url + "?page_size=1"
+        while url:
+            response = self.client.get(url)
+            received.extend(comment['id'] for comment in response.data['results'])
+            self.assertRegex(response.data['after'], r'^[\w=-]+$')
+            url = response.data['before'] and self.url + "?page_size=1&before=" + response.data['before']
+        self.assertEqual(received, self.comments)
+
+    def test_query_count(self):
+        before = self.get(page_size=2)['before']
+        with self.assertNumQueries(2):     # step, page
+            self.get(page_size=2, before=before)
+
+    def test_unpaginated(self):
+        self.assertEqual([comment['id'] for comment in self.get()], sorted(self.comments))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'before': "cursor"}).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_suggestion_comments(self):
+        suggestion = SuggestionTheme.objects.create(
+            theme=self.step.work.theme, curator=self.curator, student=self.student,
+            status=SuggestionThemeStatus.objects.create(name="WAITING_STUDENT"))
+        comments = [SuggestionThemeComment.objects.create(suggestion=suggestion, author_name="V", content=str(i)).id
+                    for i in range(3)]
+        url = "/api/v1/curators/{}/suggestions/{}/comments".format(self.curator.id, suggestion.id)
+        data = self.client.get(url, {'page_size': 2}).data
+        self.assertEqual([comment['id'] for comment in data['results']], comments[:0:-1])
+        data = self.client.get(url, {'page_size': 2, 'before': data['before']}).data
+        self.assertEqual(([comment['id'] for comment in data['results']], data['before']), (comments[:1], None))
+
+
+class TestCuratorWorkStepBulk(ViewTestCase):
+    """
+    Bulk create/update/delete of curator related work steps
+    """
+    def setUp(self):
+        super().setUp()
+        self.work = self.create_works(1)[0]
+        self.steps = list(self.work.step_set.order_by('id'))
+        self.url = "/api/v1/curators/{}/works/{}/steps/bulk".format(self.curator.id, self.work.id)
+
+    def get_step_data(self, title: str, days_start: int = -3, days_finish: int = 3) -> dict:
+        return {
+            "title": title, "description": "D",
+            "date_start": (localtime() + timedelta(days=days_start)).isoformat(),
+            "date_finish": (localtime() + timedelta(days=days_finish)).isoformat(),
+        }
+
+    def test_bulk(self):
+        data = {
+            "creates": [self.get_step_data("S{}".format(i)) for i in range(20)],
+            "updates": [{"id": self.steps[0].id, "title": "Updated"}],
+            "deletes": [self.steps[1].id],
+        }
+        with self.assertNumQueries(14):    # does not depend on number of steps
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 21)
+        self.assertEqual(response.data[0]["title"], "Updated")
+        self.assertEqual(response.data[1]["status"]["id"], self.step_status.id)
+
+        step = WorkStep.objects.get(pk=self.steps[0].id)
+        self.assertEqual(step.version, self.steps[0].version + 1)
+        self.assertFalse(WorkStep.objects.filter(pk=self.steps[1].id).exists())
+
+    def test_bulk_invalid_dates(self):
+        data = {
+            "creates": [self.get_step_data("S1"), self.get_step_data("S2", days_start=3, days_finish=-3)],
+            "updates": [{"id": self.steps[0].id, "date_start": (localtime() + timedelta(days=1)).isoformat()}],
+            "deletes": [self.steps[1].id],
+        }
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["creates"][0], {})
+        self.assertIn("date_start", response.data["creates"][1])
+        self.assertIn("date_start", response.data["updates"][0])
+        # nothing is written
+        self.assertEqual(self.work.step_set.count(), 2)
+
+    def test_bulk_foreign_step(self):
+        other_step = self.create_works(1, curator=self.create_curator("other_curator"))[0].step_set.first()
+        response = self.client.post(self.url, {"deletes": [other_step.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(WorkStep.objects.filter(pk=other_step.id).exists())
+
+
+class TestCuratorSuggestionBulk(ViewTestCase):
+    """
+    Status transitions of many suggestions by set-based statements in one transaction
+    """
+    def setUp(self):
+        super().setUp()
+        self.statuses = {name: SuggestionThemeStatus.objects.create(name=name).id
+                         for name in ("WAITING_CURATOR", "IN_PROGRESS_CURATOR", "REJECTED_CURATOR", "ACCEPTED_BOTH")}
+        self.themes = [self.create_theme(self.curator) for i in range(2)]
+        self.other_student = self.create_student("other_student")
+        self.suggestions = [SuggestionTheme.objects.create(theme=theme, curator=self.curator, student=student,
+                                                           status_id=self.statuses["WAITING_CURATOR"])
+                            for theme in self.themes for student in (self.student, self.other_student)]
+        self.url = "/api/v1/curators/{}/suggestions/bulk".format(self.curator.id)
+
+    def post(self, *transitions):
+        return self.client.post(self.url, {'transitions': [{'id': suggestion.id, 'status_id': self.statuses[name]}
+                                                           for suggestion, name in transitions]}, format='json')
+
+    def test_bulk(self):
+        first, first_other, second, second_other = self.suggestions
+        response = self.post((first_other, "IN_PROGRESS_CURATOR"), (first, "ACCEPTED_BOTH"),
+                             (second, "IN_PROGRESS_CURATOR"), (second_other, "ACCEPTED_BOTH"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(entry['id'], entry['result']) for entry in response.data], [
+            (first_other.id, 'rejected'), (first.id, 'changed'), (second.id, 'rejected'), (second_other.id, 'changed')])
+
+        changed = SuggestionTheme.objects.in_bulk([suggestion.id for suggestion in self.suggestions])
+        self.assertEqual([changed[suggestion.id].status_id for suggestion in self.suggestions], [
+            self.statuses["ACCEPTED_BOTH"], self.statuses["REJECTED_CURATOR"],
+            self.statuses["REJECTED_CURATOR"], self.statuses["ACCEPTED_BOTH"]])
+        self.assertEqual(Theme.objects.get(pk=self.themes[1].pk).student_id, self.other_student.id)
+
+    def test_query_count(self):
+        # token, roles, curator, savepoint, statuses, suggestions, update, release
+        with self.assertNumQueries(8):     # does not depend on number of suggestions
+            response = self.post(*((suggestion, "REJECTED_CURATOR") for suggestion in self.suggestions))
+        self.assertEqual({entry['result'] for entry in response.data}, {'changed'})
+
+    def test_progress(self):
+        response = self.post(*((suggestion, "IN_PROGRESS_CURATOR") for suggestion in self.suggestions))
+        self.assertEqual({entry['result'] for entry in response.data}, {'changed'})
+        progress_ids = [suggestion.progress_id for suggestion in SuggestionTheme.objects.order_by('id')]
+        self.assertEqual(len(set(progress_ids) - {None}), 4)
+
+    def test_taken(self):
+        first, first_other = self.suggestions[:2]
+        self.post((first, "ACCEPTED_BOTH"))
+        response = self.post((first_other, "ACCEPTED_BOTH"))
+        self.assertEqual(response.data, [{'id': first_other.id, 'status_id': self.statuses["REJECTED_CURATOR"],
+                                          'result': 'taken'}])
+
+    def test_foreign_suggestion(self):
+        theme = self.create_theme()
+        other = SuggestionTheme.objects.create(theme=theme, curator=self.create_curator("other_curator"),
+                                               student=self.student, status_id=self.statuses["WAITING_CURATOR"])
+        response = self.post((self.suggestions[0], "IN_PROGRESS_CURATOR"), (other, "IN_PROGRESS_CURATOR"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SuggestionTheme.objects.get(pk=self.suggestions[0].pk).status_id,
+                         self.statuses["WAITING_CURATOR"])
+
+
+class TestCuratorSummary(ViewTestCase):
+    """
+    Counters of curator dashboard, computed by constant number of queries and cached
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(3)
+        self.create_theme(self.curator)     # free
+        self.other = self.create_curator("other_curator")
+        self.create_works(2, curator=self.other)   # must not be counted
+        self.works[0].date_finish = localtime() - timedelta(days=1)
+        self.works[0].save()
+        WorkStep.objects.filter(work=self.works[1]).update(date_finish=localtime() - timedelta(days=1))
+
+        waiting = SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+        SuggestionThemeStatus.objects.create(name="ACCEPTED_BOTH")
+        for work in self.works[:2]:
+            SuggestionTheme.objects.create(theme=work.theme, curator=self.curator, student=self.student,
+                                           status=waiting)
+        self.url = "/api/v1/curators/{}/summary".format(self.curator.id)
+
+    def test_summary(self):
+        with self.assertNumQueries(8):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'themes': {'free': 1, 'taken': 3},
+            'works': {'active': 2, 'finished': 1},
+            'suggestions': {'WAITING_STUDENT': 2, 'ACCEPTED_BOTH': 0},
+            'steps': {'overdue': 2},
+        })
+
+        self.create_works(5)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['works']['active'], 7)
+        with self.assertNumQueries(1):     # token, roles, summary are cached
+            response = self.client.get(self.url)
+
+    def test_summary_invalidated_by_update(self):
+        self.client.get(self.url)
+        Theme.objects.filter(curator=self.curator).update(student=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['themes'], {'free': 4, 'taken': 0})
+
+    def test_summary_invalidated_per_curator(self):
+        other_url = "/api/v1/curators/{}/summary".format(self.other.id)
+        self.client.get(self.url)
+        self.client.get(other_url)
+        step = self.works[2].step_set.first()
+        step.date_finish = localtime() - timedelta(days=1)
+        step.save()
+        Theme.objects.filter(curator=self.curator).update(title="Renamed")    # not counted
+        with self.assertNumQueries(1):     # summary of other curator is kept
+            self.client.get(other_url)
+        self.assertEqual(self.client.get(self.url).data['steps'], {'overdue': 3})
+
+        theme = self.works[0].theme     # moved theme changes summaries of both curators
+        theme.curator = self.other
+        theme.save()
+        self.assertEqual(self.client.get(self.url).data['works'], {'active': 2, 'finished': 0})
+        self.assertEqual(self.client.get(other_url).data['works'], {'active': 2, 'finished': 1})
+
+    def test_missing_curator(self):
+        response = self.client.get("/api/v1/curators/0/summary")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
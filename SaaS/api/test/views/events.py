@@ -0,0 +1,117 @@
+import itertools
+import json
+from unittest import mock
+
+from django.db import connection
+
+from rest_framework import status
+
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeComment
+from ...models.work import WorkStepComment
+from ...utils.events import event_bus
+from ...views.events import stream_slots
+from .base import ViewTestCase
+
+
+class TestEventStream(ViewTestCase):
+    """
+    Server-sent events of suggestions and comments, published after commit
+
+    Mention: Test case transaction is never committed, on_commit callbacks are run explicitly.
+    """
+    def setUp(self):
+        super().setUp()
+        event_bus.clear()
+        for name in ("WAITING_STUDENT", "IN_PROGRESS_CURATOR", "ACCEPTED_BOTH", "REJECTED_CURATOR"):
+            SuggestionThemeStatus.objects.create(name=name)
+        self.other_curator = self.create_curator("other_curator")
+        self.theme = self.create_theme()
+        self.suggestion = SuggestionTheme.objects.create(
+            theme=self.theme, curator=self.curator, student=self.student,
+            status=SuggestionThemeStatus.objects.get(name="WAITING_STUDENT"))
+        self.run_commit_hooks()
+        self.url = "/api/v1/curators/{}/events".format(self.curator.id)
+
+    def run_commit_hooks(self):
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for savepoint_ids, callback in callbacks:
+            callback()
+
+    def read(self, response, count: int) -> list:
+        """
+        Parses first count messages of stream (stream waits for new events after them)
+        """
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        messages = []
+        for chunk in itertools.islice(response.streaming_content, count):
+            message = dict(line.split(': ', 1) for line in chunk.decode('utf8').strip().split('\n'))
+            if 'data' in message:
+                message['data'] = json.loads(message['data'])
+            messages.append(message)
+        response.close()
+        return messages
+
+    def test_resume(self):
+        first_id, sequence = event_bus.get_id(event_bus.get_events(0)[0][0]), event_bus.sequence
+        SuggestionThemeComment.objects.create(suggestion=self.suggestion, author_name="V", content="C")
+        SuggestionTheme.objects.create(theme=self.theme, curator=self.other_curator,
+                                       status=SuggestionThemeStatus.objects.get(name="WAITING_STUDENT"))
+        step = self.create_step(self.create_work(self.create_theme(self.curator)))
+        self.assertEqual(event_bus.sequence, sequence)     # not committed yet
+        self.run_commit_hooks()
+
+        messages = self.read(self.client.get(self.url, HTTP_LAST_EVENT_ID=first_id), 3)
+        self.assertEqual(messages[0], {'retry': '3000'})
+        self.assertEqual([message['event'] for message in messages[1:]], ['suggestion_comment', 'step_comment'])
+        self.assertEqual(messages[1]['data']['suggestion_id'], self.suggestion.id)
+        self.assertEqual(messages[2]['data']['id'], WorkStepComment.objects.get(step=step).id)
+
+    def test_status_change(self):
+        other = SuggestionTheme.objects.create(theme=self.theme, curator=self.curator,
+                                               student=self.create_student("other_student"),
+                                               status=SuggestionThemeStatus.objects.get(name="WAITING_STUDENT"))
+        self.run_commit_hooks()
+        last_id = event_bus.get_id(event_bus.get_events(0)[0][-1])
+        response = self.client.put("/api/v1/curators/{}/suggestions/{}".format(self.curator.id, self.suggestion.id),
+                                   {'status_id': SuggestionThemeStatus.objects.get(name="ACCEPTED_BOTH").id},
+                                   format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.run_commit_hooks()
+
+        messages = self.read(self.client.get(self.url, {'last_event_id': last_id}), 3)
+        changes = {message['data']['id']: message['data']['status_id'] for message in messages[1:]}
+        self.assertEqual(changes, {
+            self.suggestion.id: SuggestionThemeStatus.objects.get(name="ACCEPTED_BOTH").id,
+            other.id: SuggestionThemeStatus.objects.get(name="REJECTED_CURATOR").id,
+        })
+
+    def test_live(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+        stream = response.streaming_content
+        next(stream)
+        SuggestionThemeComment.objects.create(suggestion=self.suggestion, author_name="V", content="Live")
+        self.run_commit_hooks()
+        self.assertIn('"content":"Live"', next(stream).decode('utf8'))
+        response.close()
+
+    def test_stream_limit(self):
+        with mock.patch.object(stream_slots, 'limit', stream_slots.count + 1):
+            response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            rejected = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+            self.assertEqual(rejected.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(rejected['Retry-After'], '3')
+            response.close()    # never iterated, its slot is freed
+            response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response.close()
+
+    def test_reset(self):
+        messages = self.read(self.client.get(self.url, HTTP_LAST_EVENT_ID="0-1"), 2)
+        self.assertEqual(messages[1]['event'], 'reset')
+
+    def test_missing_curator(self):
+        response = self.client.get("/api/v1/curators/0/events", HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(response.content.startswith(b"event: error\n"))
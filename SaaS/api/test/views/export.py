@@ -0,0 +1,100 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.utils.http import urlencode
+
+from rest_framework import status
+
+from ...models.theme import Theme
+from ...models.work import WorkStep, WorkStepMaterial
+from .base import ViewTestCase
+
+
+class TestDatasetExport(ViewTestCase):
+    """
+    NDJSON export of dataset by staff endpoint and export_dataset command
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(2)
+        self.curator.credentials.is_staff = True
+        self.curator.credentials.save()
+
+    def export(self, since: str = None) -> list:
+        response = self.client.get("/api/v1/export" + ("?" + urlencode({'since': since}) if since else ""))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode('utf8').splitlines()]
+
+    def count_types(self, lines: list) -> dict:
+        types = {}
+        for line in lines:
+            types[line['type']] = types.get(line['type'], 0) + 1
+        return types
+
+    def test_full(self):
+        lines = self.export()
+        self.assertEqual(self.count_types(lines), {'theme': 2, 'work': 2, 'step': 4, 'step_comment': 4,
+                                                  'step_material': 4, 'watermark': 1})
+        self.assertEqual(lines[-1]['type'], 'watermark')
+        theme = lines[0]['data']
+        self.assertEqual(theme['id'], self.works[0].theme_id)
+        self.assertEqual(theme['curator_id'], self.curator.id)
+        self.assertEqual(theme['date_creation'], self.client.get(
+            "/api/v1/themes/{}".format(theme['id'])).data['date_creation'])
+
+    def test_incremental(self):
+        watermark = self.export()[-1]['data']['until']
+        self.assertEqual(self.count_types(self.export(watermark)), {'watermark': 1})
+
+        theme = Theme.objects.get(pk=self.works[1].theme_id)
+        theme.title = "Changed"
+        theme.save()
+        step = self.works[0].step_set.first()
+        step.save()
+        lines = self.export(watermark)
+        self.assertEqual(self.count_types(lines), {'theme': 1, 'step': 1, 'watermark': 1})   # materials did not change
+        self.assertEqual(lines[0]['data']['title'], "Changed")
+        self.assertEqual(lines[1]['data']['id'], step.id)
+
+    def test_moved_material(self):
+        watermark = self.export()[-1]['data']['until']
+        material = WorkStepMaterial.objects.filter(step__work=self.works[0]).first()
+        self.works[1].step_set.first().material_set.add(material)     # queryset update, step is not saved
+        lines = self.export(watermark)
+        self.assertEqual(self.count_types(lines), {'step_material': 1, 'watermark': 1})
+        self.assertEqual(lines[0]['data']['id'], material.id)
+        self.assertGreater(lines[-1]['data']['until'], watermark)
+
+    def test_deleted(self):
+        watermark = self.export()[-1]['data']['until']
+        step = self.works[0].step_set.first()
+        material_ids = list(step.material_set.values_list('id', flat=True))
+        WorkStep.objects.filter(pk=step.pk).delete()
+        theme = Theme.objects.get(pk=self.works[1].theme_id)
+        theme.curator = self.create_curator("other_curator")    # tombstone of left curator, theme still exists
+        theme.save()
+        lines = self.export(watermark)
+        deleted = [line['data'] for line in lines if line['type'] == 'deleted']
+        self.assertEqual(deleted[0], {'kind': 'step', 'object_id': step.id})
+        self.assertEqual([data['object_id'] for data in deleted if data['kind'] == 'step_material'], material_ids)
+        self.assertNotIn('theme', [data['kind'] for data in deleted])
+        self.assertEqual(lines[-1]['type'], 'watermark')
+        self.assertEqual(self.count_types(self.export(lines[-1]['data']['until'])), {'watermark': 1})
+
+    def test_invalid_watermark(self):
+        response = self.client.get("/api/v1/export", {'since': "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_staff_only(self):
+        self.curator.credentials.is_staff = False
+        self.curator.credentials.save()
+        response = self.client.get("/api/v1/export")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        output = io.StringIO()
+        call_command('export_dataset', '--chunk-size', '1', stdout=output)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(lines, self.export()[:-1] + lines[-1:])
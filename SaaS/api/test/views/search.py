@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.db import connection
+from rest_framework import status
+
+from ...models.theme import Theme
+from ...models.work import WorkStepComment
+from ...utils import search
+from .base import ViewTestCase
+
+
+def get_index_size() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM "Search_index"')
+        return cursor.fetchone()[0]
+
+
+class TestThemeSearch(ViewTestCase):
+    """
+    Full-text search of themes, index is updated on save/delete
+    """
+    def setUp(self):
+        super().setUp()
+        self.robots = self.create_theme(self.curator)
+        self.robots.title, self.robots.description = "Разработка роботов", "Управление манипулятором"
+        self.robots.save()
+        self.web = self.create_theme(self.curator)
+        self.web.title, self.web.description = "Web application", "Running robots in browser"
+        self.web.save()
+
+    def search(self, query: str):
+        response = self.client.get("/api/v1/themes/search", {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_stemming(self):
+        self.assertEqual([result['entry']['id'] for result in self.search("робот")], [self.robots.id])
+        self.assertEqual([result['entry']['id'] for result in self.search("run")], [self.web.id])
+
+    def test_ranking(self):
+        self.robots.description = "robots"
+        self.robots.save()
+        results = self.search("robots")
+        self.assertEqual(len(results), 2)
+        self.assertGreaterEqual(results[0]['rank'], results[1]['rank'])
+
+    def test_snippet(self):
+        result = self.search("application")[0]
+        self.assertIn("<b>application</b>", result['snippet'])
+        self.assertEqual(result['entry']['subject']['id'], self.subject.id)
+
+    def test_incremental(self):
+        self.web.title = "Mobile application"
+        self.web.save()
+        self.assertEqual(len(self.search("mobile")), 1)
+        Theme.objects.get(pk=self.web.id).delete()
+        self.assertEqual(self.search("mobile"), [])
+
+    def test_deleted_by_queryset(self):
+        size = get_index_size()
+        Theme.objects.filter(pk=self.robots.id).delete()
+        self.assertEqual(get_index_size(), size - 1)
+        response = self.client.get("/api/v1/themes/search", {'q': "robots", 'limit': 1})
+        self.assertEqual([result['entry']['id'] for result in response.data], [self.web.id])
+
+    def test_query_required(self):
+        response = self.client.get("/api/v1/themes/search")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unsupported_database(self):
+        with mock.patch.dict(search.BACKENDS, clear=True):
+            self.web.title = "Mobile application"
+            self.web.save()
+            response = self.client.get("/api/v1/themes/search", {'q': "mobile"})
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(self.search("mobile"), [])
+
+
+class TestCommentSearch(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        step = self.create_works(1)[0].step_set.first()
+        self.comment = WorkStepComment.objects.create(step=step, author_name="V", content="Приложил отчёт по работе")
+
+    def test_search(self):
+        response = self.client.get("/api/v1/comments/search", {'q': "отчёты", 'kind': "work_step_comment"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['kind'], "work_step_comment")
+        self.assertEqual(response.data[0]['entry']['id'], self.comment.id)
+
+    def test_cascade_delete(self):
+        size = get_index_size()
+        self.comment.step.delete()
+        self.assertEqual(get_index_size(), size - 2)     # comments of step (created and seeded)
+        response = self.client.get("/api/v1/comments/search", {'q': "отчёт"})
+        self.assertEqual(response.data, [])
+
+    def test_unknown_kind(self):
+        response = self.client.get("/api/v1/comments/search", {'q': "отчёт", 'kind': "theme"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,76 @@
+from rest_framework import status
+
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus
+from .base import ViewTestCase
+
+
+class TestFieldSelection(ViewTestCase):
+    """
+    Sparse fieldsets (?fields=) and on-demand expansion (?expand=) of read views
+
+    Mention: Not expanded relations are represented by primary keys and are not joined/prefetched.
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(3)
+        self.themes = [work.theme for work in self.works]
+        status_waiting = SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+        for theme in self.themes:
+            SuggestionTheme.objects.create(theme=theme, curator=self.curator, student=self.student, status=status_waiting)
+        self.client.get("/api/v1/curators/{}/themes".format(self.curator.id))    # token, roles are cached
+
+    def test_unchanged_without_params(self):
+        response = self.client.get("/api/v1/curators/{}/themes".format(self.curator.id))
+        self.assertEqual(response.data[0]["curator"]["id"], self.curator.id)
+        self.assertEqual(len(response.data[0]["skills"]), len(self.skills))
+
+    def test_fields(self):
+        url = "/api/v1/curators/{}/themes?fields=id,title".format(self.curator.id)
+        with self.assertNumQueries(2):     # state, themes
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([set(theme) for theme in response.data], [{"id", "title"}] * len(self.themes))
+
+    def test_expand(self):
+        url = "/api/v1/curators/{}/themes?expand=curator".format(self.curator.id)
+        with self.assertNumQueries(3):     # state, themes joined with curator, skills
+            response = self.client.get(url)
+        theme = response.data[0]
+        self.assertEqual(theme["curator"]["id"], self.curator.id)
+        self.assertEqual(theme["student"], self.student.id)
+        self.assertEqual(theme["subject"], self.subject.id)
+        self.assertEqual(sorted(theme["skills"]), sorted(skill.id for skill in self.skills))
+
+    def test_nested_fields(self):
+        url = "/api/v1/curators/{}/suggestions?fields=id,theme.title,theme.student.name&expand=status".format(self.curator.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        suggestion = response.data[0]
+        self.assertEqual(set(suggestion), {"id", "theme"})
+        self.assertEqual(suggestion["theme"], {"title": "T", "student": {"name": "V"}})
+
+    def test_detail(self):
+        url = "/api/v1/curators/{}/works/{}?fields=id,theme&expand=theme.subject".format(self.curator.id, self.works[0].id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["theme"]["subject"], {"id": self.subject.id, "name": self.subject.name})
+        self.assertEqual(response.data["theme"]["curator"], self.curator.id)
+
+    def test_etag_depends_on_fields(self):
+        url = "/api/v1/curators/{}/themes".format(self.curator.id)
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url + "?fields=id", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        response = self.client.get(url + "?fields=id", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_generic_list(self):
+        response = self.client.get("/api/v1/students?fields=id,group&expand=group")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0], {"id": self.student.id, "group": {"id": self.academic_group.id, "name": "11-601"}})
+
+    def test_reference_data_list(self):
+        response = self.client.get("/api/v1/skills?fields=name")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([skill["name"] for skill in response.data], [skill.name for skill in self.skills])
@@ -0,0 +1,134 @@
+from django.db import connection
+from rest_framework import status
+
+from ...models.skill import Skill
+from ...models.theme import Theme
+from ...utils.recommendation import theme_skill_index, ThemeSkillIndex
+from .base import ViewTestCase
+
+
+class TestStudentWorkViews(ViewTestCase):
+    """
+    Query budget of student related work views
+
+    Mention: Budget includes token authentication and role resolution,
+             it must not depend on the number of related themes, works, steps.
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(5)
+        self.work = self.works[0]
+        self.step = self.work.step_set.first()
+        self.create_works(2, student=self.create_student("other_student"))   # must not be listed
+
+    def test_work_list(self):
+        url = "/api/v1/students/{}/works".format(self.student.id)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([work["id"] for work in response.data], [work.id for work in self.works])
+
+        self.create_works(5)
+        with self.assertNumQueries(3):     # token, roles are cached
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 10)
+
+    def test_work_step_list(self):
+        url = "/api/v1/students/{}/works/{}/steps".format(self.student.id, self.work.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_work_step_material_list(self):
+        url = "/api/v1/students/{}/works/{}/steps/{}/materials".format(self.student.id, self.work.id, self.step.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_work_step_comment_list(self):
+        url = "/api/v1/students/{}/works/{}/steps/{}/comments".format(self.student.id, self.work.id, self.step.id)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+
+class TestStudentThemeRecommendedList(ViewTestCase):
+    """
+    Open themes ranked by weighted skill overlap, index is updated incrementally
+    """
+    def setUp(self):
+        super().setUp()
+        self.rare_skill = Skill.objects.create(name="Verilog")
+        self.student.skills.add(self.skills[0], self.rare_skill)
+        self.common = self.create_theme(self.curator)                 # Cpp, Python
+        self.rare = self.create_theme(self.curator)
+        self.rare.skills.set([self.rare_skill])
+        self.unrelated = self.create_theme(self.curator)
+        self.unrelated.skills.set([self.skills[1]])
+        self.create_works(2)                                          # taken themes must not be recommended
+        self.url = "/api/v1/students/{}/themes/recommended".format(self.student.id)
+
+    def get_recommended_ids(self) -> list:
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [entry["theme"]["id"] for entry in response.data]
+
+    def test_ranking(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry["theme"]["id"] for entry in response.data], [self.rare.id, self.common.id])
+        self.assertGreater(response.data[0]["score"], response.data[1]["score"])
+        self.assertLessEqual(response.data[0]["score"], 1)
+
+        response = self.client.get(self.url + "?limit=1")
+        self.assertEqual(len(response.data), 1)
+
+    def test_incremental_updates(self):
+        self.assertEqual(self.get_recommended_ids(), [self.rare.id, self.common.id])
+        self.unrelated.skills.add(self.rare_skill)
+        self.assertIn(self.unrelated.id, self.get_recommended_ids())
+        self.rare.skills.remove(self.rare_skill)
+        self.assertNotIn(self.rare.id, self.get_recommended_ids())
+
+        self.common.student = self.student
+        self.common.save()
+        self.assertNotIn(self.common.id, self.get_recommended_ids())
+        self.unrelated.delete()
+        self.assertEqual(self.get_recommended_ids(), [])
+
+    def test_bulk_update(self):
+        self.get_recommended_ids()
+        Theme.objects.filter(pk=self.rare.id).update(student=self.student)
+        self.assertEqual(self.get_recommended_ids(), [self.common.id])
+
+    def test_taken_elsewhere(self):
+        self.get_recommended_ids()
+        with connection.cursor() as cursor:     # through another worker, signals of this one are not sent
+            cursor.execute('UPDATE "Theme" SET student_id = %s WHERE id = %s', [self.student.id, self.rare.id])
+        self.assertEqual(self.get_recommended_ids(), [self.common.id])
+
+    def test_incremental_norms(self):
+        self.get_recommended_ids()
+        self.unrelated.skills.add(self.rare_skill, self.skills[0])
+        self.common.skills.remove(self.skills[0])
+        Skill.objects.create(name="VHDL").theme_set.add(self.rare, self.unrelated)
+        self.create_theme(self.curator).skills.set([self.rare_skill])
+        self.skills[1].delete()
+        for theme_id, norm in theme_skill_index._norms.items():
+            self.assertAlmostEqual(norm, theme_skill_index.get_norm(theme_id))
+
+        reloaded = ThemeSkillIndex()
+        reloaded._load()
+        reloaded.theme_count = theme_skill_index.theme_count
+        reloaded._load_open()
+        self.assertEqual(reloaded._norms.keys(), theme_skill_index._norms.keys())
+        skill_ids = self.student.skills.values_list('id', flat=True)
+        self.assertEqual([theme_id for theme_id, score in theme_skill_index.recommend(skill_ids, 10)],
+                         [theme_id for theme_id, score in reloaded.recommend(skill_ids, 10)])
+
+    def test_missing_student(self):
+        response = self.client.get("/api/v1/students/0/themes/recommended")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,157 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from rest_framework import status
+
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
+from ...models.theme import Theme, Subject
+from ...models.work import WorkStepMaterial
+from ...utils.sync import get_token
+from .base import ViewTestCase
+
+
+class TestSync(ViewTestCase):
+    """
+    Delta sync by change sequence numbers (database triggers) and tombstones
+    """
+    def setUp(self):
+        super().setUp()
+        self.works = self.create_works(2)
+        self.other_curator = self.create_curator("other_curator")
+        self.create_works(1, curator=self.other_curator)
+        self.suggestion = SuggestionTheme.objects.create(
+            theme=self.works[0].theme, curator=self.curator, student=self.student,
+            status=SuggestionThemeStatus.objects.create(name="WAITING_STUDENT"),
+            progress=SuggestionThemeProgress.objects.create(title="P", description="D"))
+        self.url = "/api/v1/curators/{}/sync".format(self.curator.id)
+
+    def sync(self, since: str = None, url: str = None) -> dict:
+        response = self.client.get(url or self.url, {'since': since} if since is not None else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def get_ids(self, data: dict) -> dict:
+        return {kind: [entry['id'] for entry in entries] for kind, entries in data.items()
+                if kind not in ('token', 'deleted') and entries}
+
+    def test_full(self):
+        data = self.sync()
+        self.assertEqual({kind: len(ids) for kind, ids in self.get_ids(data).items()}, {
+            'themes': 2, 'works': 2, 'steps': 4, 'materials': 4, 'comments': 4, 'suggestions': 1})
+        self.assertEqual(data['steps'][0]['work_id'], self.works[0].id)
+        self.assertEqual(data['deleted'], {})
+
+    def test_warm(self):
+        token = self.sync()['token']
+        data = self.sync(token)
+        self.assertEqual(self.get_ids(data), {})
+        self.assertEqual(data['token'], token)
+
+        with self.assertNumQueries(12):     # curator, sequence token, range scans, tombstones
+            self.sync(token)
+
+    def test_changed(self):
+        token = self.sync()['token']
+        theme = self.works[1].theme
+        theme.title = "Changed"
+        theme.save()
+        step = self.works[0].step_set.first()
+        WorkStepMaterial.objects.create(step=step, content="http://example.com/new")
+        progress = self.suggestion.progress
+        progress.title = "Changed"
+        progress.save()
+
+        data = self.sync(token)
+        self.assertEqual(self.get_ids(data), {
+            'themes': [theme.id],
+            'works': [self.works[1].id],    # nested theme changed
+            'materials': [WorkStepMaterial.objects.get(content="http://example.com/new").id],
+            'suggestions': [self.suggestion.id],
+        })
+        self.assertEqual(data['suggestions'][0]['progress']['title'], "Changed")
+        self.assertGreater(int(data['token']), int(token))
+
+    def test_deleted(self):
+        token = self.sync()['token']
+        step = self.works[0].step_set.first()
+        step_id, material_id = step.id, step.material_set.get().id
+        step.delete()
+        theme = self.works[1].theme
+        Theme.objects.filter(pk=theme.pk).update(curator=self.other_curator)
+
+        moved = self.works[1].step_set.order_by('id')
+        deleted = self.sync(token)['deleted']
+        self.assertEqual(deleted['steps'], [step_id] + [step.id for step in moved])
+        self.assertEqual(deleted['materials'], [material_id] + [step.material_set.get().id for step in moved])
+        self.assertEqual(deleted['themes'], [theme.id])
+        other = self.sync(url="/api/v1/curators/{}/sync".format(self.other_curator.id))
+        self.assertIn(theme.id, [entry['id'] for entry in other['themes']])
+
+    def test_moved(self):
+        token = self.sync()['token']
+        other_url = "/api/v1/curators/{}/sync".format(self.other_curator.id)
+        other_token = self.sync(url=other_url)['token']
+        theme = Theme.objects.get(pk=self.works[1].theme_id)
+        theme.curator = self.other_curator
+        theme.save()
+        steps = list(self.works[1].step_set.order_by('id'))
+        nested = {
+            'works': [self.works[1].id],
+            'steps': [step.id for step in steps],
+            'materials': [step.material_set.get().id for step in steps],
+            'comments': [step.comment_set.get().id for step in steps],
+        }
+
+        deleted = self.sync(token)['deleted']
+        self.assertEqual({kind: ids for kind, ids in deleted.items() if ids}, dict(nested, themes=[theme.id]))
+        self.assertEqual(self.get_ids(self.sync(other_token, other_url)), dict(nested, themes=[theme.id]))
+
+    def test_assigned(self):
+        theme = self.create_theme(self.curator)
+        self.create_step(self.create_work(theme))
+        url = "/api/v1/students/{}/sync".format(self.student.id)
+        token = self.sync(url=url)['token']
+        curator_token = self.sync()['token']
+        Theme.objects.filter(pk=theme.pk).update(student=self.student)
+
+        self.assertEqual({kind: len(ids) for kind, ids in self.get_ids(self.sync(token, url)).items()}, {
+            'themes': 1, 'works': 1, 'steps': 1, 'materials': 1, 'comments': 1})
+        self.assertEqual({kind: ids for kind, ids in self.sync(curator_token)['deleted'].items() if ids}, {})
+
+    def test_cascade(self):
+        token = self.sync()['token']
+        theme = self.works[0].theme
+        theme.delete()
+        deleted = self.sync(token)['deleted']
+        self.assertEqual((len(deleted['themes']), len(deleted['works']), len(deleted['steps']), len(deleted['suggestions'])),
+                         (1, 1, 2, 1))
+
+    def test_student(self):
+        data = self.sync(url="/api/v1/students/{}/sync".format(self.student.id))
+        self.assertEqual(len(data['themes']), 3)
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': "token"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(connection.vendor == 'postgresql', "SQLite commits sequence numbers in allocation order.")
+class TestSyncToken(TransactionTestCase):
+    """
+    Token stays below sequence numbers of transactions still in flight
+    """
+    def test_in_flight(self):
+        theme = Theme.objects.create(title="T", description="D", subject=Subject.objects.create(name="Robotics"))
+        other = connection.copy()
+        try:
+            other.set_autocommit(False)
+            with other.cursor() as cursor:
+                cursor.execute('UPDATE "Theme" SET title = %s WHERE id = %s', ["In flight", theme.id])
+            Theme.objects.create(title="T", description="D", subject=theme.subject)    # committed after it
+            token = get_token()
+            other.commit()
+        finally:
+            other.close()
+        self.assertLess(token, Theme.objects.get(pk=theme.pk).sequence)
@@ -0,0 +1,173 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import serializers, status
+
+from ...models.skill import Skill
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus
+from ...models.theme import Subject, Theme
+from ...serializers.suggestion import SuggestionThemeAssignSerializer
+from ...utils.assignment import ASSIGNMENT_MAX_STUDENTS
+from ...utils.reference_data import reference_data
+
+from .base import ViewTestCase
+
+
+class TestThemeListPagination(ViewTestCase):
+    """
+    Opt-in cursor pagination of themes list
+    """
+    def setUp(self):
+        super().setUp()
+        self.themes = [self.create_theme(self.curator) for i in range(7)]
+
+    def test_not_paginated_by_default(self):
+        response = self.client.get("/api/v1/themes")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), len(self.themes))
+
+    def test_paginated(self):
+        received = []
+        url = "/api/v1/themes?page_size=3"
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            for query in context.captured_queries:
+                self.assertNotIn("COUNT(", query["sql"].upper())
+                self.assertNotIn("OFFSET", query["sql"].upper())
+            received.extend(theme["id"] for theme in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(received, sorted((theme.id for theme in self.themes), reverse=True))   # newest first
+
+    def test_page_size_bounded(self):
+        response = self.client.get("/api/v1/themes?page_size=100000")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), len(self.themes))
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/v1/themes?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestReferenceDataViews(ViewTestCase):
+    """
+    Lookup tables served from reference data registry with ETag
+    """
+    def setUp(self):
+        super().setUp()
+        reference_data.invalidate()
+        SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+        SuggestionThemeStatus.objects.create(name="WAITING_CURATOR")
+
+    def test_statuses(self):
+        response = self.client.get("/api/v1/themes/suggestions/statuses")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry["name"] for entry in response.data], ["WAITING_STUDENT", "WAITING_CURATOR"])
+        self.assertTrue(response["ETag"].startswith('"'))
+
+        with self.assertNumQueries(0):  # token, roles, statuses are cached
+            response = self.client.get("/api/v1/themes/suggestions/statuses")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_not_modified(self):
+        etag = self.client.get("/api/v1/themes/suggestions/statuses")["ETag"]
+        response = self.client.get("/api/v1/themes/suggestions/statuses", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_modified_after_save(self):
+        etag = self.client.get("/api/v1/subjects")["ETag"]
+        Subject.objects.create(name="Web")
+        response = self.client.get("/api/v1/subjects", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_paginated_fallback(self):
+        response = self.client.get("/api/v1/skills?page_size=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+
+class TestThemeSuggestionAssign(ViewTestCase):
+    """
+    Batch assignment of open themes to students by skill overlap
+    """
+    def setUp(self):
+        super().setUp()
+        SuggestionThemeStatus.objects.create(name="WAITING_STUDENT")
+        self.other_curator = self.create_curator("other_curator")
+        self.students = [self.student, self.create_student("student_2"), self.create_student("student_3")]
+        self.rare_skill = Skill.objects.create(name="Verilog")
+        self.students[0].skills.add(self.skills[0])
+        self.students[1].skills.add(self.skills[0], self.rare_skill)
+        self.students[2].skills.add(self.skills[1])
+
+        self.common = self.create_theme(self.curator)                # Cpp, Python
+        self.rare = self.create_theme(self.curator)
+        self.rare.skills.set([self.skills[0], self.rare_skill])
+        self.python = self.create_theme(self.other_curator)
+        self.python.skills.set([self.skills[1]])
+        self.url = "/api/v1/themes/suggestions/assign"
+        self.data = {
+            "student_ids": [student.id for student in self.students],
+            "theme_ids": [self.common.id, self.rare.id, self.python.id],
+        }
+
+    def get_pairs(self, data: list) -> set:
+        return {(entry["student_id"], entry["theme_id"]) for entry in data}
+
+    def test_dry_run(self):
+        response = self.client.post(self.url, dict(self.data, dry_run=True), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_pairs(response.data), {
+            (self.students[0].id, self.common.id),
+            (self.students[1].id, self.rare.id),
+            (self.students[2].id, self.python.id),
+        })
+        self.assertFalse(SuggestionTheme.objects.exists())
+
+    def test_capacities(self):
+        data = dict(self.data, capacities={str(self.curator.id): 1}, dry_run=True)
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(self.get_pairs(response.data), {
+            (self.students[1].id, self.rare.id),
+            (self.students[2].id, self.python.id),
+        })
+
+    def test_assign(self):
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        suggestions = SuggestionTheme.objects.filter(status__name="WAITING_STUDENT")
+        self.assertEqual({(suggestion.student_id, suggestion.theme_id) for suggestion in suggestions},
+                         self.get_pairs(response.data))
+        self.assertEqual(suggestions.get(theme=self.python).curator_id, self.other_curator.id)
+
+    def test_taken_theme(self):
+        taken = self.create_theme(self.curator, self.students[0])
+        response = self.client.post(self.url, dict(self.data, theme_ids=[taken.id]), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("theme_ids", response.data)
+
+    def test_missing_student(self):
+        response = self.client.post(self.url, dict(self.data, student_ids=[0]), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("student_ids", response.data)
+
+    def test_taken_while_solving(self):
+        serializer = SuggestionThemeAssignSerializer(data=self.data)
+        self.assertTrue(serializer.is_valid())
+        assignments = serializer.get_assignments()     # no locks are held while matching is solved
+        Theme.objects.filter(pk=self.python.id).update(student=self.students[0])
+        with self.assertRaises(serializers.ValidationError) as context:
+            serializer.save(assignments=assignments)
+        self.assertIn(str(self.python.id), str(context.exception.detail['theme_ids']))
+        self.assertFalse(SuggestionTheme.objects.exists())
+
+    def test_too_many_students(self):
+        response = self.client.post(self.url, dict(self.data, student_ids=list(range(ASSIGNMENT_MAX_STUDENTS + 1))),
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("student_ids", response.data)
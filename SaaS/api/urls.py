@@ -8,6 +8,9 @@ from .views.student import *
 from .views.theme import *
 from .views.work import *
 from .views.skill import *
+from .views.search import *
+from .views.export import *
+from .views.metrics import *
 
 
 urlpatterns = [
@@ -19,19 +22,24 @@ urlpatterns = [
     # curator branch
     path('curators', CuratorList.as_view()),
     path('curators/<int:curator_id>', CuratorDetail.as_view()),
+    path('curators/<int:curator_id>/summary', CuratorSummary.as_view()),
     path('curators/<int:curator_id>/skills', CuratorSkillList.as_view()),
     path('curators/<int:curator_id>/works', CuratorWorkList.as_view()),
     path('curators/<int:curator_id>/works/<int:work_id>', CuratorWorkDetail.as_view()),
     path('curators/<int:curator_id>/works/<int:work_id>/steps', CuratorWorkStepList.as_view()),
+    path('curators/<int:curator_id>/works/<int:work_id>/steps/bulk', CuratorWorkStepBulk.as_view()),
     path('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>', CuratorWorkStepDetail.as_view()),
     path('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>/materials', CuratorWorkStepMaterialList.as_view()),
     path('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>/comments', CuratorWorkStepCommentList.as_view()),
     path('curators/<int:curator_id>/themes', CuratorThemeList.as_view()),
     path('curators/<int:curator_id>/themes/<int:theme_id>', CuratorThemeDetail.as_view()),
     path('curators/<int:curator_id>/suggestions', CuratorSuggestionList.as_view()),
+    path('curators/<int:curator_id>/suggestions/bulk', CuratorSuggestionBulk.as_view()),
     path('curators/<int:curator_id>/suggestions/<int:suggestion_id>', CuratorSuggestionDetail.as_view()),
     path('curators/<int:curator_id>/suggestions/<int:suggestion_id>/progress', CuratorSuggestionProgressDetail.as_view()),
     path('curators/<int:curator_id>/suggestions/<int:suggestion_id>/comments', CuratorSuggestionCommentList.as_view()),
+    path('curators/<int:curator_id>/events', CuratorEventStream.as_view()),
+    path('curators/<int:curator_id>/sync', CuratorSync.as_view()),
     # student branch
     path('students', StudentList.as_view()),
     path('students/groups', StudentGroupList.as_view()),
@@ -44,16 +52,21 @@ urlpatterns = [
     path('students/<int:student_id>/works/<int:work_id>/steps/<int:step_id>/materials', StudentWorkStepMaterialList.as_view()),
     path('students/<int:student_id>/works/<int:work_id>/steps/<int:step_id>/comments', StudentWorkStepCommentList.as_view()),
     path('students/<int:student_id>/themes', StudentThemeList.as_view()),
+    path('students/<int:student_id>/themes/recommended', StudentThemeRecommendedList.as_view()),
     path('students/<int:student_id>/themes/<int:theme_id>', StudentThemeDetail.as_view()),
     path('students/<int:student_id>/suggestions', StudentSuggestionList.as_view()),
     path('students/<int:student_id>/suggestions/<int:suggestion_id>', StudentSuggestionDetail.as_view()),
     path('students/<int:student_id>/suggestions/<int:suggestion_id>/progress', StudentSuggestionProgressDetail.as_view()),
     path('students/<int:student_id>/suggestions/<int:suggestion_id>/comments', StudentSuggestionCommentList.as_view()),
+    path('students/<int:student_id>/events', StudentEventStream.as_view()),
+    path('students/<int:student_id>/sync', StudentSync.as_view()),
     # themes branch
     path('themes', ThemeList.as_view()),
+    path('themes/search', ThemeSearch.as_view()),
     path('themes/<int:theme_id>', ThemeDetail.as_view()),
     path('themes/<int:theme_id>/skills', ThemeSkillList.as_view()),
     path('themes/suggestions/statuses', ThemeSuggestionStatusList.as_view()),
+    path('themes/suggestions/assign', ThemeSuggestionAssign.as_view()),
     # theme subject branch
     path('subjects', SubjectList.as_view()),
     path('subjects/<int:subject_id>', SubjectDetail.as_view()),
@@ -64,7 +77,15 @@ urlpatterns = [
     path('works/<int:work_id>/steps', WorkStepList.as_view()),
     path('works/<int:work_id>/steps/<int:step_id>', WorkStepDetail.as_view()),
     path('works/<int:work_id>/steps/<int:step_id>/materials', WorkStepMaterialList.as_view()),
+    # search branch
+    path('comments/search', CommentSearch.as_view()),
     # skills branch
     path('skills', SkillList.as_view()),
-    path('skills/<int:skill_id>', SkillDetail.as_view())
+    path('skills/<int:skill_id>', SkillDetail.as_view()),
+    # export branch
+    path('export', DatasetExport.as_view()),
+    # metrics branch
+    path('metrics/connections', ConnectionMetrics.as_view()),
+    path('metrics/tokens', TokenCacheMetrics.as_view()),
+    path('metrics/requests', SlowRequestMetrics.as_view())
 ]
@@ -0,0 +1,87 @@
+"""
+Acceptance of suggestions (ACCEPTED_BOTH) by fixed number of set-based statements
+
+Mention: Themes are locked first (select_for_update in id order), so concurrent accepts of the same theme
+         are serialized and the later one finds the theme taken instead of overwriting it.
+         Theme UPDATE fires database triggers that create the work and set date_acceptance
+         (mylog/db/sql/DDL_function_trigger.sql), so themes are updated by query, not by save().
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localtime
+
+from ..models.theme import Theme
+from ..models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
+from .reference_data import reference_data
+from .events import publish_suggestions
+from .search import index_entries
+
+# accepted - suggestions, rejected - ids of other suggestions of accepted themes, taken - suggestions of taken themes
+Acceptance = namedtuple('Acceptance', ('accepted', 'rejected', 'taken'))
+
+
+def lock_themes(theme_ids) -> dict:
+    """
+    {theme id: (curator id, student id)} of locked themes
+    """
+    themes = Theme.objects.select_for_update().filter(pk__in=set(theme_ids)).order_by('id')
+    return {theme_id: (curator_id, student_id)
+            for theme_id, curator_id, student_id in themes.values_list('id', 'curator_id', 'student_id')}
+
+
+def accept_suggestions(suggestions) -> Acceptance:
+    """
+    Accepts suggestions of free themes (or of themes already held by the same curator and student),
+    merges progress into themes and rejects other suggestions of accepted themes by the same curator
+
+    Mention: Statements are the same for any number of suggestions: theme lock, rejected ids,
+             theme update, search index of merged themes, suggestion status update, progress update.
+             Suggestions are published after commit.
+    """
+    suggestions = list(suggestions)
+    with transaction.atomic():
+        themes = lock_themes(suggestion.theme_id for suggestion in suggestions)
+        accepted, taken = [], []
+        for suggestion in suggestions:
+            holder = (suggestion.curator_id, suggestion.student_id)
+            theme = themes.get(suggestion.theme_id)
+            if theme is None or (theme[1] is not None and theme != holder):
+                taken.append(suggestion)
+                continue
+            themes[suggestion.theme_id] = holder     # the next suggestion of the theme is taken
+            accepted.append(suggestion)
+        if not accepted:
+            return Acceptance([], [], taken)
+
+        accepted_ids = [suggestion.id for suggestion in accepted]
+        rejection = Q()
+        for suggestion in accepted:
+            rejection |= Q(theme_id=suggestion.theme_id, curator_id=suggestion.curator_id) \
+                & ~Q(student_id=suggestion.student_id)
+        rejected_ids = list(SuggestionTheme.objects.filter(rejection).exclude(pk__in=accepted_ids)
+                            .order_by('id').values_list('id', flat=True))
+
+        merged = SuggestionTheme.objects.filter(pk__in=accepted_ids, theme_id=OuterRef('pk'))
+        Theme.objects.filter(pk__in={suggestion.theme_id for suggestion in accepted}).update(
+            title=Coalesce(Subquery(merged.values('progress__title')[:1]), F('title')),
+            description=Coalesce(Subquery(merged.values('progress__description')[:1]), F('description')),
+            curator_id=Subquery(merged.values('curator_id')[:1]),
+            student_id=Subquery(merged.values('student_id')[:1]))
+        index_entries(Theme, {suggestion.theme_id for suggestion in accepted})
+
+        accepted_status_id = reference_data.get_id(SuggestionThemeStatus, "ACCEPTED_BOTH")
+        SuggestionTheme.objects.filter(pk__in=accepted_ids + rejected_ids).update(status_id=Case(
+            When(pk__in=accepted_ids, then=Value(accepted_status_id)),
+            default=Value(reference_data.get_id(SuggestionThemeStatus, "REJECTED_CURATOR")),
+            output_field=IntegerField()))
+
+        progress_ids = [suggestion.progress_id for suggestion in accepted if suggestion.progress_id is not None]
+        if progress_ids:
+            SuggestionThemeProgress.objects.filter(pk__in=progress_ids).update(date_update=localtime())
+
+        publish_suggestions(accepted_ids + rejected_ids)
+    return Acceptance(accepted, rejected_ids, taken)
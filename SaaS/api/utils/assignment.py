@@ -0,0 +1,133 @@
+"""
+Batch assignment of open themes to students
+
+Mention: Best-fit matching is a min-cost flow student -> theme -> curator -> sink,
+         solved by successive shortest paths from one student at a time (Dijkstra with potentials,
+         as in Hungarian algorithm). Every student also has an edge to sink through 'unassigned' node
+         costlier than any set of pairs, so every student is routed, number of assigned students is maximal
+         and total score is maximal among such matchings.
+         Only the best ASSIGNMENT_CANDIDATES themes of each student are candidates (edges),
+         so the network stays sparse at semester scale.
+"""
+
+import heapq
+from collections import namedtuple
+
+from django.conf import settings
+
+COST_SCALE = 10 ** 6
+ASSIGNMENT_CANDIDATES = getattr(settings, 'API_ASSIGNMENT_CANDIDATES', 20)
+ASSIGNMENT_MAX_STUDENTS = getattr(settings, 'API_ASSIGNMENT_MAX_STUDENTS', 1000)   # a few seconds of matching
+ASSIGNMENT_MAX_THEMES = getattr(settings, 'API_ASSIGNMENT_MAX_THEMES', 1000)
+
+Assignment = namedtuple('Assignment', ('student_id', 'theme_id', 'curator_id', 'score'))
+
+
+class MinCostFlow:
+    """
+    Flow network with adjacency lists of edges [to, capacity, cost, reverse edge index]
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.graph = [[] for _ in range(size)]
+        self.potential = [0] * size
+
+    def add_edge(self, source: int, target: int, capacity: int, cost: int) -> list:
+        edge = [target, capacity, cost, len(self.graph[target])]
+        self.graph[source].append(edge)
+        self.graph[target].append([source, 0, -cost, len(self.graph[source]) - 1])
+        return edge
+
+    def augment(self, source: int, sink: int) -> bool:
+        """
+        Pushes one unit of flow from source by the cheapest path (reduced costs must be non-negative),
+        returns False if sink is not reachable
+
+        Mention: Only nodes settled before sink are visited, potentials of others are shifted
+                 by the sink distance, which does not change reduced costs, so they are kept.
+        """
+        graph, potential = self.graph, self.potential
+        distance = {source: 0}
+        previous = {}     # node -> (node, edge index)
+        settled = []
+        queue = [(0, source)]
+        while queue:
+            node_distance, node = heapq.heappop(queue)
+            if node_distance > distance[node]:
+                continue
+            if node == sink:    # farther nodes do not matter for this path
+                break
+            settled.append(node)
+            node_potential = node_distance + potential[node]
+            for index, (target, capacity, cost, _) in enumerate(graph[node]):
+                if not capacity:
+                    continue
+                target_distance = node_potential + cost - potential[target]
+                if target_distance < distance.get(target, target_distance + 1):
+                    distance[target] = target_distance
+                    previous[target] = (node, index)
+                    heapq.heappush(queue, (target_distance, target))
+        sink_distance = distance.get(sink)
+        if sink_distance is None:
+            return False
+        # reduced costs stay non-negative when distances are capped by sink distance
+        for node in settled:
+            potential[node] += distance[node] - sink_distance
+
+        node = sink
+        while node != source:
+            previous_node, index = previous[node]
+            edge = graph[previous_node][index]
+            edge[1] -= 1
+            graph[node][edge[3]][1] += 1
+            node = previous_node
+        return True
+
+
+def get_candidates(student_scores: dict, theme_ids, limit: int = ASSIGNMENT_CANDIDATES) -> list:
+    """
+    Returns [(theme_id, score)] of the best themes of student among theme_ids (ties by theme id)
+    """
+    return heapq.nsmallest(limit, ((theme_id, score) for theme_id, score in student_scores.items() if theme_id in theme_ids),
+                           key=lambda candidate: (-candidate[1], candidate[0]))
+
+
+def assign(scores: dict, theme_curators: dict, capacities: dict = None, candidates: int = ASSIGNMENT_CANDIDATES) -> list:
+    """
+    Returns best-fit [Assignment] ordered by student
+
+    Mention: scores - {student_id: {theme_id: score in [0, 1]}}, only listed pairs can be matched,
+             theme_curators - {theme_id: curator_id},
+             capacities - {curator_id: maximal number of assigned themes}, missing curators are not limited,
+             candidates - number of the best themes per student matching considers.
+    """
+    capacities = capacities or {}
+    students = sorted(scores)
+    themes = sorted(theme_curators)
+    curators = sorted(set(theme_curators.values()))
+
+    # nodes: students, themes, curators, unassigned, sink
+    student_nodes = {student_id: i for i, student_id in enumerate(students)}
+    theme_nodes = {theme_id: len(students) + i for i, theme_id in enumerate(themes)}
+    curator_nodes = {curator_id: len(students) + len(themes) + i for i, curator_id in enumerate(curators)}
+    unassigned = len(students) + len(themes) + len(curators)
+    sink = unassigned + 1
+    network = MinCostFlow(sink + 1)
+    unassigned_cost = (len(students) + 1) * COST_SCALE     # more than costs of all pairs
+
+    pair_edges = []
+    for student_id in students:
+        for theme_id, score in get_candidates(scores[student_id], theme_nodes, candidates):
+            edge = network.add_edge(student_nodes[student_id], theme_nodes[theme_id], 1, round((1 - score) * COST_SCALE))
+            pair_edges.append((student_id, theme_id, score, edge))
+        network.add_edge(student_nodes[student_id], unassigned, 1, unassigned_cost)
+    for theme_id in themes:
+        network.add_edge(theme_nodes[theme_id], curator_nodes[theme_curators[theme_id]], 1, 0)
+    for curator_id in curators:
+        network.add_edge(curator_nodes[curator_id], sink, capacities.get(curator_id, len(themes)), 0)
+    network.add_edge(unassigned, sink, len(students), 0)
+
+    for student_id in students:
+        network.augment(student_nodes[student_id], sink)
+    return [Assignment(student_id, theme_id, theme_curators[theme_id], score)
+            for student_id, theme_id, score, edge in sorted(pair_edges, key=lambda pair: pair[:2]) if not edge[1]]
@@ -0,0 +1,104 @@
+"""
+Contention benchmark of suggestion acceptance: many students race for a few popular themes
+
+Mention: Every worker thread has its own database connection, exactly one accept per theme must succeed.
+         SQLite serializes writers (its errors are counted), row locks are measured on PostgreSQL.
+"""
+
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils.timezone import localtime
+
+from rest_framework import serializers
+
+from ...models.curator import Curator
+from ...models.student import Student
+from ...models.theme import Subject, Theme
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus
+from ...serializers.suggestion import SuggestionThemeSerializerRelatedChangeable
+from ..reference_data import reference_data
+
+
+def seed_contention(themes: int, students: int, seed: int = 0) -> list:
+    """
+    Open themes of one curator with a waiting suggestion of every student, returns suggestion ids in random order
+    """
+    for name in ("WAITING_STUDENT", "ACCEPTED_BOTH", "REJECTED_CURATOR"):
+        SuggestionThemeStatus.objects.get_or_create(name=name)
+    curator = Curator.objects.create(credentials=User.objects.create_user(username="contention_curator"),
+                                     name="C", last_name="C", patronymic="C", description="C")
+    student_ids = [Student.objects.create(credentials=User.objects.create_user(username="contention_student_{}".format(i)),
+                                          name="S", last_name="S", patronymic="S", description="S",
+                                          course_number=1).id
+                   for i in range(students)]
+    subject = Subject.objects.create(name="Contention")
+    theme_ids = [Theme.objects.create(curator=curator, subject=subject, title="Popular {}".format(i),
+                                      description="D").id for i in range(themes)]
+    status_id = reference_data.get_id(SuggestionThemeStatus, "WAITING_STUDENT")
+    date_creation = localtime()
+    SuggestionTheme.objects.bulk_create(
+        SuggestionTheme(theme_id=theme_id, curator=curator, student_id=student_id, status_id=status_id,
+                        date_creation=date_creation)
+        for theme_id in theme_ids for student_id in student_ids)
+    suggestion_ids = list(SuggestionTheme.objects.filter(theme_id__in=theme_ids).order_by('id')
+                          .values_list('id', flat=True))
+    random.Random(seed).shuffle(suggestion_ids)
+    return suggestion_ids
+
+
+def accept(suggestion_id: int, status: SuggestionThemeStatus) -> str:
+    """
+    Sends accept as by suggestion PUT view, returns outcome
+    """
+    suggestion = SuggestionTheme.objects.select_related('theme', 'progress').get(pk=suggestion_id)
+    serializer = SuggestionThemeSerializerRelatedChangeable(suggestion, data={'status_id': status.id})
+    serializer.is_valid(raise_exception=True)
+    try:
+        serializer.update(suggestion, validated_data=serializer.validated_data)
+    except serializers.ValidationError:
+        return 'taken'
+    return 'accepted'
+
+
+def benchmark_contention(themes: int = 5, students: int = 20, threads: int = 8, seed: int = 0) -> dict:
+    """
+    Returns {'themes', 'requests', 'accepted', 'taken', 'errors', 'seconds', 'throughput' (requests per second)}
+
+    Mention: With a single thread requests are sent by the calling thread (and its connection, e.g. in test case).
+    """
+    suggestion_ids = seed_contention(themes, students, seed)
+    status = SuggestionThemeStatus.objects.get(name="ACCEPTED_BOTH")
+    outcomes = {'accepted': 0, 'taken': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def work(ids: list):
+        for suggestion_id in ids:
+            try:
+                outcome = accept(suggestion_id, status)
+            except Exception:
+                outcome = 'errors'
+            with lock:
+                outcomes[outcome] += 1
+
+    def run(ids: list):
+        try:
+            work(ids)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    if threads <= 1:
+        work(suggestion_ids)
+    else:
+        workers = [threading.Thread(target=run, args=(suggestion_ids[i::threads], )) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    seconds = time.perf_counter() - started
+    return dict(outcomes, themes=themes, requests=len(suggestion_ids), seconds=seconds,
+                throughput=len(suggestion_ids) / seconds if seconds else None)
@@ -0,0 +1,180 @@
+"""
+Deterministic dataset of benchmark, its size grows linearly with scale factor
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import Group, User
+from django.utils.timezone import utc
+
+from rest_framework.authtoken.models import Token
+
+from ...models.curator import Curator
+from ...models.student import Student
+from ...models.student import Group as AcademicGroup
+from ...models.skill import Skill
+from ...models.theme import Subject, Theme
+from ...models.work import Work, WorkStep, WorkStepStatus, WorkStepMaterial, WorkStepComment
+from ...models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress, \
+    SuggestionThemeComment
+from ..reference_data import reference_data
+from ..search import rebuild_index
+
+SUGGESTION_THEME_STATUSES = ['WAITING_CURATOR', 'WAITING_STUDENT', 'IN_PROGRESS_CURATOR', 'IN_PROGRESS_STUDENT',
+                             'CHANGED_CURATOR', 'CHANGED_STUDENT', 'REJECTED_CURATOR', 'REJECTED_STUDENT',
+                             'ACCEPTED_BOTH']
+WORK_STEP_STATUSES = ['Не выполнен', 'В процессе', 'Выполнен']
+
+CURATORS_PER_SCALE = 5
+STUDENTS_PER_SCALE = 25
+THEMES_PER_CURATOR = 10     # every second one is taken by student and has work
+STEPS_PER_WORK = 5
+COMMENTS_PER_ENTRY = 2
+SKILLS_PER_ENTRY = 3
+
+PASSWORD = "benchmark"
+DATE_BASE = datetime(2018, 9, 1, tzinfo=utc)
+
+
+class Dataset:
+    """
+    Seeds database and keeps ids of entries benchmark requests are sent to
+
+    Mention: Requests are sent on behalf of first curator (api allows only curators),
+             its work, step, theme and suggestion (of free theme) are related to first student.
+    """
+    def __init__(self, scale: int = 1, seed: int = 0):
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.ids = {}
+        self.token = None
+        self.username = None
+
+    def date(self, days: int) -> datetime:
+        return DATE_BASE + timedelta(days=days)
+
+    def seed(self) -> 'Dataset':
+        rnd = self.random
+        group_curators = Group.objects.get_or_create(name="curators")[0]
+        group_students = Group.objects.get_or_create(name="students")[0]
+        suggestion_statuses = {name: SuggestionThemeStatus.objects.create(name=name)
+                               for name in SUGGESTION_THEME_STATUSES}
+        step_statuses = [WorkStepStatus.objects.create(name=name) for name in WORK_STEP_STATUSES]
+        Subject.objects.bulk_create([Subject(name="Subject {}".format(i)) for i in range(5)])
+        subjects = list(Subject.objects.order_by('id'))
+        Skill.objects.bulk_create([Skill(name="Skill {}".format(i)) for i in range(20)])
+        skills = list(Skill.objects.order_by('id'))
+        AcademicGroup.objects.bulk_create([AcademicGroup(name="11-60{}".format(i)) for i in range(4)])
+        academic_groups = list(AcademicGroup.objects.order_by('id'))
+
+        curators = self.create_men(Curator, group_curators, CURATORS_PER_SCALE * self.scale, skills)
+        students = self.create_men(Student, group_students, STUDENTS_PER_SCALE * self.scale, skills,
+                                   lambda i: {'course_number': i % 4 + 1, 'group_id': rnd.choice(academic_groups).id})
+
+        themes = []
+        for curator in curators:
+            for i in range(THEMES_PER_CURATOR):
+                student = students[(curator.id + i) % len(students)] if i % 2 == 0 else None
+                if curator is curators[0] and i == 0:
+                    student = students[0]
+                themes.append(Theme(curator=curator, student=student, subject=rnd.choice(subjects),
+                                    title="Theme {}.{}".format(curator.id, i), description="Description",
+                                    date_creation=self.date(i), date_acceptance=self.date(i + 1) if student else None))
+        Theme.objects.bulk_create(themes)
+        themes = list(Theme.objects.order_by('id'))
+        Theme.skills.through.objects.bulk_create([
+            Theme.skills.through(theme_id=theme.id, skill_id=skill.id)
+            for theme in themes for skill in rnd.sample(skills, SKILLS_PER_ENTRY)
+        ])
+
+        taken_themes = [theme for theme in themes if theme.student_id]
+        Work.objects.bulk_create([Work(theme=theme, date_start=self.date(10)) for theme in taken_themes])
+        works = list(Work.objects.order_by('id'))
+        WorkStep.objects.bulk_create([
+            WorkStep(work=work, status=rnd.choice(step_statuses), title="Step {}".format(i), description="Description",
+                     date_start=self.date(10 + i), date_finish=self.date(11 + i))
+            for work in works for i in range(STEPS_PER_WORK)
+        ])
+        steps = list(WorkStep.objects.order_by('id'))
+        WorkStepComment.objects.bulk_create([
+            WorkStepComment(step=step, author_name="Author", content="Comment {}".format(i), date_creation=self.date(20))
+            for step in steps for i in range(COMMENTS_PER_ENTRY)
+        ])
+        WorkStepMaterial.objects.bulk_create([WorkStepMaterial(step=step, content="http://example.com/")
+                                              for step in steps])
+
+        suggestions = []
+        free_theme = next(theme for theme in themes if theme.curator_id == curators[0].id and not theme.student_id)
+        for theme in themes:
+            if theme.student_id:
+                suggestions.append(SuggestionTheme(theme=theme, curator_id=theme.curator_id, student_id=theme.student_id,
+                                                   status=suggestion_statuses['ACCEPTED_BOTH'],
+                                                   date_creation=theme.date_creation))
+            else:
+                progress = SuggestionThemeProgress.objects.create(title=theme.title, description=theme.description)
+                student = students[0] if theme is free_theme else rnd.choice(students)
+                suggestions.append(SuggestionTheme(theme=theme, curator_id=theme.curator_id,
+                                                   student=student, progress=progress,
+                                                   status=suggestion_statuses['IN_PROGRESS_STUDENT'],
+                                                   date_creation=theme.date_creation))
+        SuggestionTheme.objects.bulk_create(suggestions)
+        suggestions = list(SuggestionTheme.objects.order_by('id'))
+        SuggestionThemeComment.objects.bulk_create([
+            SuggestionThemeComment(suggestion=suggestion, author_name="Author", content="Comment {}".format(i),
+                                   date_creation=self.date(20))
+            for suggestion in suggestions for i in range(COMMENTS_PER_ENTRY)
+        ])
+        reference_data.invalidate()
+        rebuild_index()     # bulk writes are not indexed
+
+        curator, student = curators[0], students[0]
+        work = Work.objects.filter(theme__curator=curator, theme__student=student).order_by('id').first()
+        self.ids = {
+            'curator_id': curator.id,
+            'student_id': student.id,
+            'work_id': work.id,
+            'step_id': work.step_set.order_by('id').first().id,
+            'theme_id': work.theme_id,
+            'free_theme_id': free_theme.id,
+            'suggestion_id': SuggestionTheme.objects.get(theme=free_theme).id,     # with progress
+            'subject_id': subjects[0].id,
+            'skill_id': skills[0].id,
+            'group_id': academic_groups[0].id,
+            'step_status_id': step_statuses[0].id,
+            'suggestion_status_id': suggestion_statuses['WAITING_CURATOR'].id,
+        }
+        self.username = curator.credentials.username
+        User.objects.filter(pk=curator.credentials_id).update(is_staff=True)    # staff routes (export)
+        self.token = Token.objects.create(user=curator.credentials).key
+        return self
+
+    def create_men(self, model, group: Group, count: int, skills: list, get_fields=None) -> list:
+        """
+        Only first man can log in, password hashing would dominate seeding time
+        """
+        prefix = model.__name__.lower()
+        users = []
+        for i in range(count):
+            user = User(username="{}.{}".format(prefix, i), first_name="Name", last_name=str(i))
+            if i == 0:
+                user.set_password(PASSWORD)
+            else:
+                user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users)
+        users = list(User.objects.filter(username__startswith=prefix + ".").order_by('id'))
+        User.groups.through.objects.bulk_create([User.groups.through(user_id=user.id, group_id=group.id)
+                                                 for user in users])
+        model.objects.bulk_create([
+            model(credentials=user, name="Name", last_name=str(i), patronymic="Patronymic", description="Description",
+                  **(get_fields(i) if get_fields else {}))
+            for i, user in enumerate(users)
+        ])
+        men = list(model.objects.order_by('id'))
+        through = model.skills.through
+        through.objects.bulk_create([
+            through(**{model._meta.model_name + '_id': man.id, 'skill_id': skill.id})
+            for man in men for skill in self.random.sample(skills, SKILLS_PER_ENTRY)
+        ])
+        return men
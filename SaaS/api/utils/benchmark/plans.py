@@ -0,0 +1,104 @@
+"""
+Query plans (EXPLAIN) of hot lookups of views, full scans of large tables are regressions
+
+Mention: Querysets are built by the same view methods requests use. SQLite plan lines 'SCAN <table>'
+         (with or without index) and PostgreSQL 'Seq Scan on <table>' are full scans. PostgreSQL prefers
+         sequential scans of small tables, so plans are taken with enable_seqscan off:
+         a sequential scan is left only where no index fits.
+         Pages of ordered lists must be read in index order (no sort step) on SQLite, PostgreSQL plans
+         of seeded dataset are cost-based and may sort.
+"""
+
+import re
+from collections import OrderedDict
+
+from django.db import connection
+from django.db.models import Count
+from django.utils.timezone import localtime
+
+from ...models.theme import Theme
+from ...models.work import WorkStep, WorkStepComment, WorkStepMaterial
+from ...models.suggestion import SuggestionTheme, SuggestionThemeComment, SuggestionThemeStatus
+from ...models.sync import Tombstone
+from ...views.curator import CuratorBaseViewAbstract
+from ...views.student import StudentBaseViewAbstract
+from ..reference_data import reference_data
+
+LARGE_TABLES = ('Theme', 'Work', 'Work_step', 'Work_step_comment', 'Work_step_material',
+                'Suggestion_theme', 'Suggestion_theme_comment', 'Tombstone')
+
+SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?"?(\w+)"?'),
+    'postgresql': re.compile(r'Seq Scan on "?(\w+)"?'),
+}
+
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+}
+
+# lists read by pages in index order
+ORDERED_QUERIES = ('curator themes', 'student themes', 'curator suggestions', 'student suggestions',
+                   'curator steps', 'student steps', 'step materials', 'step comments', 'suggestion comments',
+                   'curator tombstones', 'student tombstones')
+
+PAGE_SIZE = 51     # page of cursor pagination and the next entry
+
+
+def get_hot_queries(ids: dict) -> OrderedDict:
+    """
+    {name: queryset} of ownership, status and thread lookups of views for ids of benchmark dataset
+    """
+    curator_id, student_id, work_id, step_id = ids['curator_id'], ids['student_id'], ids['work_id'], ids['step_id']
+    suggestion_id = ids['suggestion_id']
+    suggestion = SuggestionTheme.objects.get(pk=suggestion_id)
+    queries = OrderedDict()
+    for owner, view, owner_id in (('curator', CuratorBaseViewAbstract(), curator_id),
+                                  ('student', StudentBaseViewAbstract(), student_id)):
+        queries[owner + ' works'] = view.get_related_works(owner_id)
+        queries[owner + ' work'] = view.get_related_works(owner_id).filter(pk=work_id)
+        queries[owner + ' steps'] = view.get_related_steps(owner_id, work_id)
+        queries[owner + ' step'] = view.get_related_steps(owner_id, work_id).filter(pk=step_id)
+        queries[owner + ' themes'] = view.get_related_themes(owner_id).order_by('-date_creation', '-id')[:PAGE_SIZE]
+        queries[owner + ' suggestions'] = view.get_related_suggestions(owner_id) \
+            .order_by('-date_creation', '-id')[:PAGE_SIZE]
+        queries[owner + ' suggestion'] = view.get_related_suggestions(owner_id).filter(pk=suggestion_id)
+        queries[owner + ' tombstones'] = Tombstone.objects.filter(**{owner + '_id': owner_id, 'sequence__gt': 0}) \
+            .order_by('sequence')
+    queries['step materials'] = WorkStepMaterial.objects.filter(step_id=step_id).order_by('id')
+    queries['step comments'] = WorkStepComment.objects.filter(step_id=step_id) \
+        .order_by('-date_creation', '-id')[:PAGE_SIZE]
+    queries['suggestion comments'] = SuggestionThemeComment.objects.filter(suggestion_id=suggestion_id) \
+        .order_by('-date_creation', '-id')[:PAGE_SIZE]
+    queries['suggestion rejection'] = SuggestionTheme.objects \
+        .filter(theme_id=suggestion.theme_id, curator_id=suggestion.curator_id).exclude(student_id=suggestion.student_id)
+    queries['summary suggestions'] = SuggestionTheme.objects.filter(curator_id=curator_id).order_by() \
+        .values_list('status__name').annotate(count=Count('id'))
+    queries['summary themes'] = Theme.objects.filter(curator_id=curator_id, student__isnull=True).values('id')
+    rejected_ids = [row.id for row in reference_data.table(SuggestionThemeStatus).rows if row.name.startswith('REJECTED_')]
+    queries['retention suggestions'] = SuggestionTheme.objects \
+        .filter(status_id__in=rejected_ids, date_update__lt=localtime()).values('id')
+    queries['sync steps'] = WorkStep.objects.filter(work__theme__curator_id=curator_id, sequence__gt=0).values('id')
+    return queries
+
+
+def explain(queryset) -> str:
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')    # until the end of transaction
+    return queryset.explain()
+
+
+def get_full_scans(plan: str, tables=LARGE_TABLES) -> list:
+    """
+    Large tables read by full scan in plan (of table or of whole index)
+    """
+    pattern = SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return []
+    return [table for table in pattern.findall(plan) if table in tables]
+
+
+def has_sort(plan: str) -> bool:
+    pattern = SORT_PATTERNS.get(connection.vendor)
+    return pattern is not None and pattern.search(plan) is not None
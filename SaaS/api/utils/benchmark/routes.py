@@ -0,0 +1,146 @@
+"""
+Routes of api/urls.py with request payloads of write methods
+"""
+
+import re
+
+from .dataset import PASSWORD
+
+URL_PREFIX = '/api/v1/'
+METHODS = ('get', 'post', 'put', 'delete')
+
+
+def man_data(ids: dict) -> dict:
+    return {'name': "Name", 'last_name': "Last name", 'patronymic': "Patronymic", 'description': "Description",
+            'skills_id': [ids['skill_id']]}
+
+
+def student_data(ids: dict) -> dict:
+    return dict(man_data(ids), course_number=2, group_id=ids['group_id'])
+
+
+def step_data(ids: dict) -> dict:
+    return {'title': "Step", 'description': "Description", 'status_id': ids['step_status_id'],
+            'date_start': "2018-09-20T10:00:00Z", 'date_finish': "2018-09-25T10:00:00Z"}
+
+
+def theme_data(ids: dict) -> dict:
+    return {'title': "Theme", 'description': "Description", 'subject_id': ids['subject_id'],
+            'skills_id': [ids['skill_id']], 'student_id': None}
+
+
+def suggestion_data(ids: dict) -> dict:
+    return {'theme_id': ids['free_theme_id'], 'student_id': ids['student_id'], 'curator_id': ids['curator_id'],
+            'status_id': ids['suggestion_status_id']}
+
+
+def transitions_data(ids: dict) -> dict:
+    return {'transitions': [{'id': ids['suggestion_id'], 'status_id': ids['suggestion_status_id']}]}
+
+
+def assign_data(ids: dict) -> dict:
+    return {'student_ids': [ids['student_id']], 'theme_ids': [ids['free_theme_id']]}
+
+
+def work_data(ids: dict) -> dict:
+    return {'date_finish': "2018-10-01T10:00:00Z"}
+
+
+def bulk_data(ids: dict) -> dict:
+    return {'creates': [step_data(ids) for i in range(10)],
+            'updates': [{'id': ids['step_id'], 'title': "Updated"}]}
+
+
+def material_data(ids: dict) -> dict:
+    return {'content': "http://example.com/"}
+
+
+def comment_data(ids: dict) -> dict:
+    return {'author_name': "Author", 'content': "Comment"}
+
+
+def progress_data(ids: dict) -> dict:
+    return {'title': "Progress", 'description': "Description"}
+
+
+def no_data(ids: dict) -> dict:
+    return {}
+
+
+# (route, method) -> payload factory, methods without payload are sent without body
+PAYLOADS = {
+    ('login', 'post'): lambda ids: {'username': ids['username'], 'password': PASSWORD},
+    ('curators/<int:curator_id>', 'put'): man_data,
+    ('curators/<int:curator_id>/works/<int:work_id>', 'put'): work_data,
+    ('curators/<int:curator_id>/works/<int:work_id>/steps', 'post'): step_data,
+    ('curators/<int:curator_id>/works/<int:work_id>/steps/bulk', 'post'): bulk_data,
+    ('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>', 'put'): step_data,
+    ('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>/materials', 'post'): material_data,
+    ('curators/<int:curator_id>/works/<int:work_id>/steps/<int:step_id>/comments', 'post'): comment_data,
+    ('curators/<int:curator_id>/themes', 'post'): theme_data,
+    ('curators/<int:curator_id>/themes/<int:theme_id>', 'put'): theme_data,
+    ('curators/<int:curator_id>/suggestions', 'post'): suggestion_data,
+    ('curators/<int:curator_id>/suggestions/bulk', 'post'): transitions_data,
+    ('curators/<int:curator_id>/suggestions/<int:suggestion_id>', 'put'): suggestion_data,
+    ('curators/<int:curator_id>/suggestions/<int:suggestion_id>/progress', 'put'): progress_data,
+    ('curators/<int:curator_id>/suggestions/<int:suggestion_id>/comments', 'post'): comment_data,
+    ('themes/suggestions/assign', 'post'): assign_data,
+    ('students/<int:student_id>', 'put'): student_data,
+    ('students/<int:student_id>/works/<int:work_id>', 'put'): work_data,
+    ('students/<int:student_id>/works/<int:work_id>/steps', 'post'): step_data,
+    ('students/<int:student_id>/works/<int:work_id>/steps/<int:step_id>', 'put'): step_data,
+    ('students/<int:student_id>/works/<int:work_id>/steps/<int:step_id>/materials', 'post'): material_data,
+    ('students/<int:student_id>/works/<int:work_id>/steps/<int:step_id>/comments', 'post'): comment_data,
+    ('students/<int:student_id>/themes', 'post'): theme_data,
+    ('students/<int:student_id>/themes/<int:theme_id>', 'put'): suggestion_data,
+    ('students/<int:student_id>/suggestions', 'post'): suggestion_data,
+    ('students/<int:student_id>/suggestions/<int:suggestion_id>', 'put'): suggestion_data,
+    ('students/<int:student_id>/suggestions/<int:suggestion_id>/progress', 'put'): progress_data,
+    ('students/<int:student_id>/suggestions/<int:suggestion_id>/comments', 'post'): comment_data,
+}
+
+
+# (route, method) -> query string
+QUERIES = {
+    ('themes/search', 'get'): 'q=Theme',
+    ('comments/search', 'get'): 'q=Comment',
+}
+
+
+class Route:
+    def __init__(self, pattern: str, method: str):
+        self.pattern = pattern
+        self.method = method
+
+    @property
+    def name(self) -> str:
+        return "{} {}".format(self.method.upper(), self.pattern)
+
+    @property
+    def is_write(self) -> bool:
+        return self.method != 'get'
+
+    def get_url(self, ids: dict) -> str:
+        url = URL_PREFIX + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: str(ids[match.group(1)]), self.pattern)
+        query = QUERIES.get((self.pattern, self.method))
+        return url + '?' + query if query else url
+
+    def get_data(self, ids: dict) -> dict:
+        return PAYLOADS.get((self.pattern, self.method), no_data)(ids)
+
+
+def get_routes(urlpatterns=None) -> list:
+    """
+    Every (route, method) handled by views of api
+    """
+    if urlpatterns is None:
+        from ...urls import urlpatterns
+    routes = []
+    for urlpattern in urlpatterns:
+        view_class = getattr(urlpattern.callback, 'view_class', None)
+        if view_class is None:
+            continue
+        for method in METHODS:
+            if hasattr(view_class, method):
+                routes.append(Route(str(urlpattern.pattern), method))
+    return routes
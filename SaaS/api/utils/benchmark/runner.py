@@ -0,0 +1,112 @@
+"""
+Runs benchmark routes through django test client and compares results with baseline
+"""
+
+import math
+import time
+
+from django.db import transaction
+from django.test import Client
+
+from .dataset import Dataset
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Nearest-rank percentile
+    """
+    values = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def is_failed(result: dict) -> bool:
+    return any(status_code >= 400 for status_code in result['statuses'])
+
+
+class RouteResult:
+    def __init__(self, route):
+        self.route = route
+        self.latencies = []
+        self.queries = []
+        self.statuses = set()
+        self.errors = []
+
+    def add(self, latency: float, queries: int, status_code: int):
+        self.latencies.append(latency)
+        self.queries.append(queries)
+        self.statuses.add(status_code)
+
+    def as_dict(self) -> dict:
+        return {
+            'p50': percentile(self.latencies, 50) * 1000,
+            'p90': percentile(self.latencies, 90) * 1000,
+            'p99': percentile(self.latencies, 99) * 1000,
+            'queries': max(self.queries),
+            'statuses': sorted(self.statuses),
+            'errors': sorted(set(self.errors)),
+        }
+
+
+class Runner:
+    """
+    Sends every route several times, writes are rolled back so every request sees the same dataset
+
+    Mention: Query count is taken from TimingMiddleware (request.timing), so it works with DEBUG off.
+    """
+    def __init__(self, dataset: Dataset, routes: list, iterations: int = 20, warmup: int = 1):
+        self.dataset = dataset
+        self.routes = routes
+        self.iterations = iterations
+        self.warmup = warmup
+        self.client = Client(HTTP_AUTHORIZATION="Token " + dataset.token)
+
+    def send(self, route, url: str, data: dict):
+        send = getattr(self.client, route.method)
+        if route.method == 'get':
+            return send(url)
+        return send(url, data, content_type='application/json')
+
+    def run_route(self, route) -> RouteResult:
+        ids = dict(self.dataset.ids, username=self.dataset.username)
+        url, data = route.get_url(ids), route.get_data(ids)
+        result = RouteResult(route)
+        for i in range(self.warmup + self.iterations):
+            try:
+                with transaction.atomic():
+                    started = time.perf_counter()
+                    response = self.send(route, url, data)
+                    latency = time.perf_counter() - started
+                    if route.is_write:
+                        transaction.set_rollback(True)
+            except Exception as e:     # test client re-raises exceptions of views
+                result.errors.append(repr(e))
+                result.add(time.perf_counter() - started, 0, 500)
+                continue
+            if i >= self.warmup:
+                timing = getattr(response.wsgi_request, 'timing', None)
+                result.add(latency, timing.queries if timing else 0, response.status_code)
+        return result
+
+    def run(self) -> dict:
+        return {route.name: self.run_route(route).as_dict() for route in self.routes}
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.5) -> list:
+    """
+    Regressions against baseline: new failures, any growth of query count, growth of p50/p90 latency above tolerance
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if is_failed(result) and not is_failed(base):
+            regressions.append("{}: statuses {} -> {}".format(name, base['statuses'], result['statuses']))
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append("{}: queries {} -> {}".format(name, base['queries'], result['queries']))
+        for key in ('p50', 'p90'):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append("{}: {} {:.2f}ms -> {:.2f}ms".format(name, key, base[key], result[key]))
+    return regressions
@@ -0,0 +1,62 @@
+"""
+Compares list serialization by DRF serializers and by compiled serializers
+
+Mention: DRF querysets are eagerly loaded by serializer relations, so both paths read every relation once.
+"""
+
+import time
+
+from ...models.curator import Curator
+from ...models.student import Student
+from ...models.theme import Theme
+from ...models.work import Work, WorkStep, WorkStepComment, WorkStepMaterial
+from ...models.suggestion import SuggestionTheme
+from ...serializers.compiled import get_compiled_serializer
+from ...serializers.selection import setup_eager_loading
+from ...serializers.curator import CuratorSerializerNoSkills
+from ...serializers.student import StudentSerializerSkillIDGroupIntermediate
+from ...serializers.theme import ThemeSerializerRelatedIntermediate
+from ...serializers.work import (WorkSerializerRelatedIntermediate, WorkStepSerializer,
+                                 WorkStepCommentSerializer, WorkStepMaterialSerializer)
+from ...serializers.suggestion import SuggestionThemeSerializerRelatedIntermediate
+from .runner import percentile
+
+SERIALIZERS = (
+    (CuratorSerializerNoSkills, Curator),
+    (StudentSerializerSkillIDGroupIntermediate, Student),
+    (ThemeSerializerRelatedIntermediate, Theme),
+    (SuggestionThemeSerializerRelatedIntermediate, SuggestionTheme),
+    (WorkSerializerRelatedIntermediate, Work),
+    (WorkStepSerializer, WorkStep),
+    (WorkStepCommentSerializer, WorkStepComment),
+    (WorkStepMaterialSerializer, WorkStepMaterial),
+)
+
+
+def measure(function, iterations: int) -> float:
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+    return percentile(latencies, 50) * 1000
+
+
+def benchmark_serializers(iterations: int = 20) -> dict:
+    """
+    Returns {serializer name: {'entries', 'drf', 'compiled' (p50 ms), 'speedup'}} of whole table lists
+    """
+    results = {}
+    for serializer_class, model in SERIALIZERS:
+        queryset = model.objects.order_by('id')
+        compiled = get_compiled_serializer(serializer_class)
+        drf_queryset = setup_eager_loading(queryset, serializer_class())
+        drf = measure(lambda: serializer_class(drf_queryset.all(), many=True).data, iterations)
+        fast = measure(lambda: compiled.serialize(queryset.all()), iterations)
+        results[serializer_class.__name__] = {
+            'entries': queryset.count(),
+            'drf': drf,
+            'compiled': fast,
+            'speedup': drf / fast if fast else None,
+        }
+    return results
@@ -0,0 +1,159 @@
+"""
+In-process bus of suggestion and comment changes for event streams of curators and students
+
+Mention: Events are published after commit of the transaction that made the change (post_save + on_commit),
+         the latest API_EVENTS_BUFFER_SIZE events are kept for resume by Last-Event-ID.
+         Event id is '<bus epoch>-<sequence>', ids of other process (or of restarted one) are not resumable,
+         so with several worker processes a stream would see changes made by its own process only,
+         Procfile runs one (threaded) worker process, WEB_CONCURRENCY is not applied.
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from ..models.suggestion import SuggestionTheme, SuggestionThemeProgress, SuggestionThemeComment
+from ..models.work import WorkStep, WorkStepComment
+
+EVENTS_BUFFER_SIZE = getattr(settings, 'API_EVENTS_BUFFER_SIZE', 10000)
+
+Event = namedtuple('Event', ('sequence', 'kind', 'curator_id', 'student_id', 'data'))
+
+
+class EventBus:
+    """
+    Bounded log of events, readers wait on condition for events newer than they have seen
+    """
+    def __init__(self, size: int = EVENTS_BUFFER_SIZE):
+        self.epoch = str(int(time.time() * 1000))
+        self._events = deque(maxlen=size)
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def get_id(self, event: Event) -> str:
+        return "{}-{}".format(self.epoch, event.sequence)
+
+    def parse_id(self, event_id: str):
+        """
+        Returns sequence of event id or None if the event is not in the bus (foreign, expired or invalid)
+        """
+        epoch, _, sequence = (event_id or '').partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        with self._condition:
+            oldest = self._events[0].sequence if self._events else self._sequence + 1
+            if sequence > self._sequence or sequence < oldest - 1:
+                return None
+        return sequence
+
+    def publish(self, kind: str, data: dict, curator_id: int = None, student_id: int = None) -> Event:
+        with self._condition:
+            self._sequence += 1
+            event = Event(self._sequence, kind, curator_id, student_id, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def get_events(self, after: int, curator_id: int = None, student_id: int = None) -> tuple:
+        """
+        Returns events of curator/student after sequence (in order) and sequence of the last event of bus
+        """
+        events = []
+        with self._condition:
+            sequence = self._sequence
+            for event in reversed(self._events):    # only new events are visited
+                if event.sequence <= after:
+                    break
+                events.append(event)
+        events.reverse()
+        return [event for event in events
+                if (curator_id is None or event.curator_id == curator_id)
+                and (student_id is None or event.student_id == student_id)], max(after, sequence)
+
+    def wait(self, after: int, timeout: float) -> bool:
+        """
+        Waits for any event after sequence, returns False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._sequence > after, timeout)
+
+    def clear(self):
+        with self._condition:
+            self._events.clear()
+
+
+event_bus = EventBus()
+
+
+def publish_on_commit(kind: str, data: dict, curator_id: int = None, student_id: int = None):
+    transaction.on_commit(lambda: event_bus.publish(kind, data, curator_id, student_id))
+
+
+def get_suggestion_data(suggestion: SuggestionTheme) -> dict:
+    return {'id': suggestion.id, 'theme_id': suggestion.theme_id, 'status_id': suggestion.status_id,
+            'progress_id': suggestion.progress_id, 'version': suggestion.version}
+
+
+def publish_suggestions(suggestion_ids):
+    """
+    Queryset updates do not send post_save, changed suggestions are read after commit
+    """
+    suggestion_ids = list(suggestion_ids)
+
+    def publish():
+        for suggestion in SuggestionTheme.objects.filter(pk__in=suggestion_ids).order_by('id'):
+            event_bus.publish('suggestion', get_suggestion_data(suggestion), suggestion.curator_id, suggestion.student_id)
+    if suggestion_ids:
+        transaction.on_commit(publish)
+
+
+def get_comment_data(comment, **related) -> dict:
+    """
+    Representation of comment as by comment list views
+    """
+    return dict({'id': comment.id, 'author_name': comment.author_name, 'content': comment.content,
+                 'date_creation': comment.date_creation}, **related)
+
+
+def suggestion_saved(sender, instance, **kwargs):
+    publish_on_commit('suggestion', get_suggestion_data(instance), instance.curator_id, instance.student_id)
+
+
+def progress_saved(sender, instance, created, **kwargs):
+    if created:     # suggestion is saved with the new progress
+        return
+    data = {'id': instance.id, 'title': instance.title, 'description': instance.description,
+            'date_update': instance.date_update}
+    for suggestion_id, curator_id, student_id in instance.suggestion.values_list('id', 'curator_id', 'student_id'):
+        publish_on_commit('progress', dict(data, suggestion_id=suggestion_id), curator_id, student_id)
+
+
+def suggestion_comment_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    suggestion = instance.suggestion
+    publish_on_commit('suggestion_comment', get_comment_data(instance, suggestion_id=suggestion.id),
+                      suggestion.curator_id, suggestion.student_id)
+
+
+def step_comment_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    curator_id, student_id = WorkStep.objects.filter(pk=instance.step_id) \
+        .values_list('work__theme__curator_id', 'work__theme__student_id').get()
+    publish_on_commit('step_comment', get_comment_data(instance, step_id=instance.step_id), curator_id, student_id)
+
+
+post_save.connect(suggestion_saved, sender=SuggestionTheme, weak=False)
+post_save.connect(progress_saved, sender=SuggestionThemeProgress, weak=False)
+post_save.connect(suggestion_comment_saved, sender=SuggestionThemeComment, weak=False)
+post_save.connect(step_comment_saved, sender=WorkStepComment, weak=False)
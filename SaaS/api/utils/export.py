@@ -0,0 +1,114 @@
+"""
+NDJSON export of the dataset for reporting jobs
+
+Mention: Line is {"type": ..., "data": {column: value}} of one row (foreign keys are ids),
+         the last line is {"type": "watermark", "data": {"until": ...}}, it is 'since' of the next incremental export.
+         Watermark is change sequence number of delta sync (models.sync.get_sequence), rows are renumbered
+         by database triggers on every write (also queryset updates), it does not depend on clocks of app servers.
+         Incremental export needs sync triggers (PostgreSQL, SQLite), rows deleted after 'since' are exported
+         as {"type": "deleted", "data": {"kind": <type of row line>, "object_id": ...}} from their tombstones.
+         Rows are read by iterator(chunk_size) (server-side cursors on PostgreSQL), so memory does not grow with dataset.
+"""
+
+from django.conf import settings
+from django.db import models
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+from ..models.theme import Theme
+from ..models.work import Work, WorkStep, WorkStepComment, WorkStepMaterial
+from ..models.suggestion import SuggestionTheme, SuggestionThemeComment
+from ..models.sync import Tombstone, get_sequence
+from ..serializers.compiled import get_datetime_converter
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'API_EXPORT_CHUNK_SIZE', 2000)
+
+
+class ExportTable:
+    """
+    Concrete columns of model, 'changed' is lookup of row change sequence number (None if table is not exported incrementally),
+    'tombstone' is kind of tombstones of its deleted rows
+    """
+    def __init__(self, name: str, model, changed: str = None, tombstone: str = None):
+        self.name = name
+        self.model = model
+        self.changed = changed
+        self.tombstone = tombstone
+        self.columns = [field.attname for field in model._meta.concrete_fields]
+        self.datetime_columns = {index for index, field in enumerate(model._meta.concrete_fields)
+                                 if isinstance(field, models.DateTimeField)}
+
+    def get_queryset(self, since: int = None, until: int = None, **lookups):
+        queryset = self.model._default_manager.filter(**lookups).order_by('pk')
+        if since is not None:
+            queryset = queryset.filter(**{self.changed + '__gt': since})
+        if until is not None:
+            queryset = queryset.filter(**{self.changed + '__lte': until})
+        return queryset.values_list(*self.columns)
+
+    def get_rows(self, since: int = None, chunk_size: int = EXPORT_CHUNK_SIZE, until: int = None, **lookups):
+        """
+        Yields {column: representation} of rows matching lookups, datetimes are represented as by api
+        """
+        to_datetime = get_datetime_converter(serializers.DateTimeField())
+        datetime_columns = self.datetime_columns
+        for row in self.get_queryset(since, until, **lookups).iterator(chunk_size=chunk_size):
+            yield {column: to_datetime(value) if index in datetime_columns and value is not None else value
+                   for index, (column, value) in enumerate(zip(self.columns, row))}
+
+    def get_deleted(self, since: int, until: int, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Yields ids of rows deleted in (since, until]
+
+        Mention: Tombstones of entries that left their curator/student are skipped, those rows still exist.
+        """
+        if self.tombstone is None:
+            return
+        deleted = Tombstone.objects \
+            .filter(kind=self.tombstone, sequence__gt=since, sequence__lte=until) \
+            .exclude(object_id__in=self.model._default_manager.values('pk')) \
+            .order_by('object_id').values_list('object_id', flat=True).distinct()
+        yield from deleted.iterator(chunk_size=chunk_size)
+
+
+EXPORT_TABLES = (
+    ExportTable('theme', Theme, 'sequence', 'themes'),
+    ExportTable('work', Work, 'sequence', 'works'),
+    ExportTable('step', WorkStep, 'sequence', 'steps'),
+    ExportTable('step_comment', WorkStepComment, 'sequence', 'comments'),
+    ExportTable('step_material', WorkStepMaterial, 'sequence', 'materials'),
+    ExportTable('suggestion', SuggestionTheme, 'sequence', 'suggestions'),
+    ExportTable('suggestion_comment', SuggestionThemeComment, 'sequence', 'suggestion_comments'),
+)
+
+
+def parse_watermark(value: str) -> int:
+    """
+    Change sequence number, raises ValueError if it is not valid
+    """
+    value = value.strip()
+    if not value.isdigit():
+        raise ValueError("'{}' is not a valid watermark.".format(value))
+    return int(value)
+
+
+def encode_line(kind: str, data: dict, encoder=JSONEncoder(ensure_ascii=False, separators=(',', ':'))) -> str:
+    return encoder.encode({'type': kind, 'data': data}) + '\n'
+
+
+def export_lines(since=None, tables=EXPORT_TABLES, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Yields NDJSON lines of rows changed after 'since' (all rows if it is None)
+
+    Mention: Watermark is taken before reading, every smaller number is committed (transactions in flight are
+             held back), rows changed after it are skipped and exported next time.
+    """
+    until = get_sequence()
+    for table in tables:
+        for data in table.get_rows(since, chunk_size, until):
+            yield encode_line(table.name, data)
+    if since is not None:
+        for table in tables:
+            for object_id in table.get_deleted(since, until, chunk_size):
+                yield encode_line('deleted', {'kind': table.name, 'object_id': object_id})
+    yield encode_line('watermark', {'until': until})
@@ -0,0 +1,294 @@
+"""
+Skill-based recommendation of open (unassigned) themes
+
+Mention: Index of theme -> skills and skill -> open themes is loaded once per process
+         and updated incrementally on m2m_changed/save/delete of themes
+         (or reloaded after ttl expiration, that bounds staleness between workers).
+         Other workers may have taken a theme meanwhile, so callers must re-check that themes are open.
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from ..models.base import bulk_changed
+from ..models.skill import Skill
+from ..models.theme import Theme
+
+RECOMMENDATION_INDEX_TTL = getattr(settings, 'API_RECOMMENDATION_INDEX_TTL', 300)   # seconds
+
+
+class ThemeSkillIndex:
+    """
+    Sparse index of theme skills, scores open themes by weighted Jaccard similarity
+
+    Mention: Skill weight is its inverse theme frequency, so rare skills matter more than common ones.
+             Only postings of student skills are visited, themes without common skills are not scored.
+             Norms (sums of skill weights) of open themes are kept and shifted only for themes of skill
+             whose frequency changed. Number of themes in weights is fixed at load (until ttl reload),
+             so that created/deleted themes do not change every norm.
+             Scoring runs on copies of postings outside the lock.
+    """
+    def __init__(self, ttl: float = RECOMMENDATION_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._expiration = None
+        self._open_stale = False
+        self.skills = {}                    # theme_id -> set of skill_id
+        self.postings = defaultdict(set)    # skill_id -> set of open theme_id
+        self.frequency = defaultdict(int)   # skill_id -> number of themes
+        self.open = set()
+        self.theme_count = 0                # number of themes in weights, fixed at load
+        self._norms = {}                    # open theme_id -> sum of skill weights
+
+    def invalidate(self, **kwargs):
+        with self._lock:
+            self._expiration = None
+
+    def invalidate_open(self, fields=None, **kwargs):
+        """
+        Queryset writes do not tell which themes were changed
+        """
+        if fields is None or fields & {'student', 'student_id'}:
+            self._open_stale = True
+
+    def _load(self):
+        skills = defaultdict(set)
+        for theme_id, skill_id in Theme.skills.through.objects.values_list('theme_id', 'skill_id').iterator():
+            skills[theme_id].add(skill_id)
+        for theme_id in Theme.objects.values_list('id', flat=True).iterator():
+            skills[theme_id]
+        self.skills = dict(skills)
+        self.theme_count = len(self.skills)
+        self._load_open()
+        self._expiration = time.monotonic() + self.ttl
+
+    def _load_open(self):
+        self._open_stale = False
+        self.open = set(Theme.objects.filter(student__isnull=True).values_list('id', flat=True))
+        self.frequency = defaultdict(int)
+        self.postings = defaultdict(set)
+        for theme_id, skill_ids in self.skills.items():
+            is_open = theme_id in self.open
+            for skill_id in skill_ids:
+                self.frequency[skill_id] += 1
+                if is_open:
+                    self.postings[skill_id].add(theme_id)
+        self._norms = {theme_id: self.get_norm(theme_id) for theme_id in self.open}
+
+    def _ensure_loaded(self):
+        if self._expiration is None or self._expiration < time.monotonic():
+            self._load()
+        elif self._open_stale:
+            self._load_open()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._expiration is not None
+
+    def weight(self, skill_id: int) -> float:
+        return math.log(1 + max(self.theme_count, 1) / (1 + self.frequency.get(skill_id, 0)))
+
+    def get_norm(self, theme_id: int) -> float:
+        return sum(map(self.weight, self.skills.get(theme_id, ())))
+
+    def similarities(self, skill_ids, theme_ids=None) -> dict:
+        """
+        Returns {theme_id: score} of open themes with common skills (optionally only of theme_ids), score is in (0, 1]
+        """
+        with self._lock:
+            self._ensure_loaded()
+            weights = {skill_id: self.weight(skill_id) for skill_id in set(skill_ids)}
+            if theme_ids is not None:
+                theme_ids = set(theme_ids)
+                postings = [(weight, self.postings.get(skill_id, set()) & theme_ids) for skill_id, weight in weights.items()]
+            else:
+                postings = [(weight, tuple(self.postings.get(skill_id, ()))) for skill_id, weight in weights.items()]
+            norms = self._norms     # updated in place, a concurrent update may be seen half-applied
+
+        overlap = {}
+        get_overlap = overlap.get
+        for weight, posting in postings:
+            for theme_id in posting:
+                overlap[theme_id] = get_overlap(theme_id, 0.0) + weight
+
+        student_weight = sum(weights.values())
+        get_norm = norms.get
+        scores = {}
+        for theme_id, common_weight in overlap.items():
+            theme_weight = get_norm(theme_id)
+            if theme_weight is not None:    # closed meanwhile, shifted norms may drift by rounding
+                scores[theme_id] = common_weight / max(theme_weight + student_weight - common_weight, common_weight)
+        return scores
+
+    def recommend(self, skill_ids, limit: int) -> list:
+        """
+        Returns [(theme_id, score)] of the best open themes
+
+        Mention: Themes are grouped by set operations on postings by common skills, score in a group
+                 depends only on norm, so only 'limit' themes with the least norms of each group are scored.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            weights = {skill_id: self.weight(skill_id) for skill_id in set(skill_ids)}
+            groups = []     # [(common weight, set of theme_id)]
+            seen = set()
+            for skill_id, weight in weights.items():
+                posting = self.postings.get(skill_id)
+                if not posting:
+                    continue
+                next_groups = []
+                for common_weight, theme_ids in groups:
+                    common = theme_ids & posting
+                    if common:
+                        next_groups.append((common_weight + weight, common))
+                        theme_ids -= common
+                    if theme_ids:
+                        next_groups.append((common_weight, theme_ids))
+                rest = posting - seen
+                if rest:
+                    next_groups.append((weight, rest))
+                    seen |= rest
+                groups = next_groups
+            norms = self._norms
+
+        student_weight = sum(weights.values())
+        get_norm = norms.get
+        best = []       # min-heap of the best (score, -theme_id)
+        for common_weight, theme_ids in sorted(groups, key=lambda group: -group[0]):
+            # norm is at least common weight, so no theme of this and next groups scores more
+            if len(best) == limit and common_weight / student_weight <= best[0][0]:
+                break
+            for theme_id in heapq.nsmallest(limit, theme_ids, key=lambda theme_id: (get_norm(theme_id, math.inf), theme_id)):
+                theme_weight = get_norm(theme_id)
+                if theme_weight is None:
+                    continue
+                candidate = (common_weight / max(theme_weight + student_weight - common_weight, common_weight), -theme_id)
+                if len(best) < limit:
+                    heapq.heappush(best, candidate)
+                elif candidate > best[0]:
+                    heapq.heapreplace(best, candidate)
+        return [(-negative_id, score) for score, negative_id in sorted(best, reverse=True)]
+
+    # incremental updates, skipped while index is not loaded
+
+    def _set_frequency(self, skill_id: int, frequency: int):
+        """
+        Shifts norms of open themes with skill by the change of its weight
+        """
+        previous = self.weight(skill_id)
+        if frequency:
+            self.frequency[skill_id] = frequency
+        else:
+            self.frequency.pop(skill_id, None)
+        shift = self.weight(skill_id) - previous
+        norms = self._norms
+        for theme_id in self.postings.get(skill_id, ()):
+            norms[theme_id] += shift
+
+    def add_skills(self, theme_id: int, skill_ids):
+        with self._lock:
+            if not self.is_loaded:
+                return
+            theme_skills = self.skills.setdefault(theme_id, set())
+            for skill_id in set(skill_ids) - theme_skills:
+                self._set_frequency(skill_id, self.frequency.get(skill_id, 0) + 1)
+                theme_skills.add(skill_id)
+                if theme_id in self.open:
+                    self.postings[skill_id].add(theme_id)
+                    self._norms[theme_id] += self.weight(skill_id)
+
+    def remove_skills(self, theme_id: int, skill_ids=None):
+        with self._lock:
+            if not self.is_loaded:
+                return
+            theme_skills = self.skills.get(theme_id, set())
+            for skill_id in set(theme_skills if skill_ids is None else skill_ids) & theme_skills:
+                theme_skills.discard(skill_id)
+                if theme_id in self.open:
+                    self.postings[skill_id].discard(theme_id)
+                    self._norms[theme_id] -= self.weight(skill_id)
+                self._set_frequency(skill_id, self.frequency.get(skill_id, 0) - 1)
+
+    def remove_skill(self, skill_id: int):
+        with self._lock:
+            if not self.is_loaded:
+                return
+            weight = self.weight(skill_id)
+            for theme_id in self.postings.pop(skill_id, ()):
+                self._norms[theme_id] -= weight
+            for theme_skills in self.skills.values():
+                theme_skills.discard(skill_id)
+            self.frequency.pop(skill_id, None)
+
+    def set_theme(self, theme_id: int, is_open: bool):
+        with self._lock:
+            if not self.is_loaded:
+                return
+            theme_skills = self.skills.setdefault(theme_id, set())
+            if is_open == (theme_id in self.open):
+                return
+            for skill_id in theme_skills:
+                if is_open:
+                    self.postings[skill_id].add(theme_id)
+                else:
+                    self.postings[skill_id].discard(theme_id)
+            if is_open:
+                self.open.add(theme_id)
+                self._norms[theme_id] = self.get_norm(theme_id)
+            else:
+                self.open.discard(theme_id)
+                self._norms.pop(theme_id, None)
+
+    def remove_theme(self, theme_id: int):
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self.set_theme(theme_id, False)
+            self.remove_skills(theme_id)
+            self.skills.pop(theme_id, None)
+
+
+theme_skill_index = ThemeSkillIndex()
+
+
+def update_theme_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:     # theme.skills changed
+        if action == 'post_add':
+            theme_skill_index.add_skills(instance.pk, pk_set)
+        else:
+            theme_skill_index.remove_skills(instance.pk, pk_set if action == 'post_remove' else None)
+    elif action == 'post_clear':    # skill.theme_set cleared
+        theme_skill_index.remove_skill(instance.pk)
+    else:               # skill.theme_set changed
+        for theme_id in pk_set:
+            if action == 'post_add':
+                theme_skill_index.add_skills(theme_id, [instance.pk])
+            else:
+                theme_skill_index.remove_skills(theme_id, [instance.pk])
+
+
+def update_theme(sender, instance, **kwargs):
+    theme_skill_index.set_theme(instance.pk, instance.student_id is None)
+
+
+def remove_theme(sender, instance, **kwargs):
+    theme_skill_index.remove_theme(instance.pk)
+
+
+def remove_skill(sender, instance, **kwargs):
+    theme_skill_index.remove_skill(instance.pk)
+
+
+m2m_changed.connect(update_theme_skills, sender=Theme.skills.through, weak=False)
+post_save.connect(update_theme, sender=Theme, weak=False)
+post_delete.connect(remove_theme, sender=Theme, weak=False)
+post_delete.connect(remove_skill, sender=Skill, weak=False)
+bulk_changed.connect(theme_skill_index.invalidate_open, sender=Theme, weak=False)
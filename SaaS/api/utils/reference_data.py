@@ -0,0 +1,118 @@
+"""
+Registry of almost-static lookup tables (statuses, subjects, skills, academic groups)
+
+Mention: Table is loaded once per process and reloaded after save/delete of its rows
+         (or after ttl expiration, that bounds staleness between workers).
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_save, post_delete
+
+REFERENCE_DATA_TTL = getattr(settings, 'API_REFERENCE_DATA_TTL', 300)   # seconds
+
+
+class ReferenceTable:
+    """
+    Cached rows of single lookup model with name -> row index
+    """
+    def __init__(self, model, ttl: float = REFERENCE_DATA_TTL):
+        self.model = model
+        self.serializer_class = None
+        self.ttl = ttl
+        self.version = 0
+        self._lock = threading.Lock()
+        self._state = None     # (version, expiration time, rows, rows by name, data, etag)
+
+    def invalidate(self, **kwargs):
+        with self._lock:
+            self.version += 1
+            self._state = None
+
+    def _load(self):
+        state = self._state
+        if state is not None and state[1] >= time.monotonic():
+            return state
+        with self._lock:
+            state = self._state
+            if state is not None and state[1] >= time.monotonic():
+                return state
+            version = self.version
+            rows = list(self.model.objects.order_by('id'))
+            by_name = {row.name: row for row in rows}
+            data, etag = None, None
+            if self.serializer_class:
+                data = self.serializer_class(rows, many=True).data
+                content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf8')
+                etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+            state = (version, time.monotonic() + self.ttl, rows, by_name, data, etag)
+            if version == self.version:     # table was not changed while loading
+                self._state = state
+        return state
+
+    @property
+    def rows(self) -> list:
+        return self._load()[2]
+
+    @property
+    def data(self) -> list:
+        return self._load()[4]
+
+    @property
+    def etag(self) -> str:
+        return self._load()[5]
+
+    def serialized(self) -> tuple:
+        state = self._load()
+        return state[4], state[5]
+
+    def get(self, name: str):
+        row = self._load()[3].get(name)
+        if row is None:
+            raise self.model.DoesNotExist('{} matching name "{}" does not exist.'.format(self.model.__name__, name))
+        return row
+
+    def get_id(self, name: str) -> int:
+        return self.get(name).id
+
+
+class ReferenceRegistry:
+    """
+    model -> ReferenceTable
+    """
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def register(self, model, serializer_class=None) -> ReferenceTable:
+        with self._lock:
+            table = self._tables.get(model)
+            if table is None:
+                table = ReferenceTable(model)
+                post_save.connect(table.invalidate, sender=model, weak=False)
+                post_delete.connect(table.invalidate, sender=model, weak=False)
+                self._tables[model] = table
+            if serializer_class:
+                table.serializer_class = serializer_class
+        return table
+
+    def table(self, model) -> ReferenceTable:
+        return self._tables.get(model) or self.register(model)
+
+    def get(self, model, name: str):
+        return self.table(model).get(name)
+
+    def get_id(self, model, name: str) -> int:
+        return self.table(model).get_id(name)
+
+    def invalidate(self):
+        for table in list(self._tables.values()):
+            table.invalidate()
+
+
+reference_data = ReferenceRegistry()
@@ -0,0 +1,107 @@
+"""
+Retention of rejected suggestions, orphaned progress, expired sessions and idle tokens
+
+Mention: Rows are deleted by batches of primary keys (keyset order), every batch is a short transaction,
+         so cleanup does not hold long locks on hot tables. Rows locked by requests are skipped
+         (SKIP LOCKED where database supports it) and deleted by the next run.
+         Token has no last use date, token is idle if its user has not logged in since the cutoff
+         (Login updates last_login), such clients log in again.
+"""
+
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.timezone import localtime
+
+from rest_framework.authtoken.models import Token
+
+from ..models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress, \
+    SuggestionThemeComment
+from .export import ExportTable, encode_line
+from .reference_data import reference_data
+
+RETENTION_BATCH_SIZE = getattr(settings, 'API_RETENTION_BATCH_SIZE', 500)
+REJECTED_RETENTION_DAYS = getattr(settings, 'API_REJECTED_RETENTION_DAYS', 30)
+TOKEN_IDLE_DAYS = getattr(settings, 'API_TOKEN_IDLE_DAYS', 90)
+
+# archive - (export table, lookup of deleted primary keys) written before delete
+RetentionTask = namedtuple('RetentionTask', ('name', 'get_queryset', 'archive'))
+
+
+def get_rejected_suggestions(now, rejected_days: int = REJECTED_RETENTION_DAYS, **kwargs):
+    status_ids = [row.id for row in reference_data.table(SuggestionThemeStatus).rows if row.name.startswith('REJECTED_')]
+    return SuggestionTheme.objects.filter(status_id__in=status_ids, date_update__lt=now - timedelta(days=rejected_days))
+
+
+def get_orphaned_progress(now, **kwargs):
+    """
+    Progress is created and linked to suggestion in one transaction, so committed rows without suggestion are orphans
+    """
+    return SuggestionThemeProgress.objects.filter(suggestion__isnull=True)
+
+
+def get_expired_sessions(now, **kwargs):
+    return Session.objects.filter(expire_date__lt=now)
+
+
+def get_idle_tokens(now, token_idle_days: int = TOKEN_IDLE_DAYS, **kwargs):
+    cutoff = now - timedelta(days=token_idle_days)
+    return Token.objects.filter(Q(user__last_login__lt=cutoff) | Q(user__last_login__isnull=True, created__lt=cutoff))
+
+
+RETENTION_TASKS = (
+    RetentionTask('rejected_suggestions', get_rejected_suggestions, (
+        (ExportTable('suggestion', SuggestionTheme), 'pk__in'),
+        (ExportTable('suggestion_comment', SuggestionThemeComment), 'suggestion_id__in'),
+    )),
+    RetentionTask('orphaned_progress', get_orphaned_progress, (
+        (ExportTable('suggestion_progress', SuggestionThemeProgress), 'pk__in'),
+    )),
+    RetentionTask('expired_sessions', get_expired_sessions, ()),
+    RetentionTask('idle_tokens', get_idle_tokens, ()),
+)
+
+
+def get_batch(queryset, after, batch_size: int) -> list:
+    """
+    Primary keys of the next batch, locked until the end of transaction
+    """
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True, of=('self', ))
+    return list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+
+
+def run_task(task: RetentionTask, now=None, batch_size: int = RETENTION_BATCH_SIZE, pause: float = 0,
+             archive=None, dry_run: bool = False, **options) -> int:
+    """
+    Deletes rows of task (archived to file-like 'archive' as NDJSON lines before), returns number of deleted rows
+
+    Mention: Dry run counts rows without locking or deleting them.
+    """
+    queryset = task.get_queryset(now or localtime(), **options)
+    if dry_run:
+        return queryset.count()
+    deleted, after = 0, None
+    while True:
+        with transaction.atomic():
+            keys = get_batch(queryset, after, batch_size)
+            if not keys:
+                break
+            if archive is not None:
+                for table, lookup in task.archive:
+                    for data in table.get_rows(**{lookup: keys}):
+                        archive.write(encode_line(table.name, data))
+            deleted += queryset.filter(pk__in=keys).delete()[1].get(queryset.model._meta.label, 0)
+        after = keys[-1]
+        if len(keys) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
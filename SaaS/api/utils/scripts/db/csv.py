@@ -1,4 +1,5 @@
 import csv
+from itertools import islice
 
 
 def csv_reader(file_obj):
@@ -13,3 +14,22 @@ def csv_entry_list_reader(file_obj) -> list:
     for row in reader:
         entry_list.append(dict(row))
     return entry_list
+
+
+def csv_entry_reader(file_obj):
+    """
+    Lazy version of csv_entry_list_reader, yields entries one by one
+    """
+    for row in csv.DictReader(file_obj, delimiter=','):
+        yield dict(row)
+
+
+def chunked(iterable, size: int):
+    """
+    Splits iterable into lists of at most size items
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
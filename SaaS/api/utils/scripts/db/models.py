@@ -2,12 +2,18 @@
 Util for filling database with test data
 """
 
+import csv
+import io
 import os
+import time
+from collections import defaultdict
 
+from django.db import connections, transaction
+from django.db.models import AutoField
 from django.db.models.manager import Manager
 from django.contrib.auth.models import Group, User
 
-from .csv import csv_entry_list_reader
+from .csv import csv_entry_reader, chunked
 from ....models.curator import Curator
 from ....models.student import Student
 from ....models.student import Group as AcademicGroup
@@ -19,83 +25,193 @@ from ....models.suggestion import SuggestionTheme, SuggestionThemeStatus
 import random
 from datetime import timedelta
 from ...datetime_converter import str2dt
+from ...reference_data import reference_data
+from ...search import rebuild_index
 
 date_field_name = ['date_creation', 'date_acceptance', 'date_start', 'date_finish']
 
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class Progress:
+    """
+    Reports number of loaded entries once per chunk
+    """
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.started = time.monotonic()
+
+    def update(self, count: int):
+        self.count += count
+        elapsed = time.monotonic() - self.started
+        rate = self.count / elapsed if elapsed else 0
+        print("{}: {} entries loaded ({:.0f} entries/s).".format(self.label, self.count, rate))
+
+
+def parse_dates(entries: list):
+    """
+    Parses date fields of chunk of entries column by column, empty dates are dropped
+    """
+    for date_field in date_field_name:
+        parsed = {}     # equal dates are parsed once
+        for entry in entries:
+            value = entry.pop(date_field, None)
+            if value:
+                if value not in parsed:
+                    parsed[value] = str2dt(value)
+                entry[date_field] = parsed[value]
+
+
+def is_copy_available(using: str = 'default') -> bool:
+    return connections[using].vendor == 'postgresql'
+
+
+def copy_to_db(model, objects: list, using: str = 'default'):
+    """
+    Inserts objects with PostgreSQL COPY, it is much faster than INSERT for large chunks
+    """
+    if not objects:
+        return
+    connection = connections[using]
+    with_pk = objects[0].pk is not None     # ids from csv are kept, otherwise sequence is used
+    fields = [field for field in model._meta.concrete_fields if with_pk or not isinstance(field, AutoField)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objects:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+            row.append('\\N' if value is None else value)
+        writer.writerow(row)
+    buffer.seek(0)
+
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')".format(
+        connection.ops.quote_name(model._meta.db_table),
+        ", ".join(connection.ops.quote_name(field.column) for field in fields))
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(sql, buffer)
+
+
+def insert_to_db(manager: Manager, objects: list, use_copy: bool):
+    """
+    Mention: Neither save() nor signals are called, test data must be valid.
+    """
+    if use_copy:
+        copy_to_db(manager.model, objects, manager.db)
+    else:
+        manager.bulk_create(objects)
+
 
 def migrate_to_db_user(manager_model: Manager,
                        manager_user: Manager,
                        group: Group,
-                       csv_file_path: str):
-    path = os.path.abspath(csv_file_path)
-    with open(path, encoding='utf8') as file:
-        _list = csv_entry_list_reader(file)
-
+                       csv_file_path: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       hash_passwords: bool = True):
+    """
+    Mention: Password of user is its username. Hashing is the slowest part of loading,
+             large datasets can be loaded with hash_passwords=False (users can not log in).
+    """
     manager_model.all().delete()
     print("All models(Manager: {}) deleted.".format(manager_model))
-    for entry in _list:
-        for date_field in date_field_name:
-            if entry.get(date_field, None):
-                entry[date_field] = str2dt(entry[date_field])
-            else:
-                entry.pop(date_field, None)
-
-        first_name = entry['name']
-        last_name = entry['last_name']
-        patronymic = entry['patronymic']
-        username = "{0}.{1}.{2}".format(first_name, last_name, patronymic)
-        password = username
-        user = manager_user.create_user(username=username, first_name=first_name, last_name=last_name, password=password)
-        user.groups.add(group)
-        user.save()
 
-        model = manager_model.create(credentials=user, **entry)
-        model.credentials = user
-        model.save()
-
-        print("User: {0}. Model: {1}.".format(user, model))
+    user_group_model = manager_user.model.groups.through
+    progress = Progress(manager_model.model.__name__)
+    path = os.path.abspath(csv_file_path)
+    with open(path, encoding='utf8') as file:
+        for entries in chunked(csv_entry_reader(file), chunk_size):
+            parse_dates(entries)
+            users = []
+            for entry in entries:
+                first_name = entry['name']
+                last_name = entry['last_name']
+                patronymic = entry['patronymic']
+                username = "{0}.{1}.{2}".format(first_name, last_name, patronymic)
+                user = manager_user.model(username=username, first_name=first_name, last_name=last_name)
+                if hash_passwords:
+                    user.set_password(username)
+                else:
+                    user.set_unusable_password()
+                users.append(user)
+
+            with transaction.atomic(using=manager_model.db):
+                manager_user.bulk_create(users)
+                user_ids = dict(manager_user.filter(username__in=[user.username for user in users])
+                                .values_list('username', 'id'))
+                user_group_model.objects.bulk_create([
+                    user_group_model(user_id=user_ids[user.username], group_id=group.id) for user in users
+                ])
+                manager_model.bulk_create([
+                    manager_model.model(credentials_id=user_ids[user.username], **entry)
+                    for user, entry in zip(users, entries)
+                ])
+            progress.update(len(entries))
 
 
 def migrate_to_db(manager: Manager, csv_file_path: str, manager_related: Manager = None,
-                  related_field_name: str = None, related_model_field_name: str = None):
-    path = os.path.abspath(csv_file_path)
-    with open(path, encoding='utf8') as file:
-        _list = csv_entry_list_reader(file)
+                  related_field_name: str = None, related_model_field_name: str = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, use_copy: bool = None):
+    """
+    Streams csv file to database in chunks (PostgreSQL COPY is used when it is available)
+    """
+    if use_copy is None:
+        use_copy = is_copy_available(manager.db)
 
     manager.all().delete()
     print("All models(Manager: {}) deleted.".format(manager))
 
     related_list = None
-    if manager_related:
-        related_list = list(manager_related.all())
-
-    for entry in _list:
-        for date_field in date_field_name:
-            if entry.get(date_field, None):
-                entry[date_field] = str2dt(entry[date_field])
-            else:
-                entry.pop(date_field, None)
-
-        if related_list and related_field_name and related_model_field_name:
-            entry[related_field_name] = getattr(random.choice(related_list), related_model_field_name)
-
-        _object = manager.create(**entry)
-        print(_object)
+    if manager_related and related_model_field_name:
+        related_list = list(manager_related.values_list(related_model_field_name, flat=True))
 
-
-def link_related_to_man(men: list, skills: list, groups: list = None):
-    for man in men:
-        count = random.randint(1, 10)
-        for i in range(count):
-            skill = random.choice(skills)
-            man.skills.add(skill)
-            print("{} -> {}".format(str(skill), str(man)))
-
-            if groups:
-                group = random.choice(groups)
-                man.group = group
-                print("{} -> {}".format(str(group), str(man)))
-            man.save()
+    progress = Progress(manager.model.__name__)
+    path = os.path.abspath(csv_file_path)
+    with open(path, encoding='utf8') as file:
+        for entries in chunked(csv_entry_reader(file), chunk_size):
+            parse_dates(entries)
+            if related_list and related_field_name:
+                for entry in entries:
+                    entry[related_field_name] = random.choice(related_list)
+
+            objects = [manager.model(**entry) for entry in entries]
+            with transaction.atomic(using=manager.db):
+                insert_to_db(manager, objects, use_copy)
+            progress.update(len(objects))
+    reference_data.invalidate()     # signals are not sent by bulk insert
+
+
+def link_related_to_man(men: list, skills: list, groups: list = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Links random skills (and random academic group) to men through bulk writes of M2M through-table
+    """
+    if not men or not skills:
+        return
+    model = type(men[0])
+    skills_field = model._meta.get_field('skills')
+    through = skills_field.remote_field.through
+    man_field_name = skills_field.m2m_field_name() + '_id'
+    skill_field_name = skills_field.m2m_reverse_field_name() + '_id'
+
+    progress = Progress("{} skills".format(model.__name__))
+    for men_chunk in chunked(men, chunk_size):
+        links = []
+        for man in men_chunk:
+            count = min(random.randint(1, 10), len(skills))
+            for skill in random.sample(skills, count):
+                links.append(through(**{man_field_name: man.pk, skill_field_name: skill.pk}))
+        with transaction.atomic():
+            through.objects.bulk_create(links)
+        progress.update(len(links))
+
+    if groups:
+        men_by_group = defaultdict(list)
+        for man in men:
+            men_by_group[random.choice(groups).pk].append(man.pk)
+        for group_id, men_id in men_by_group.items():
+            for men_id_chunk in chunked(men_id, chunk_size):
+                model.objects.filter(pk__in=men_id_chunk).update(group_id=group_id)
+        print("{}: academic groups linked.".format(model.__name__))
 
 
 def init_line_theme():
@@ -186,3 +302,4 @@ def do():
     link_related_to_man(list(Student.objects.all()), skills, academic_groups)
     init_line_theme()
     init_line_theme_suggestion()
+    print("Search index: {} entries indexed.".format(rebuild_index()))
@@ -0,0 +1,231 @@
+"""
+Full-text search index of themes and comments
+
+Mention: PostgreSQL uses tsvector (russian + english stemming) with GIN index,
+         SQLite (local runs) uses FTS5 with porter stemming and prefix matching of russian words.
+         Index is updated on save of indexed entries, queryset updates call index_entries,
+         other bulk writes need rebuild_search_index command.
+         Entries of deleted rows are removed by database triggers (migration 0010_search_index_delete),
+         so cascade deletes send no signals.
+         Other databases are not indexed (with a warning), search is not available there.
+"""
+
+import logging
+import re
+from collections import namedtuple
+
+from django.db import connections, router
+from django.db.models.signals import post_save
+
+from ..models.theme import Theme
+from ..models.work import WorkStepComment
+from ..models.suggestion import SuggestionThemeComment
+
+TABLE = "Search_index"
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_STOP = "</b>"
+
+KIND_THEME = 'theme'
+KIND_WORK_STEP_COMMENT = 'work_step_comment'
+KIND_SUGGESTION_THEME_COMMENT = 'suggestion_theme_comment'
+
+# SQLite rowid = object_id * KIND_CODES_SIZE + kind code (FTS5 tables are searched only by rowid)
+KIND_CODES = {KIND_THEME: 1, KIND_WORK_STEP_COMMENT: 2, KIND_SUGGESTION_THEME_COMMENT: 3}
+KIND_CODES_SIZE = 4
+
+logger = logging.getLogger(__name__)
+
+SearchResult = namedtuple('SearchResult', ('kind', 'object_id', 'rank', 'snippet'))
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_PATTERN = re.compile(r'[а-яё]', re.IGNORECASE)
+RUSSIAN_ENDING_PATTERN = re.compile(r'(ами|ями|ого|его|ому|ему|ыми|ими|ах|ях|ов|ев|ей|ой|ий|ый|ая|яя|ое|ее|ую|юю|ам|ям|ом|ем|ы|и|а|я|о|е|у|ю|ь)$')
+
+
+class SearchBackend:
+    """
+    Mention: Documents consist of title (higher weight) and body.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, kind: str, object_id: int, title: str, body: str):
+        raise NotImplementedError
+
+    def index_many(self, kind: str, documents: list):
+        """
+        documents - [(object_id, title, body)]
+        """
+        for document in documents:
+            self.index(kind, *document)
+
+    def remove(self, kind: str, object_id: int):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "{}" WHERE kind = %s AND object_id = %s'.format(TABLE), [kind, object_id])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "{}"'.format(TABLE))
+
+    def search(self, query: str, kinds: tuple, limit: int) -> list:
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    document_sql = "setweight(to_tsvector('russian', %s) || to_tsvector('english', %s), 'A') || " \
+                   "setweight(to_tsvector('russian', %s) || to_tsvector('english', %s), 'B')"
+
+    index_sql = 'INSERT INTO "{0}" (kind, object_id, title, body, document) VALUES (%s, %s, %s, %s, {1}) ' \
+                'ON CONFLICT (kind, object_id) DO UPDATE ' \
+                'SET title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document'.format(TABLE, document_sql)
+
+    def index(self, kind: str, object_id: int, title: str, body: str):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self.index_sql, [kind, object_id, title, body, title, title, body, body])
+
+    def index_many(self, kind: str, documents: list):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(self.index_sql, [[kind, object_id, title, body, title, title, body, body]
+                                                for object_id, title, body in documents])
+
+    def search(self, query: str, kinds: tuple, limit: int) -> list:
+        # headlines are built only for the best rows
+        sql = 'SELECT kind, object_id, rank, ' \
+              "ts_headline('russian', title || ' ' || body, query, %s) " \
+              'FROM (SELECT kind, object_id, title, body, query, ts_rank_cd(document, query) AS rank ' \
+              '      FROM "{}", (SELECT plainto_tsquery(\'russian\', %s) || plainto_tsquery(\'english\', %s) AS query) q ' \
+              '      WHERE kind = ANY(%s) AND document @@ query ' \
+              '      ORDER BY rank DESC, object_id LIMIT %s) best ' \
+              'ORDER BY rank DESC, object_id'.format(TABLE)
+        options = 'StartSel={}, StopSel={}, MaxFragments=2, MaxWords=20, MinWords=5'.format(HIGHLIGHT_START, HIGHLIGHT_STOP)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [options, query, query, list(kinds), limit])
+            return [SearchResult(*row) for row in cursor.fetchall()]
+
+
+class SqliteSearchBackend(SearchBackend):
+    @staticmethod
+    def get_rowid(kind: str, object_id: int) -> int:
+        return object_id * KIND_CODES_SIZE + KIND_CODES[kind]
+
+    def index(self, kind: str, object_id: int, title: str, body: str):
+        self.index_many(kind, [(object_id, title, body)])
+
+    def index_many(self, kind: str, documents: list):
+        if not documents:
+            return
+        rowids = [self.get_rowid(kind, document[0]) for document in documents]
+        with self.connection.cursor() as cursor:
+            # FTS5 tables have no unique constraints
+            cursor.execute('DELETE FROM "{}" WHERE rowid IN ({})'.format(TABLE, ", ".join(["%s"] * len(rowids))), rowids)
+            cursor.executemany('INSERT INTO "{}" (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)'.format(TABLE),
+                               [[rowid, kind, object_id, title, body]
+                                for rowid, (object_id, title, body) in zip(rowids, documents)])
+
+    def remove(self, kind: str, object_id: int):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DELETE FROM "{}" WHERE rowid = %s'.format(TABLE), [self.get_rowid(kind, object_id)])
+
+    @staticmethod
+    def get_match_expression(query: str) -> str:
+        """
+        Words are quoted (no FTS5 syntax from user), russian ones are stemmed crudely and matched by prefix
+        """
+        terms = []
+        for word in WORD_PATTERN.findall(query.lower()):
+            if CYRILLIC_PATTERN.search(word):
+                stem = RUSSIAN_ENDING_PATTERN.sub('', word) if len(word) > 4 else word
+                terms.append('"{}"*'.format(stem))
+            else:
+                terms.append('"{}"'.format(word))
+        return " ".join(terms)
+
+    def search(self, query: str, kinds: tuple, limit: int) -> list:
+        match = self.get_match_expression(query)
+        if not match:
+            return []
+        sql = 'SELECT kind, object_id, -bm25("{0}", 0, 0, 10.0, 1.0) AS rank, ' \
+              'snippet("{0}", -1, %s, %s, \'…\', 16) ' \
+              'FROM "{0}" WHERE "{0}" MATCH %s AND kind IN ({1}) ' \
+              'ORDER BY rank DESC, object_id LIMIT %s'.format(TABLE, ", ".join(["%s"] * len(kinds)))
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_STOP, match] + list(kinds) + [limit])
+            return [SearchResult(*row) for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+_unsupported = set()     # vendors already warned about
+
+
+def get_backend(model=Theme):
+    """
+    Returns SearchBackend of database of model or None if full-text search is not supported there
+    """
+    connection = connections[router.db_for_write(model)]
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        if connection.vendor not in _unsupported:
+            _unsupported.add(connection.vendor)
+            logger.warning('Full-text search is not supported by "%s" database, entries are not indexed.', connection.vendor)
+        return None
+    return backend_class(connection)
+
+
+# model -> (kind, function of entry -> (title, body))
+INDEXED_MODELS = {
+    Theme: (KIND_THEME, lambda theme: (theme.title, theme.description)),
+    WorkStepComment: (KIND_WORK_STEP_COMMENT, lambda comment: ("", comment.content)),
+    SuggestionThemeComment: (KIND_SUGGESTION_THEME_COMMENT, lambda comment: ("", comment.content)),
+}
+
+
+def index_entry(sender, instance, **kwargs):
+    backend = get_backend(sender)
+    if backend is not None:
+        kind, get_document = INDEXED_MODELS[sender]
+        backend.index(kind, instance.pk, *get_document(instance))
+
+
+def index_entries(model, pks):
+    """
+    Indexes entries written by queryset updates (post_save is not sent for them)
+    """
+    backend = get_backend(model)
+    if backend is None:
+        return
+    kind, get_document = INDEXED_MODELS[model]
+    entries = model.objects.filter(pk__in=pks).order_by('pk')
+    backend.index_many(kind, [(entry.pk, ) + tuple(get_document(entry)) for entry in entries])
+
+
+def rebuild_index(chunk_size: int = 1000) -> int:
+    """
+    Indexes all entries from scratch, returns number of indexed entries
+    """
+    backend = get_backend()
+    if backend is None:
+        return 0
+    backend.clear()
+    count = 0
+    for model, (kind, get_document) in INDEXED_MODELS.items():
+        for entry in model.objects.order_by('pk').iterator(chunk_size=chunk_size):
+            backend.index(kind, entry.pk, *get_document(entry))
+            count += 1
+    return count
+
+
+def is_supported() -> bool:
+    return get_backend() is not None
+
+
+def search(query: str, kinds: tuple, limit: int) -> list:
+    return get_backend().search(query, kinds, limit)
+
+
+for indexed_model in INDEXED_MODELS:
+    post_save.connect(index_entry, sender=indexed_model, weak=False)
@@ -0,0 +1,190 @@
+"""
+Cached curator dashboard summary (counters of themes, works, suggestions, steps)
+
+Mention: Summaries of curators affected by a change of counted rows are dropped in this process
+         (or after ttl expiration, that bounds staleness between workers and of overdue steps).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.signals import post_init, post_save, post_delete
+from django.utils.timezone import localtime
+
+from ..models.base import bulk_changed
+from ..models.curator import Curator
+from ..models.theme import Theme
+from ..models.work import Work, WorkStep
+from ..models.suggestion import SuggestionTheme, SuggestionThemeStatus
+from .reference_data import reference_data
+
+SUMMARY_CACHE_TTL = getattr(settings, 'API_SUMMARY_CACHE_TTL', 60)     # seconds
+
+WORK_STEP_STATUS_DONE = "Выполнен"
+
+# fields summaries depend on, queryset updates of other fields keep summaries
+COUNTED_FIELDS = {
+    Curator: set(),
+    Theme: {'curator', 'student'},
+    Work: {'theme', 'date_finish'},
+    WorkStep: {'work', 'date_finish', 'status'},
+    SuggestionTheme: {'curator', 'status'},
+}
+# column that leads from row to its curator, its loaded value is kept to find the previous curator of moved row
+OWNER_COLUMNS = {
+    Theme: 'curator_id',
+    Work: 'theme_id',
+    WorkStep: 'work_id',
+    SuggestionTheme: 'curator_id',
+}
+# relations that lead from work or step to its theme
+OWNER_PATHS = {
+    Work: ('theme', ),
+    WorkStep: ('work', 'theme'),
+}
+
+
+class SummaryCache:
+    """
+    curator_id -> (summary, expiration time)
+    """
+    def __init__(self, ttl: float = SUMMARY_CACHE_TTL):
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, curator_id: int):
+        entry = self._entries.get(curator_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, curator_id: int, summary: dict, generation: int):
+        with self._lock:
+            if generation == self.generation:   # counted rows were not changed while computing
+                self._entries[curator_id] = (summary, time.monotonic() + self.ttl)
+
+    def invalidate(self, curator_ids):
+        with self._lock:
+            self.generation += 1
+            for curator_id in curator_ids:
+                self._entries.pop(curator_id, None)
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+summary_cache = SummaryCache()
+
+
+def compute_curator_summary(curator_id: int) -> dict:
+    """
+    Counts everything by 4 aggregate queries regardless of number of related rows (statuses are reference data)
+    """
+    now = localtime()
+    themes = Theme.objects.filter(curator_id=curator_id).aggregate(
+        free=Count('id', filter=Q(student__isnull=True)),
+        taken=Count('id', filter=Q(student__isnull=False)),
+    )
+    works = Work.objects.filter(theme__curator_id=curator_id).aggregate(
+        active=Count('id', filter=Q(date_finish__isnull=True) | Q(date_finish__gt=now)),
+        finished=Count('id', filter=Q(date_finish__lte=now)),
+    )
+    suggestions = {status.name: 0 for status in reference_data.table(SuggestionThemeStatus).rows}
+    suggestions.update(SuggestionTheme.objects.filter(curator_id=curator_id).order_by()
+                       .values_list('status__name').annotate(count=Count('id')))
+    overdue_steps = WorkStep.objects \
+        .filter(work__theme__curator_id=curator_id, date_finish__lt=now) \
+        .exclude(status__name=WORK_STEP_STATUS_DONE) \
+        .count()
+    return {
+        'themes': themes,
+        'works': works,
+        'suggestions': suggestions,
+        'steps': {'overdue': overdue_steps},
+    }
+
+
+def get_curator_summary(curator_id: int) -> dict:
+    summary = summary_cache.get(curator_id)
+    if summary is None:
+        generation = summary_cache.generation
+        summary = compute_curator_summary(curator_id)
+        summary_cache.set(curator_id, summary, generation)
+    return summary
+
+
+def get_cached_theme(model, instance):
+    """
+    Theme of work or step, if it is cached on the row (and its work)
+    """
+    for name in OWNER_PATHS[model]:
+        field = instance._meta.get_field(name)
+        if not field.is_cached(instance):
+            return None
+        instance = field.get_cached_value(instance)
+    return instance
+
+
+def get_curators(model, instances) -> set:
+    """
+    Curators whose summaries count the rows (also previous curators of moved rows)
+
+    Mention: Works and steps are resolved to curators of their cached themes,
+             the rest of them (and moved ones) by one lookup of themes.
+    """
+    if model is Curator:
+        return {instance.pk for instance in instances}
+    column = OWNER_COLUMNS[model]
+    curator_ids, owner_ids = set(), set()
+    for instance in instances:
+        owner_id = getattr(instance, column)
+        previous_id = getattr(instance, '_summary_owner_id', owner_id)
+        if model not in OWNER_PATHS:
+            curator_ids.update((owner_id, previous_id))
+            continue
+        theme = get_cached_theme(model, instance)
+        if theme is not None and theme.pk is not None:
+            curator_ids.add(theme.curator_id)
+        else:
+            owner_ids.add(owner_id)
+        if previous_id != owner_id:
+            owner_ids.add(previous_id)
+    owner_ids.discard(None)
+    if owner_ids:
+        themes = Theme.objects.filter(pk__in=owner_ids) if model is Work else Theme.objects.filter(work__in=owner_ids)
+        curator_ids.update(themes.values_list('curator_id', flat=True))
+    curator_ids.discard(None)
+    return curator_ids
+
+
+def remember_owner(sender, instance, **kwargs):
+    column = OWNER_COLUMNS[sender]
+    if instance.pk is not None and column in instance.__dict__:     # deferred column is not loaded for it
+        instance._summary_owner_id = instance.__dict__[column]
+
+
+def invalidate_entry(sender, instance, **kwargs):
+    summary_cache.invalidate(get_curators(sender, [instance]))
+    if sender in OWNER_COLUMNS:
+        remember_owner(sender, instance)
+
+
+def invalidate_bulk(sender, fields=None, objs=None, **kwargs):
+    if objs is not None:
+        summary_cache.invalidate(get_curators(sender, objs))
+    elif fields is None or {field[:-3] if field.endswith('_id') else field for field in fields} & COUNTED_FIELDS[sender]:
+        summary_cache.clear()
+
+
+for model in COUNTED_FIELDS:
+    post_save.connect(invalidate_entry, sender=model, weak=False)
+    post_delete.connect(invalidate_entry, sender=model, weak=False)
+    bulk_changed.connect(invalidate_bulk, sender=model, weak=False)
+for model in OWNER_COLUMNS:
+    post_init.connect(remember_owner, sender=model, weak=False)
@@ -0,0 +1,72 @@
+"""
+Delta sync of curator/student related entries for offline clients
+
+Mention: Token is the last change sequence number seen by client, entries with greater sequence number
+         (of their own row or of nested rows, serializer 'sequence_fields') are changed,
+         tombstones with greater sequence number are deleted entries (client applies deletes first).
+         Token is below numbers of transactions still in flight (models.sync.get_sequence),
+         so changes committed after sync are returned next time.
+"""
+
+from collections import OrderedDict, namedtuple
+
+from ..models.theme import Theme
+from ..models.work import Work, WorkStep, WorkStepMaterial, WorkStepComment
+from ..models.suggestion import SuggestionTheme, SuggestionThemeComment
+from ..models.sync import Tombstone, get_sequence
+from ..serializers.theme import ThemeSerializerRelatedIntermediate
+from ..serializers.work import WorkSerializerRelatedIntermediate, WorkStepSerializerWorkID, \
+    WorkStepMaterialSerializer, WorkStepCommentSerializer
+from ..serializers.suggestion import SuggestionThemeSerializerRelatedIntermediate, SuggestionThemeCommentSerializer
+
+# kind - key of response and kind of tombstone, owner - lookup prefix of theme/suggestion with curator_id, student_id
+SyncKind = namedtuple('SyncKind', ('kind', 'model', 'serializer_class', 'owner'))
+
+SYNC_KINDS = (
+    SyncKind('themes', Theme, ThemeSerializerRelatedIntermediate, ''),
+    SyncKind('works', Work, WorkSerializerRelatedIntermediate, 'theme__'),
+    SyncKind('steps', WorkStep, WorkStepSerializerWorkID, 'work__theme__'),
+    SyncKind('materials', WorkStepMaterial, WorkStepMaterialSerializer, 'step__work__theme__'),
+    SyncKind('comments', WorkStepComment, WorkStepCommentSerializer, 'step__work__theme__'),
+    SyncKind('suggestions', SuggestionTheme, SuggestionThemeSerializerRelatedIntermediate, ''),
+    SyncKind('suggestion_comments', SuggestionThemeComment, SuggestionThemeCommentSerializer, 'suggestion__'),
+)
+
+
+def parse_token(value: str) -> int:
+    """
+    Raises ValueError if token is not a sequence number
+    """
+    token = int(value)
+    if token < 0:
+        raise ValueError("Token must not be negative.")
+    return token
+
+
+def get_token() -> int:
+    return get_sequence()
+
+
+def get_changed(sync_kind: SyncKind, owner: str, owner_id: int, since: int = None):
+    """
+    Queryset of owned entries changed after since (all entries if it is None), one range scan per sequence field
+    """
+    queryset = sync_kind.model.objects.filter(**{sync_kind.owner + owner + '_id': owner_id})
+    if since is None:
+        return queryset.order_by('id')
+    changed = set()
+    for field in getattr(sync_kind.serializer_class, 'sequence_fields', ('sequence', )):
+        changed.update(queryset.filter(**{field + '__gt': since}).values_list('id', flat=True))
+    return sync_kind.model.objects.filter(pk__in=changed).order_by('id')
+
+
+def get_deleted(owner: str, owner_id: int, since: int) -> dict:
+    """
+    {kind: [id]} of entries deleted (or moved to other owner) after since
+    """
+    deleted = OrderedDict((sync_kind.kind, []) for sync_kind in SYNC_KINDS)
+    tombstones = Tombstone.objects.filter(**{owner + '_id': owner_id, 'sequence__gt': since}).order_by('sequence')
+    for kind, object_id in tombstones.values_list('kind', 'object_id'):
+        if kind in deleted:
+            deleted[kind].append(object_id)
+    return deleted
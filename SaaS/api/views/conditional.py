@@ -0,0 +1,125 @@
+import hashlib
+
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.utils.http import parse_etags, http_date, parse_http_date_safe
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..utils.reference_data import reference_data
+
+from .selection import FieldSelectionMixin
+
+
+def is_etag_matched(request, etag: str) -> bool:
+    if not etag:
+        return False
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag in etags
+
+
+def is_not_modified(request, etag: str, last_modified=None) -> bool:
+    if 'HTTP_IF_NONE_MATCH' in request.META:   # has precedence over If-Modified-Since
+        return is_etag_matched(request, etag)
+    if last_modified is None:
+        return False
+    modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return modified_since is not None and int(last_modified.timestamp()) <= modified_since
+
+
+def not_modified_response(etag: str, last_modified=None) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def get_joined_date(model, field: str):
+    """
+    Max of date field of (nested) joined rows, rows joined by many-to-many relation
+    are aggregated by correlated subquery, so that they do not multiply aggregated entries
+    """
+    path = field.split('__')
+    for i, name in enumerate(path[:-1]):
+        relation = model._meta.get_field(name)
+        if relation.many_to_many or relation.one_to_many:
+            prefix, rest = '__'.join(path[:i]), '__'.join(path[i + 1:])
+            lookup = relation.related_query_name() if relation.concrete else relation.field.name
+            dates = relation.related_model.objects.order_by() \
+                .filter(**{lookup: OuterRef(prefix or 'pk')}).values(lookup).annotate(date=Max(rest)).values('date')
+            return Max(Subquery(dates, output_field=relation.related_model._meta.get_field(path[-1])))
+        model = relation.related_model
+    return Max(field)
+
+
+class VersionedState:
+    """
+    Fingerprint of versioned entries of queryset, computed by one aggregate query
+
+    Mention: Serializer class declares 'version_fields', 'date_fields', 'sequence_fields'
+             of entries it represents (including nested ones).
+             Unversioned nested rows (curators, students, lookup tables) are covered by their dates in 'date_fields',
+             rows that lost a deleted nested row (SET_NULL, removed skills) are renumbered, so sequences cover them.
+             Variant distinguishes representations of the same entries (sparse fieldsets).
+    """
+    def __init__(self, queryset, serializer_class, variant: str = ''):
+        aggregates = {'count': Count('id'), 'max_id': Max('id')}
+        for i, field in enumerate(serializer_class.version_fields):
+            aggregates['version_{}'.format(i)] = Sum(field)
+        for i, field in enumerate(serializer_class.date_fields):
+            aggregates['date_{}'.format(i)] = get_joined_date(queryset.model, field)
+        for i, field in enumerate(serializer_class.sequence_fields):
+            aggregates['sequence_{}'.format(i)] = Sum(field)
+        state = queryset.order_by().aggregate(**aggregates)
+
+        self.count = state['count']
+        content = (repr(sorted(state.items())) + variant).encode('utf8')
+        self.etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+        dates = [state['date_{}'.format(i)] for i in range(len(serializer_class.date_fields))]
+        dates = [date for date in dates if date is not None]
+        self.last_modified = max(dates) if dates else None
+
+
+class ConditionalGetMixin(FieldSelectionMixin):
+    """
+    ETag/Last-Modified handling of GET requests, nested serializers are not run for 304 response
+
+    Mention: Lists are served with ETag only, Last-Modified can not reflect deleted entries.
+    """
+    def get_versioned_state(self, queryset, serializer_class) -> VersionedState:
+        selection = self.get_field_selection()
+        return VersionedState(queryset, serializer_class, selection.key if selection is not None else '')
+
+    def get_conditional_response(self, request, state: VersionedState, get_response, last_modified: bool = True) -> Response:
+        if not state.count:     # nothing to compare with, response is 404 or empty list
+            return get_response()
+        last_modified = state.last_modified if last_modified else None
+        if is_not_modified(request, state.etag, last_modified):
+            return not_modified_response(state.etag, last_modified)
+        response = get_response()
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = state.etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class ReferenceDataListMixin:
+    """
+    List of lookup table served from reference data registry with strong ETag
+
+    Mention: Paginated requests and sparse fieldsets fall back to regular list view.
+    """
+    reference_model = None
+
+    def get(self, request, *args, **kwargs):
+        if self.paginator is not None and self.paginator.get_page_size(request) or \
+                self.get_field_selection() is not None:
+            return super().get(request, *args, **kwargs)
+        data, etag = reference_data.table(self.reference_model).serialized()
+        if is_etag_matched(request, etag):
+            return not_modified_response(etag)
+        response = Response(data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        return response
@@ -3,7 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView
-from rest_framework.authentication import TokenAuthentication
+
+from django.db import transaction
+from django.db.models import QuerySet
 
 from ..models.theme import Theme
 from ..models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
@@ -13,38 +15,64 @@ from ..models.work import Work, WorkStep
 from ..serializers.curator import CuratorSerializerSkillsIntermediate, CuratorSerializerNoSkills, CuratorSerializerSkillsID
 from ..serializers.skill import SkillSerializer
 from ..serializers.work import WorkSerializerRelatedID, WorkSerializerRelatedIntermediate, \
-    WorkStepSerializer, WorkStepSerializerRelatedID, WorkStepSerializerRelatedIDNoStatus, \
+    WorkStepSerializer, WorkStepSerializerRelatedID, WorkStepSerializerRelatedIDNoStatus, WorkStepSerializerBulk, \
     WorkStepMaterialSerializer, WorkStepMaterialSerializerNoRelated, \
     WorkStepCommentSerializer, WorkStepCommentSerializerNoRelated
 from ..serializers.theme import ThemeSerializerRelatedID, ThemeSerializerRelatedIntermediate
 from ..serializers.suggestion import \
     SuggestionThemeSerializerRelatedID, SuggestionThemeSerializerRelatedChangeable, SuggestionThemeSerializerRelatedIntermediate, \
-    SuggestionThemeSerializerRelatedIDNoProgress, \
+    SuggestionThemeSerializerRelatedIDNoProgress, SuggestionThemeSerializerBulkStatus, \
     SuggestionThemeProgressSerializer, \
     SuggestionThemeCommentSerializer, SuggestionThemeCommentSerializerNoRelated
 
+from ..authentication.token import CachedTokenAuthentication
 from ..permissions.group_curators import IsMemberOfCuratorsGroup
 
+from ..pagination.cursor import IdCursorPagination, DateCreationCursorPagination, ThreadCursorPagination, \
+    CursorPaginatedListMixin
+
+from ..utils.reference_data import reference_data
+from ..utils.summary import get_curator_summary
+
+from .conditional import ConditionalGetMixin
+from .selection import FieldSelectionMixin
+from .events import EventStreamMixin
+from .sync import SyncMixin
 
-class CuratorBaseViewAbstract:
+
+class CuratorBaseViewAbstract(FieldSelectionMixin):
     """
     Curator base view
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
 
     def get_curator(self, curator_id: int) -> Curator:
         return get_object_or_404(Curator, pk=curator_id)
 
     def get_related_work(self, curator_id: int, work_id: int) -> Work:
-        return get_object_or_404(Work, theme__curator__id=curator_id, pk=work_id)
+        return get_object_or_404(Work.objects.select_related('theme'), theme__curator__id=curator_id, pk=work_id)
+
+    def get_related_works(self, curator_id: int) -> QuerySet:
+        works = Work.objects.filter(theme__curator_id=curator_id).order_by('theme_id', 'id')
+        return WorkSerializerRelatedIntermediate.setup_eager_loading(works)
+
+    def get_related_steps(self, curator_id: int, work_id: int) -> QuerySet:
+        steps = WorkStep.objects.filter(work__theme__curator_id=curator_id, work_id=work_id).order_by('id')
+        return WorkStepSerializer.setup_eager_loading(steps)
 
     def get_related_step(self, curator_id: int, work_id: int, step_id: int) -> WorkStep:
         return get_object_or_404(WorkStep, work__theme__curator__id=curator_id, work_id=work_id, pk=step_id)
 
+    def get_related_themes(self, curator_id: int) -> QuerySet:
+        return Theme.objects.filter(curator_id=curator_id)
+
     def get_related_theme(self, curator_id: int, theme_id: int) -> Theme:
         return get_object_or_404(Theme, curator__id=curator_id, pk=theme_id)
 
+    def get_related_suggestions(self, curator_id: int) -> QuerySet:
+        return SuggestionTheme.objects.filter(curator_id=curator_id)
+
     def get_related_suggestion(self, curator_id: int, suggestion_id: int) -> SuggestionTheme:
         return get_object_or_404(SuggestionTheme, curator__id=curator_id, pk=suggestion_id)
 
@@ -53,7 +81,7 @@ class CuratorBaseViewAbstract:
         return get_object_or_404(SuggestionThemeProgress, suggestion=suggestion)
 
 
-class CuratorBaseView(CuratorBaseViewAbstract, GenericAPIView):
+class CuratorBaseView(ConditionalGetMixin, CuratorBaseViewAbstract, GenericAPIView):
     pass
 
 
@@ -64,6 +92,7 @@ class CuratorList(CuratorBaseViewAbstract, ListAPIView):
     """
     queryset = Curator.objects.all()
     serializer_class = CuratorSerializerNoSkills
+    pagination_class = IdCursorPagination
 
 
 class CuratorDetail(CuratorBaseView):
@@ -78,7 +107,7 @@ class CuratorDetail(CuratorBaseView):
 
     def get(self, request, curator_id):
         curator = self.get_curator(curator_id)
-        serializer = CuratorSerializerSkillsIntermediate(curator)
+        serializer = self.get_read_serializer(CuratorSerializerSkillsIntermediate, curator)
         return Response(serializer.data)
 
     def put(self, request, curator_id):
@@ -92,6 +121,16 @@ class CuratorDetail(CuratorBaseView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CuratorSummary(CuratorBaseView):
+    """
+    get:
+    READ - Curator instance dashboard summary (counters of themes, works, suggestions, overdue steps).
+    """
+    def get(self, request, curator_id):
+        self.get_curator(curator_id)
+        return Response(get_curator_summary(curator_id), status=status.HTTP_200_OK)
+
+
 # related skills
 class CuratorSkillList(CuratorBaseView):
     """
@@ -100,12 +139,11 @@ class CuratorSkillList(CuratorBaseView):
     """
     def get(self, request, curator_id):
         curator = self.get_curator(curator_id)
-        serializer = SkillSerializer(curator.skills, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(self.get_list_data(curator.skills, SkillSerializer), status=status.HTTP_200_OK)
 
 
 # related works
-class CuratorWorkList(CuratorBaseView):
+class CuratorWorkList(CursorPaginatedListMixin, CuratorBaseView):
     """
     get:
     READ - List of curator instance related works.
@@ -116,13 +154,14 @@ class CuratorWorkList(CuratorBaseView):
     serializer_class = WorkSerializerRelatedID
 
     def get(self, request, curator_id):
-        curator = self.get_curator(curator_id)
-        related_works = []
-        for theme in curator.theme_set.all():
-            for work in theme.work_set.all():
-                related_works.append(work)
-        serializer = WorkSerializerRelatedIntermediate(related_works, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        works = self.get_related_works(curator_id)
+        state = self.get_versioned_state(works, WorkSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_curator(curator_id)
+            return self.get_list_response(works, WorkSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
 
 class CuratorWorkDetail(CuratorBaseView):
@@ -139,9 +178,14 @@ class CuratorWorkDetail(CuratorBaseView):
     serializer_class = WorkSerializerRelatedID
 
     def get(self, request, curator_id, work_id):
-        work = self.get_related_work(curator_id, work_id)
-        serializer = WorkSerializerRelatedIntermediate(work)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        works = self.get_related_works(curator_id).filter(pk=work_id)
+        state = self.get_versioned_state(works, WorkSerializerRelatedIntermediate)
+
+        def get_response():
+            work = get_object_or_404(self.get_read_queryset(works, WorkSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(WorkSerializerRelatedIntermediate, work)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, curator_id, work_id):
         work = self.get_related_work(curator_id, work_id)
@@ -174,12 +218,14 @@ class CuratorWorkStepList(CuratorBaseView):
     serializer_class = WorkStepSerializerRelatedIDNoStatus
 
     def get(self, request, curator_id, work_id):
-        work = self.get_related_work(curator_id, work_id)
-        related_steps = []
-        for step in work.step_set.all():
-            related_steps.append(step)
-        serializer = WorkStepSerializer(related_steps, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        steps = self.get_related_steps(curator_id, work_id)
+        state = self.get_versioned_state(steps, WorkStepSerializer)
+
+        def get_response():
+            if not state.count:
+                self.get_related_work(curator_id, work_id)
+            return Response(self.get_list_data(steps, WorkStepSerializer), status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, curator_id, work_id):
         work = self.get_related_work(curator_id, work_id)
@@ -194,6 +240,26 @@ class CuratorWorkStepList(CuratorBaseView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CuratorWorkStepBulk(CuratorBaseView):
+    """
+    post:
+    CREATE, UPDATE, DELETE - Curator instance related work steps at once (in one transaction).
+    """
+    serializer_class = WorkStepSerializerBulk
+
+    def post(self, request, curator_id, work_id):
+        work = self.get_related_work(curator_id, work_id)
+        with transaction.atomic():
+            steps = {step.id: step for step in work.step_set.select_for_update()}
+            serializer = WorkStepSerializerBulk(data=request.data, context={'work': work, 'steps': steps})
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer.create(validated_data=serializer.validated_data)
+        # serializing response
+        serializer_resp = WorkStepSerializer(self.get_related_steps(curator_id, work_id), many=True)
+        return Response(serializer_resp.data, status=status.HTTP_200_OK)
+
+
 class CuratorWorkStepDetail(CuratorBaseView):
     """
     get:
@@ -208,9 +274,14 @@ class CuratorWorkStepDetail(CuratorBaseView):
     serializer_class = WorkStepSerializerRelatedID
 
     def get(self, request, curator_id, work_id, step_id):
-        step = self.get_related_step(curator_id, work_id, step_id)
-        serializer = WorkStepSerializer(step)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        steps = self.get_related_steps(curator_id, work_id).filter(pk=step_id)
+        state = self.get_versioned_state(steps, WorkStepSerializer)
+
+        def get_response():
+            step = get_object_or_404(self.get_read_queryset(steps, WorkStepSerializer))
+            serializer = self.get_read_serializer(WorkStepSerializer, step)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, curator_id, work_id, step_id):
         step = self.get_related_step(curator_id, work_id, step_id)
@@ -243,11 +314,8 @@ class CuratorWorkStepMaterialList(CuratorBaseView):
 
     def get(self, request, curator_id, work_id, step_id):
         step = self.get_related_step(curator_id, work_id, step_id)
-        related_materials = []
-        for material in step.material_set.all():
-            related_materials.append(material)
-        serializer = WorkStepMaterialSerializer(related_materials, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        related_materials = step.material_set.order_by('id')
+        return Response(self.get_list_data(related_materials, WorkStepMaterialSerializer), status=status.HTTP_200_OK)
 
     def post(self, request, curator_id, work_id, step_id):
         step = self.get_related_step(curator_id, work_id, step_id)
@@ -263,7 +331,7 @@ class CuratorWorkStepMaterialList(CuratorBaseView):
 
 
 # related work-step-comments
-class CuratorWorkStepCommentList(CuratorBaseView):
+class CuratorWorkStepCommentList(CursorPaginatedListMixin, CuratorBaseView):
     """
     get:
     READ - Curator instance related work step comments.
@@ -272,14 +340,12 @@ class CuratorWorkStepCommentList(CuratorBaseView):
     CREATE - Curator instance related work step comment.
     """
     serializer_class = WorkStepCommentSerializerNoRelated
+    pagination_class = ThreadCursorPagination
 
     def get(self, request, curator_id, work_id, step_id):
         step = self.get_related_step(curator_id, work_id, step_id)
-        related_comments = []
-        for comment in step.comment_set.all():
-            related_comments.append(comment)
-        serializer = WorkStepCommentSerializer(related_comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        related_comments = step.comment_set.order_by('id')
+        return self.get_list_response(related_comments, WorkStepCommentSerializer)
 
     def post(self, request, curator_id, work_id, step_id):
         step = self.get_related_step(curator_id, work_id, step_id)
@@ -295,7 +361,7 @@ class CuratorWorkStepCommentList(CuratorBaseView):
 
 
 # related themes
-class CuratorThemeList(CuratorBaseView):
+class CuratorThemeList(CursorPaginatedListMixin, CuratorBaseView):
     """
     get:
     READ - Curator instance related themes.
@@ -304,11 +370,17 @@ class CuratorThemeList(CuratorBaseView):
     CREATE - Curator instance related theme.
     """
     serializer_class = ThemeSerializerRelatedID
+    pagination_class = DateCreationCursorPagination
 
     def get(self, request, curator_id):
-        curator = self.get_curator(curator_id)
-        serializer = ThemeSerializerRelatedIntermediate(curator.theme_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        themes = self.get_related_themes(curator_id)
+        state = self.get_versioned_state(themes, ThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_curator(curator_id)
+            return self.get_list_response(themes, ThemeSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, curator_id):
         curator = self.get_curator(curator_id)
@@ -338,9 +410,14 @@ class CuratorThemeDetail(CuratorBaseView):
     serializer_class = ThemeSerializerRelatedID
 
     def get(self, request, curator_id, theme_id):
-        theme = self.get_related_theme(curator_id, theme_id)
-        serializer = ThemeSerializerRelatedIntermediate(theme)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        themes = self.get_related_themes(curator_id).filter(pk=theme_id)
+        state = self.get_versioned_state(themes, ThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            theme = get_object_or_404(self.get_read_queryset(themes, ThemeSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(ThemeSerializerRelatedIntermediate, theme)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, curator_id, theme_id):
         theme = self.get_related_theme(curator_id, theme_id)
@@ -361,7 +438,7 @@ class CuratorThemeDetail(CuratorBaseView):
 
 
 # related suggestions
-class CuratorSuggestionList(CuratorBaseView):
+class CuratorSuggestionList(CursorPaginatedListMixin, CuratorBaseView):
     """
     get:
     READ - Curator instance related suggestions.
@@ -370,17 +447,23 @@ class CuratorSuggestionList(CuratorBaseView):
     CREATE - Curator instance related suggestion.
     """
     serializer_class = SuggestionThemeSerializerRelatedIDNoProgress
+    pagination_class = DateCreationCursorPagination
 
     def get(self, request, curator_id):
-        curator = self.get_curator(curator_id)
-        serializer = SuggestionThemeSerializerRelatedIntermediate(curator.suggestiontheme_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        suggestions = self.get_related_suggestions(curator_id)
+        state = self.get_versioned_state(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_curator(curator_id)
+            return self.get_list_response(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, curator_id):
         curator = self.get_curator(curator_id)
         serializer = SuggestionThemeSerializerRelatedIDNoProgress(data=request.data)
         if serializer.is_valid():
-            serializer.validated_data["status_id"] = SuggestionThemeStatus.objects.get(name__exact="WAITING_STUDENT").id
+            serializer.validated_data["status_id"] = reference_data.get_id(SuggestionThemeStatus, "WAITING_STUDENT")
             suggestion = serializer.create(validated_data=serializer.validated_data)
             curator.suggestiontheme_set.add(suggestion)
             # serializing response
@@ -389,6 +472,24 @@ class CuratorSuggestionList(CuratorBaseView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CuratorSuggestionBulk(CuratorBaseView):
+    """
+    post:
+    UPDATE - Statuses of curator instance related suggestions at once (in one transaction).
+    """
+    serializer_class = SuggestionThemeSerializerBulkStatus
+
+    def post(self, request, curator_id):
+        self.get_curator(curator_id)
+        with transaction.atomic():
+            serializer = SuggestionThemeSerializerBulkStatus(
+                data=request.data, context={'suggestions': self.get_related_suggestions(curator_id)})
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            results = serializer.create(validated_data=serializer.validated_data)
+        return Response(results, status=status.HTTP_200_OK)
+
+
 class CuratorSuggestionDetail(CuratorBaseView):
     """
     get:
@@ -403,9 +504,14 @@ class CuratorSuggestionDetail(CuratorBaseView):
     serializer_class = SuggestionThemeSerializerRelatedChangeable
 
     def get(self, request, curator_id, suggestion_id):
-        suggestion = self.get_related_suggestion(curator_id, suggestion_id)
-        serializer = SuggestionThemeSerializerRelatedIntermediate(suggestion)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        suggestions = self.get_related_suggestions(curator_id).filter(pk=suggestion_id)
+        state = self.get_versioned_state(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            suggestion = get_object_or_404(self.get_read_queryset(suggestions, SuggestionThemeSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(SuggestionThemeSerializerRelatedIntermediate, suggestion)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, curator_id, suggestion_id):
         suggestion = self.get_related_suggestion(curator_id, suggestion_id)
@@ -437,7 +543,7 @@ class CuratorSuggestionProgressDetail(CuratorBaseView):
 
     def get(self, request, curator_id, suggestion_id):
         progress = self.get_related_suggestion_progress(curator_id, suggestion_id)
-        serializer = SuggestionThemeProgressSerializer(progress)
+        serializer = self.get_read_serializer(SuggestionThemeProgressSerializer, progress)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request, curator_id, suggestion_id):
@@ -452,7 +558,7 @@ class CuratorSuggestionProgressDetail(CuratorBaseView):
 
 
 # related suggestion-comments
-class CuratorSuggestionCommentList(CuratorBaseView):
+class CuratorSuggestionCommentList(CursorPaginatedListMixin, CuratorBaseView):
     """
     get:
     READ - Curator instance related suggestion comments.
@@ -461,11 +567,11 @@ class CuratorSuggestionCommentList(CuratorBaseView):
     CREATE - Curator instance related suggestion comment.
     """
     serializer_class = SuggestionThemeCommentSerializerNoRelated
+    pagination_class = ThreadCursorPagination
 
     def get(self, request, curator_id, suggestion_id):
         suggestion = self.get_related_suggestion(curator_id, suggestion_id)
-        serializer = SuggestionThemeCommentSerializer(suggestion.comment_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_list_response(suggestion.comment_set.order_by('id'), SuggestionThemeCommentSerializer)
 
     def post(self, request, curator_id, suggestion_id):
         suggestion = self.get_related_suggestion(curator_id, suggestion_id)
@@ -478,3 +584,23 @@ class CuratorSuggestionCommentList(CuratorBaseView):
             serializer_resp = SuggestionThemeCommentSerializer(comment)
             return Response(serializer_resp.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CuratorEventStream(EventStreamMixin, CuratorBaseView):
+    """
+    get:
+    READ - Server-sent events of curator instance related suggestions (status changes, progress updates) and comments.
+    """
+    def get(self, request, curator_id):
+        self.get_curator(curator_id)
+        return self.get_event_stream_response(request, curator_id=curator_id)
+
+
+class CuratorSync(SyncMixin, CuratorBaseView):
+    """
+    get:
+    READ - Curator instance related themes, works, steps, materials, comments and suggestions changed since sync token.
+    """
+    def get(self, request, curator_id):
+        self.get_curator(curator_id)
+        return self.get_sync_response(request, 'curator', curator_id)
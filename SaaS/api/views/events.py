@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from ..utils.events import event_bus
+
+EVENTS_RETRY = getattr(settings, 'API_EVENTS_RETRY', 3000)                 # milliseconds before client reconnects
+EVENTS_KEEPALIVE = getattr(settings, 'API_EVENTS_KEEPALIVE', 15)           # seconds between keepalive comments
+EVENTS_STREAM_DURATION = getattr(settings, 'API_EVENTS_STREAM_DURATION', 25)   # seconds, stream is resumed by client
+EVENTS_MAX_STREAMS = getattr(settings, 'API_EVENTS_MAX_STREAMS', 8)        # per process, below its threads (Procfile)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Makes text/event-stream acceptable, errors are rendered as 'error' events
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return "event: error\ndata: {}\n\n".format(json.dumps(data, cls=JSONEncoder)).encode(self.charset)
+
+
+class StreamSlots:
+    """
+    Number of streams served by this process, each of them holds a worker thread while it lasts
+    """
+    def __init__(self, limit: int = EVENTS_MAX_STREAMS):
+        self.limit = limit
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.count >= self.limit:
+                return False
+            self.count += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.count -= 1
+
+
+stream_slots = StreamSlots()
+
+
+class EventStream:
+    """
+    Streaming content that frees its slot when response is closed (also if it was never iterated)
+    """
+    def __init__(self, events):
+        self._events = events
+        self._closed = False
+
+    def __iter__(self):
+        return self._events
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._events.close()
+            stream_slots.release()
+
+
+class EventStreamMixin:
+    """
+    Server-sent events of suggestion changes, progress updates and new comments
+
+    Mention: Last-Event-ID header (or 'last_event_id' param) resumes stream, 'reset' event is sent when
+             it can not be resumed (events expired or were published by other process), lists must be reloaded then.
+             Stream ends after API_EVENTS_STREAM_DURATION, EventSource reconnects with Last-Event-ID.
+             Stream holds a thread of gthread worker (Procfile) while it lasts, the duration is kept
+             below worker timeout (30 seconds), so sync workers must not serve streams.
+             At most API_EVENTS_MAX_STREAMS streams are served by a process, so that they leave threads
+             to other requests, further ones get 503 with Retry-After.
+             Event bus is per process, so Procfile runs one worker process (see utils/events).
+             Without Last-Event-ID stream starts with new events.
+    """
+    renderer_classes = (JSONRenderer, EventStreamRenderer)
+    stream_duration = EVENTS_STREAM_DURATION
+    keepalive = EVENTS_KEEPALIVE
+
+    def get_event_stream(self, after, curator_id: int = None, student_id: int = None):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        yield "retry: {}\n\n".format(EVENTS_RETRY)
+        if after is None:
+            yield "event: reset\ndata: {}\n\n"
+            after = event_bus.sequence
+        deadline = time.monotonic() + self.stream_duration
+        while True:
+            events, after = event_bus.get_events(after, curator_id, student_id)
+            for event in events:
+                yield "id: {}\nevent: {}\ndata: {}\n\n".format(event_bus.get_id(event), event.kind,
+                                                              encoder.encode(event.data))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not event_bus.wait(after, min(self.keepalive, remaining)):
+                yield ": keepalive\n\n"
+
+    def get_event_stream_response(self, request, curator_id: int = None, student_id: int = None):
+        if not stream_slots.acquire():
+            response = Response({'error': 'Too many event streams, retry later.'},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = max(EVENTS_RETRY // 1000, 1)
+            return response
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID', request.query_params.get('last_event_id'))
+        after = event_bus.sequence if last_event_id is None else event_bus.parse_id(last_event_id)
+        response = StreamingHttpResponse(EventStream(self.get_event_stream(after, curator_id, student_id)),
+                                         content_type=EventStreamRenderer.media_type, status=status.HTTP_200_OK)
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'    # nginx/proxy must not buffer stream
+        return response
@@ -0,0 +1,30 @@
+from django.http import StreamingHttpResponse
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+
+from ..authentication.token import CachedTokenAuthentication
+
+from ..utils.export import export_lines, parse_watermark
+
+
+class DatasetExport(APIView):
+    """
+    Streams dataset as NDJSON (staff only)
+    Mention: 'since' - watermark of previous export (last line), only rows changed (or deleted) after it are exported.
+    Mention: 'since' - watermark of previous export (last line), only rows changed after it are exported.
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get(self, request, format=None):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_watermark(since)
+            except ValueError as error:
+                return Response({'since': [str(error)]}, status=status.HTTP_400_BAD_REQUEST)
+        return StreamingHttpResponse(export_lines(since), content_type='application/x-ndjson',
+                                     status=status.HTTP_200_OK)
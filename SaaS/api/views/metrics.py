@@ -0,0 +1,41 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+
+from ..authentication.token import CachedTokenAuthentication, token_cache
+from ..middleware.connections import connection_statistics
+from ..middleware.timing import slow_requests
+
+
+class ConnectionMetrics(APIView):
+    """
+    Database connection statistics of the worker serving request (staff only)
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get(self, request, format=None):
+        return Response(connection_statistics.snapshot(), status=status.HTTP_200_OK)
+
+
+class TokenCacheMetrics(APIView):
+    """
+    Hit/miss counters of token cache of the worker serving request (staff only)
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get(self, request, format=None):
+        return Response(token_cache.stats(), status=status.HTTP_200_OK)
+
+
+class SlowRequestMetrics(APIView):
+    """
+    The slowest requests served by the worker serving request, with their SQL (staff only)
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated, IsAdminUser,)
+
+    def get(self, request, format=None):
+        return Response(slow_requests.snapshot(), status=status.HTTP_200_OK)
@@ -0,0 +1,109 @@
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+from ..models.theme import Theme
+from ..models.work import WorkStepComment
+from ..models.suggestion import SuggestionThemeComment
+
+from ..serializers.theme import ThemeSerializerRelatedIntermediate
+from ..serializers.work import WorkStepCommentSerializer
+from ..serializers.suggestion import SuggestionThemeCommentSerializer
+
+from ..authentication.token import CachedTokenAuthentication
+from ..permissions.group_curators import IsMemberOfCuratorsGroup
+
+from ..utils import search
+
+from .selection import FieldSelectionMixin
+
+SEARCH_LIMIT = 20
+SEARCH_LIMIT_MAX = 100
+
+
+class SearchBaseView(FieldSelectionMixin, GenericAPIView):
+    """
+    Search base view
+
+    Mention: 'q' - search query, 'limit' - maximal number of results (ordered by relevance).
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
+
+    def get_search_params(self, request):
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', SEARCH_LIMIT)), 1), SEARCH_LIMIT_MAX)
+        except ValueError:
+            limit = SEARCH_LIMIT
+        return query, limit
+
+    def get_results_response(self, results: list, entries: dict, serializer_classes: dict) -> Response:
+        """
+        Results of entries deleted while searching are skipped
+        """
+        serializers = {kind: self.get_read_serializer(serializer_class) for kind, serializer_class in serializer_classes.items()}
+        data = []
+        for result in results:
+            entry = entries.get((result.kind, result.object_id))
+            if entry is None:
+                continue
+            data.append({
+                'kind': result.kind,
+                'rank': result.rank,
+                'snippet': result.snippet,
+                'entry': serializers[result.kind].to_representation(entry),
+            })
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ThemeSearch(SearchBaseView):
+    """
+    get:
+    READ - Themes matching query 'q' (title, description) ordered by relevance, with highlighted snippets.
+    """
+    def get(self, request):
+        query, limit = self.get_search_params(request)
+        if not query:
+            return Response({'error': "Please provide query 'q'"}, status=status.HTTP_400_BAD_REQUEST)
+        if not search.is_supported():
+            return Response({'error': "Full-text search is not supported by database"}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        results = search.search(query, (search.KIND_THEME, ), limit)
+        themes = Theme.objects.filter(pk__in=[result.object_id for result in results])
+        themes = self.get_read_queryset(ThemeSerializerRelatedIntermediate.setup_eager_loading(themes), ThemeSerializerRelatedIntermediate)
+        entries = {(search.KIND_THEME, theme.id): theme for theme in themes}
+        return self.get_results_response(results, entries, {search.KIND_THEME: ThemeSerializerRelatedIntermediate})
+
+
+class CommentSearch(SearchBaseView):
+    """
+    get:
+    READ - Work step and suggestion comments matching query 'q' ordered by relevance, with highlighted snippets.
+    'kind' - optional filter: work_step_comment, suggestion_theme_comment.
+    """
+    models = {
+        search.KIND_WORK_STEP_COMMENT: (WorkStepComment, WorkStepCommentSerializer),
+        search.KIND_SUGGESTION_THEME_COMMENT: (SuggestionThemeComment, SuggestionThemeCommentSerializer),
+    }
+
+    def get(self, request):
+        query, limit = self.get_search_params(request)
+        if not query:
+            return Response({'error': "Please provide query 'q'"}, status=status.HTTP_400_BAD_REQUEST)
+        if not search.is_supported():
+            return Response({'error': "Full-text search is not supported by database"}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        kind = request.query_params.get('kind')
+        if kind is not None and kind not in self.models:
+            return Response({'error': "Unknown kind '{}'".format(kind)}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = (kind, ) if kind else tuple(self.models)
+
+        results = search.search(query, kinds, limit)
+        entries = {}
+        for kind, (model, serializer_class) in self.models.items():
+            object_id = [result.object_id for result in results if result.kind == kind]
+            if object_id:
+                comments = self.get_read_queryset(model.objects.filter(pk__in=object_id), serializer_class)
+                entries.update(((kind, comment.id), comment) for comment in comments)
+        return self.get_results_response(results, entries,
+                                         {kind: serializer_class for kind, (model, serializer_class) in self.models.items()})
@@ -0,0 +1,56 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..serializers.compiled import get_compiled_serializer
+from ..serializers.selection import FieldSelection, select_fields, setup_eager_loading
+
+
+class FieldSelectionMixin:
+    """
+    Sparse fieldsets and on-demand expansion of GET representations
+
+    Mention: 'fields' - comma separated (dotted for nested) fields, 'expand' - relations to embed.
+             Without both params representation is unchanged, with any of them nested relations
+             are represented by primary keys unless expanded, and neither serialized nor joined.
+    """
+    def get_field_selection(self):
+        params = self.request.query_params
+        if self.request.method != 'GET' or ('fields' not in params and 'expand' not in params):
+            return None
+        return FieldSelection.from_params(params.get('fields'), params.get('expand'))
+
+    def get_read_serializer(self, serializer_class, instance=None, many: bool = False):
+        serializer = serializer_class(instance, many=many)
+        selection = self.get_field_selection()
+        return serializer if selection is None else select_fields(serializer, selection)
+
+    def get_read_queryset(self, queryset, serializer_class):
+        selection = self.get_field_selection()
+        if selection is None:
+            return queryset
+        return setup_eager_loading(queryset, select_fields(serializer_class(), selection))
+
+    def get_list_data(self, queryset, serializer_class) -> list:
+        """
+        Representation of whole list, by compiled serializer if it supports serializer fields
+        """
+        compiled = get_compiled_serializer(serializer_class, self.get_field_selection())
+        if compiled is not None:
+            return compiled.serialize(queryset)
+        return self.get_read_serializer(serializer_class, self.get_read_queryset(queryset, serializer_class), many=True).data
+
+    # generic views
+
+    def get_queryset(self):
+        return self.get_read_queryset(super().get_queryset(), self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None and self.paginator.get_page_size(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.get_list_data(queryset, self.get_serializer_class()), status=status.HTTP_200_OK)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        selection = self.get_field_selection()
+        return serializer if selection is None else select_fields(serializer, selection)
@@ -3,20 +3,29 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView, get_object_or_404
-from rest_framework.authentication import TokenAuthentication
 
 from ..models.skill import Skill
 
 from ..serializers.skill import SkillSerializer
 
+from ..authentication.token import CachedTokenAuthentication
 from ..permissions.group_curators import IsMemberOfCuratorsGroup
 
+from ..pagination.cursor import IdCursorPagination
 
-class SkillBaseViewAbstract:
+from ..utils.reference_data import reference_data
+
+from .conditional import ReferenceDataListMixin
+from .selection import FieldSelectionMixin
+
+reference_data.register(Skill, SkillSerializer)
+
+
+class SkillBaseViewAbstract(FieldSelectionMixin):
     """
     Skill base view
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
 
     def get_skill(self, pk):
@@ -27,13 +36,15 @@ class SkillBaseView(SkillBaseViewAbstract, GenericAPIView):
     pass
 
 
-class SkillList(SkillBaseViewAbstract, ListAPIView):
+class SkillList(ReferenceDataListMixin, SkillBaseViewAbstract, ListAPIView):
     """
     get:
     READ - List of skills.
     """
+    reference_model = Skill
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
+    pagination_class = IdCursorPagination
 
 
 class SkillDetail(SkillBaseView):
@@ -43,5 +54,5 @@ class SkillDetail(SkillBaseView):
     """
     def get(self, request, skill_id):
         skill = self.get_skill(skill_id)
-        serializer = SkillSerializer(skill)
+        serializer = self.get_read_serializer(SkillSerializer, skill)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -4,7 +4,8 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import permission_classes
 from rest_framework.generics import ListAPIView, get_object_or_404
-from rest_framework.authentication import TokenAuthentication
+
+from django.db.models import QuerySet
 
 from ..models.theme import Theme
 from ..models.suggestion import SuggestionTheme, SuggestionThemeStatus, SuggestionThemeProgress
@@ -25,28 +26,59 @@ from ..serializers.suggestion import \
     SuggestionThemeProgressSerializer, \
     SuggestionThemeCommentSerializer, SuggestionThemeCommentSerializerNoRelated
 
+from ..authentication.token import CachedTokenAuthentication
 from ..permissions.group_curators import IsMemberOfCuratorsGroup
 
+from ..pagination.cursor import IdCursorPagination, DateCreationCursorPagination, ThreadCursorPagination, \
+    CursorPaginatedListMixin
+
+from ..utils.reference_data import reference_data
+from ..utils.recommendation import theme_skill_index
+
+from .conditional import ReferenceDataListMixin, ConditionalGetMixin
+from .selection import FieldSelectionMixin
+from .events import EventStreamMixin
+from .sync import SyncMixin
+
+reference_data.register(Group, GroupSerializer)
 
-class StudentBaseViewAbstract:
+RECOMMENDATION_LIMIT = 20
+RECOMMENDATION_LIMIT_MAX = 100
+
+
+class StudentBaseViewAbstract(FieldSelectionMixin):
     """
     Student base view
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
 
     def get_student(self, student_id: int) -> Student:
         return get_object_or_404(Student, pk=student_id)
 
     def get_related_work(self, student_id: int, work_id: int) -> Work:
-        return get_object_or_404(Work, theme__student__id=student_id, pk=work_id)
+        return get_object_or_404(Work.objects.select_related('theme'), theme__student__id=student_id, pk=work_id)
+
+    def get_related_works(self, student_id: int) -> QuerySet:
+        works = Work.objects.filter(theme__student_id=student_id).order_by('theme_id', 'id')
+        return WorkSerializerRelatedIntermediate.setup_eager_loading(works)
+
+    def get_related_steps(self, student_id: int, work_id: int) -> QuerySet:
+        steps = WorkStep.objects.filter(work__theme__student_id=student_id, work_id=work_id).order_by('id')
+        return WorkStepSerializer.setup_eager_loading(steps)
 
     def get_related_step(self, student_id: int, work_id: int, step_id: int) -> WorkStep:
         return get_object_or_404(WorkStep, work__theme__student__id=student_id, work_id=work_id, pk=step_id)
 
+    def get_related_themes(self, student_id: int) -> QuerySet:
+        return Theme.objects.filter(student_id=student_id)
+
     def get_related_theme(self, student_id: int, theme_id: int) -> Theme:
         return get_object_or_404(Theme, student__id=student_id, pk=theme_id)
 
+    def get_related_suggestions(self, student_id: int) -> QuerySet:
+        return SuggestionTheme.objects.filter(student_id=student_id)
+
     def get_related_suggestion(self, student_id: int, suggestion_id: int) -> SuggestionTheme:
         return get_object_or_404(SuggestionTheme, student__id=student_id, pk=suggestion_id)
 
@@ -55,18 +87,20 @@ class StudentBaseViewAbstract:
         return get_object_or_404(SuggestionThemeProgress, suggestion=suggestion)
 
 
-class StudentBaseView(StudentBaseViewAbstract, GenericAPIView):
+class StudentBaseView(ConditionalGetMixin, StudentBaseViewAbstract, GenericAPIView):
     pass
 
 
-class StudentGroupList(StudentBaseViewAbstract, ListAPIView):
+class StudentGroupList(ReferenceDataListMixin, StudentBaseViewAbstract, ListAPIView):
     """
     get:
     READ - List of academic groups.
     """
+    reference_model = Group
     permission_classes = (IsAuthenticated, )
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    pagination_class = IdCursorPagination
 
 
 class StudentList(StudentBaseViewAbstract, ListAPIView):
@@ -77,6 +111,7 @@ class StudentList(StudentBaseViewAbstract, ListAPIView):
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup, )   # TODO Change behavior when student app will be developed
     queryset = Student.objects.all()
     serializer_class = StudentSerializerSkillIDGroupIntermediate
+    pagination_class = IdCursorPagination
 
 
 class StudentDetail(StudentBaseView):
@@ -92,7 +127,7 @@ class StudentDetail(StudentBaseView):
     @permission_classes((IsAuthenticated, IsMemberOfCuratorsGroup, ))   # TODO Change behavior when student app will be developed
     def get(self, request, student_id):
         student = self.get_student(student_id)
-        serializer = StudentSerializerRelatedIntermediate(student)
+        serializer = self.get_read_serializer(StudentSerializerRelatedIntermediate, student)
         return Response(serializer.data)
 
     def put(self, request, student_id):
@@ -116,12 +151,11 @@ class StudentSkillList(StudentBaseView):
 
     def get(self, request, student_id):
         student = self.get_student(student_id)
-        serializer = SkillSerializer(student.skills, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(self.get_list_data(student.skills, SkillSerializer), status=status.HTTP_200_OK)
 
 
 # related works
-class StudentWorkList(StudentBaseView):
+class StudentWorkList(CursorPaginatedListMixin, StudentBaseView):
     """
     get:
     READ - List of student instance related works.
@@ -133,13 +167,14 @@ class StudentWorkList(StudentBaseView):
 
     @permission_classes((IsAuthenticated, IsMemberOfCuratorsGroup, )) # TODO Change behavior when student app will be developed
     def get(self, request, student_id):
-        student = self.get_student(student_id)
-        related_works = []
-        for theme in student.theme_set.all():
-            for work in theme.work_set.all():
-                related_works.append(work)
-        serializer = WorkSerializerRelatedIntermediate(related_works, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        works = self.get_related_works(student_id)
+        state = self.get_versioned_state(works, WorkSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_student(student_id)
+            return self.get_list_response(works, WorkSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
 
 class StudentWorkDetail(StudentBaseView):
@@ -154,9 +189,14 @@ class StudentWorkDetail(StudentBaseView):
 
     @permission_classes((IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, work_id):
-        work = self.get_related_work(student_id, work_id)
-        serializer = WorkSerializerRelatedIntermediate(work)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        works = self.get_related_works(student_id).filter(pk=work_id)
+        state = self.get_versioned_state(works, WorkSerializerRelatedIntermediate)
+
+        def get_response():
+            work = get_object_or_404(self.get_read_queryset(works, WorkSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(WorkSerializerRelatedIntermediate, work)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, student_id, work_id):
         work = self.get_related_work(student_id, work_id)
@@ -182,12 +222,14 @@ class StudentWorkStepList(StudentBaseView):
 
     @permission_classes((IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, work_id):
-        work = self.get_related_work(student_id, work_id)
-        related_steps = []
-        for step in work.step_set.all():
-            related_steps.append(step)
-        serializer = WorkStepSerializer(related_steps, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        steps = self.get_related_steps(student_id, work_id)
+        state = self.get_versioned_state(steps, WorkStepSerializer)
+
+        def get_response():
+            if not state.count:
+                self.get_related_work(student_id, work_id)
+            return Response(self.get_list_data(steps, WorkStepSerializer), status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, student_id, work_id):
         work = self.get_related_work(student_id, work_id)
@@ -213,9 +255,14 @@ class StudentWorkStepDetail(StudentBaseView):
 
     @permission_classes((IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, work_id, step_id):
-        step = self.get_related_step(student_id, work_id, step_id)
-        serializer = WorkStepSerializer(step)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        steps = self.get_related_steps(student_id, work_id).filter(pk=step_id)
+        state = self.get_versioned_state(steps, WorkStepSerializer)
+
+        def get_response():
+            step = get_object_or_404(self.get_read_queryset(steps, WorkStepSerializer))
+            serializer = self.get_read_serializer(WorkStepSerializer, step)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, student_id, work_id, step_id):
         step = self.get_related_step(student_id, work_id, step_id)
@@ -243,11 +290,8 @@ class StudentWorkStepMaterialList(StudentBaseView):
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, work_id, step_id):
         step = self.get_related_step(student_id, work_id, step_id)
-        related_materials = []
-        for material in step.material_set.all():
-            related_materials.append(material)
-        serializer = WorkStepMaterialSerializer(related_materials, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        related_materials = step.material_set.order_by('id')
+        return Response(self.get_list_data(related_materials, WorkStepMaterialSerializer), status=status.HTTP_200_OK)
 
     def post(self, request, student_id, work_id, step_id):
         step = self.get_related_step(student_id, work_id, step_id)
@@ -262,7 +306,7 @@ class StudentWorkStepMaterialList(StudentBaseView):
 
 
 # related work-step-comments
-class StudentWorkStepCommentList(StudentBaseView):
+class StudentWorkStepCommentList(CursorPaginatedListMixin, StudentBaseView):
     """
     get:
     READ - Student instance related work step comments.
@@ -271,16 +315,14 @@ class StudentWorkStepCommentList(StudentBaseView):
     CREATE - Student instance related work step comment.
     """
     serializer_class = WorkStepCommentSerializerNoRelated
+    pagination_class = ThreadCursorPagination
 
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, work_id, step_id):
         step = self.get_related_step(student_id, work_id, step_id)
-        related_comments = []
-        for comment in step.comment_set.all():
-            related_comments.append(comment)
-        serializer = WorkStepCommentSerializer(related_comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        related_comments = step.comment_set.order_by('id')
+        return self.get_list_response(related_comments, WorkStepCommentSerializer)
 
     def post(self, request, student_id, work_id, step_id):
         step = self.get_related_step(student_id, work_id, step_id)
@@ -296,7 +338,7 @@ class StudentWorkStepCommentList(StudentBaseView):
 
 
 # related themes
-class StudentThemeList(StudentBaseView):
+class StudentThemeList(CursorPaginatedListMixin, StudentBaseView):
     """
     get:
     READ - Student instance related themes.
@@ -305,13 +347,19 @@ class StudentThemeList(StudentBaseView):
     CREATE - Student instance related theme.
     """
     serializer_class = ThemeSerializerRelatedID
+    pagination_class = DateCreationCursorPagination
 
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id):
-        student = self.get_student(student_id)
-        serializer = ThemeSerializerRelatedIntermediate(student.theme_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        themes = self.get_related_themes(student_id)
+        state = self.get_versioned_state(themes, ThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_student(student_id)
+            return self.get_list_response(themes, ThemeSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, student_id):
         student = self.get_student(student_id)
@@ -325,6 +373,43 @@ class StudentThemeList(StudentBaseView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class StudentThemeRecommendedList(StudentBaseView):
+    """
+    get:
+    READ - Open themes recommended to student instance by skill overlap, best first.
+
+    Mention: 'limit' - maximal number of themes, score is in (0, 1].
+    """
+    @permission_classes(
+        (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
+    def get(self, request, student_id):
+        student = self.get_student(student_id)
+        try:
+            limit = min(max(int(request.query_params.get('limit', RECOMMENDATION_LIMIT)), 1), RECOMMENDATION_LIMIT_MAX)
+        except ValueError:
+            limit = RECOMMENDATION_LIMIT
+        skill_ids = list(student.skills.values_list('id', flat=True))
+        recommended = theme_skill_index.recommend(skill_ids, limit)
+        themes = self.get_open_themes(recommended)
+        if len(themes) < len(recommended):   # taken through another worker, index of this one is stale
+            for theme_id, score in recommended:
+                if theme_id not in themes:
+                    theme_skill_index.set_theme(theme_id, False)
+            recommended = theme_skill_index.recommend(skill_ids, limit)
+            themes = self.get_open_themes(recommended)
+        serializer = self.get_read_serializer(ThemeSerializerRelatedIntermediate)
+        data = [{'score': score, 'theme': serializer.to_representation(themes[theme_id])}
+                for theme_id, score in recommended if theme_id in themes]
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_open_themes(self, recommended: list) -> dict:
+        if not recommended:
+            return {}
+        themes = Theme.objects.filter(pk__in=[theme_id for theme_id, score in recommended], student__isnull=True)
+        themes = self.get_read_queryset(ThemeSerializerRelatedIntermediate.setup_eager_loading(themes), ThemeSerializerRelatedIntermediate)
+        return {theme.id: theme for theme in themes}
+
+
 class StudentThemeDetail(StudentBaseView):
     """
     get:
@@ -338,11 +423,14 @@ class StudentThemeDetail(StudentBaseView):
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, theme_id):
-        theme = self.get_related_theme(student_id, theme_id)
-        if theme:
-            serializer = ThemeSerializerRelatedIntermediate(theme)
+        themes = self.get_related_themes(student_id).filter(pk=theme_id)
+        state = self.get_versioned_state(themes, ThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            theme = get_object_or_404(self.get_read_queryset(themes, ThemeSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(ThemeSerializerRelatedIntermediate, theme)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(status=status.HTTP_404_NOT_FOUND)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, student_id, theme_id):
         theme = self.get_related_theme(student_id, theme_id)
@@ -356,7 +444,7 @@ class StudentThemeDetail(StudentBaseView):
 
 
 # related suggestions
-class StudentSuggestionList(StudentBaseView):
+class StudentSuggestionList(CursorPaginatedListMixin, StudentBaseView):
     """
     get:
     READ - Student instance related suggestions.
@@ -365,13 +453,19 @@ class StudentSuggestionList(StudentBaseView):
     CREATE - Student instance related suggestion.
     """
     serializer_class = SuggestionThemeSerializerRelatedIDNoProgress
+    pagination_class = DateCreationCursorPagination
 
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id):
-        student = self.get_student(student_id)
-        serializer = SuggestionThemeSerializerRelatedIntermediate(student.suggestiontheme_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        suggestions = self.get_related_suggestions(student_id)
+        state = self.get_versioned_state(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            if not state.count:
+                self.get_student(student_id)
+            return self.get_list_response(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+        return self.get_conditional_response(request, state, get_response, last_modified=False)
 
     def post(self, request, student_id):
         student = self.get_student(student_id)
@@ -398,11 +492,14 @@ class StudentSuggestionDetail(StudentBaseView):
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, suggestion_id):
-        suggestion = self.get_related_suggestion(student_id, suggestion_id)
-        if suggestion:
-            serializer = SuggestionThemeSerializerRelatedIntermediate(suggestion)
+        suggestions = self.get_related_suggestions(student_id).filter(pk=suggestion_id)
+        state = self.get_versioned_state(suggestions, SuggestionThemeSerializerRelatedIntermediate)
+
+        def get_response():
+            suggestion = get_object_or_404(self.get_read_queryset(suggestions, SuggestionThemeSerializerRelatedIntermediate))
+            serializer = self.get_read_serializer(SuggestionThemeSerializerRelatedIntermediate, suggestion)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(status=status.HTTP_404_NOT_FOUND)
+        return self.get_conditional_response(request, state, get_response)
 
     def put(self, request, student_id, suggestion_id):
         suggestion = self.get_related_suggestion(student_id, suggestion_id)
@@ -429,7 +526,7 @@ class StudentSuggestionProgressDetail(StudentBaseView):
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, suggestion_id):
         progress = self.get_related_suggestion_progress(student_id, suggestion_id)
-        serializer = SuggestionThemeProgressSerializer(progress)
+        serializer = self.get_read_serializer(SuggestionThemeProgressSerializer, progress)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request, student_id, suggestion_id):
@@ -444,7 +541,7 @@ class StudentSuggestionProgressDetail(StudentBaseView):
 
 
 # related suggestion-comments
-class StudentSuggestionCommentList(StudentBaseView):
+class StudentSuggestionCommentList(CursorPaginatedListMixin, StudentBaseView):
     """
     get:
     READ - Student instance related suggestion comments.
@@ -453,13 +550,13 @@ class StudentSuggestionCommentList(StudentBaseView):
     CREATE - Student instance related suggestion comment.
     """
     serializer_class = SuggestionThemeCommentSerializerNoRelated
+    pagination_class = ThreadCursorPagination
 
     @permission_classes(
         (IsAuthenticated, IsMemberOfCuratorsGroup,))  # TODO Change behavior when student app will be developed
     def get(self, request, student_id, suggestion_id):
         suggestion = self.get_related_suggestion(student_id, suggestion_id)
-        serializer = SuggestionThemeCommentSerializer(suggestion.comment_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_list_response(suggestion.comment_set.order_by('id'), SuggestionThemeCommentSerializer)
 
     def post(self, request, student_id, suggestion_id):
         suggestion = self.get_related_suggestion(student_id, suggestion_id)
@@ -472,3 +569,23 @@ class StudentSuggestionCommentList(StudentBaseView):
             serializer_resp = SuggestionThemeCommentSerializer(comment)
             return Response(serializer_resp.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class StudentEventStream(EventStreamMixin, StudentBaseView):
+    """
+    get:
+    READ - Server-sent events of student instance related suggestions (status changes, progress updates) and comments.
+    """
+    def get(self, request, student_id):
+        self.get_student(student_id)
+        return self.get_event_stream_response(request, student_id=student_id)
+
+
+class StudentSync(SyncMixin, StudentBaseView):
+    """
+    get:
+    READ - Student instance related themes, works, steps, materials, comments and suggestions changed since sync token.
+    """
+    def get(self, request, student_id):
+        self.get_student(student_id)
+        return self.get_sync_response(request, 'student', student_id)
@@ -0,0 +1,28 @@
+from collections import OrderedDict
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..utils.sync import SYNC_KINDS, get_changed, get_deleted, get_token, parse_token
+
+
+class SyncMixin:
+    """
+    Entries created, changed and deleted since token
+
+    Mention: 'since' - token of previous sync, full state is returned without it ('deleted' is empty then).
+             Response token is taken before entries are read, so concurrent changes are returned again next time.
+    """
+    def get_sync_response(self, request, owner: str, owner_id: int) -> Response:
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_token(since)
+            except ValueError:
+                return Response({'since': ["Invalid sync token."]}, status=status.HTTP_400_BAD_REQUEST)
+        data = OrderedDict(token=str(get_token()))
+        for sync_kind in SYNC_KINDS:
+            data[sync_kind.kind] = self.get_list_data(get_changed(sync_kind, owner, owner_id, since),
+                                                      sync_kind.serializer_class)
+        data['deleted'] = get_deleted(owner, owner_id, since) if since is not None else {}
+        return Response(data, status=status.HTTP_200_OK)
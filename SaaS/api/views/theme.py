@@ -3,23 +3,35 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView, get_object_or_404
-from rest_framework.authentication import TokenAuthentication
+
+from django.db import transaction
 
 from ..models.theme import Theme, Subject
 from ..models.suggestion import SuggestionThemeStatus
 
 from ..serializers.theme import ThemeSerializerRelatedID, ThemeSerializerRelatedIntermediate, SubjectSerializer
 from ..serializers.skill import SkillSerializer
-from ..serializers.suggestion import SuggestionThemeStatusSerializer
+from ..serializers.suggestion import SuggestionThemeStatusSerializer, SuggestionThemeAssignSerializer
 
+from ..authentication.token import CachedTokenAuthentication
 from ..permissions.group_curators import IsMemberOfCuratorsGroup
 
+from ..pagination.cursor import IdCursorPagination, DateCreationCursorPagination
+
+from ..utils.reference_data import reference_data
+
+from .conditional import ReferenceDataListMixin
+from .selection import FieldSelectionMixin
 
-class ThemeBaseViewAbstract:
+reference_data.register(Subject, SubjectSerializer)
+reference_data.register(SuggestionThemeStatus, SuggestionThemeStatusSerializer)
+
+
+class ThemeBaseViewAbstract(FieldSelectionMixin):
     """
     Theme base view
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
 
     def get_theme(self, pk):
@@ -37,6 +49,7 @@ class ThemeList(ThemeBaseViewAbstract, ListAPIView):
     """
     queryset = Theme.objects.all()
     serializer_class = ThemeSerializerRelatedIntermediate
+    pagination_class = DateCreationCursorPagination
 
 
 class ThemeDetail(ThemeBaseView):
@@ -46,7 +59,7 @@ class ThemeDetail(ThemeBaseView):
     """
     def get(self, request, theme_id):
         theme = self.get_theme(theme_id)
-        serializer = ThemeSerializerRelatedIntermediate(theme)
+        serializer = self.get_read_serializer(ThemeSerializerRelatedIntermediate, theme)
         return Response(serializer.data)
 
 
@@ -58,17 +71,18 @@ class ThemeSkillList(ThemeBaseView):
     """
     def get(self, request, theme_id):
         theme = self.get_theme(theme_id)
-        serializer = SkillSerializer(theme.skills, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(self.get_list_data(theme.skills, SkillSerializer), status=status.HTTP_200_OK)
 
 
-class SubjectList(ThemeBaseView, ListAPIView):
+class SubjectList(ReferenceDataListMixin, ThemeBaseView, ListAPIView):
     """
     get:
     READ - Theme subjects list.
     """
+    reference_model = Subject
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
+    pagination_class = IdCursorPagination
 
 
 class SubjectDetail(ThemeBaseView):
@@ -78,17 +92,38 @@ class SubjectDetail(ThemeBaseView):
     """
     def get(self, request, subject_id):
         subject = get_object_or_404(Subject, pk=subject_id)
-        serializer = SubjectSerializer(subject)
+        serializer = self.get_read_serializer(SubjectSerializer, subject)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ThemeSuggestionStatusList(ThemeBaseView):
+class ThemeSuggestionStatusList(ReferenceDataListMixin, ThemeBaseView):
     """
     get:
     READ - List of theme suggestion statuses.
     """
+    reference_model = SuggestionThemeStatus
 
-    def get(self, request):
-        statuses = SuggestionThemeStatus.objects.all()
-        serializer = SuggestionThemeStatusSerializer(statuses, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class ThemeSuggestionAssign(ThemeBaseView):
+    """
+    post:
+    CREATE - Suggestions (WAITING_STUDENT) of open themes to students, best-fit by skill overlap.
+
+    Mention: Each student gets at most one theme, each theme - at most one student,
+             'capacities' limits themes per curator. 'dry_run' only returns proposed pairs.
+             Themes taken while matching was solved make request fail (400), it can be repeated.
+    """
+    serializer_class = SuggestionThemeAssignSerializer
+
+    def post(self, request):
+        serializer = SuggestionThemeAssignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        assignments = serializer.get_assignments()      # before themes are locked
+        if serializer.validated_data['dry_run']:
+            response_status = status.HTTP_200_OK
+        else:
+            with transaction.atomic():
+                serializer.save(assignments=assignments)
+            response_status = status.HTTP_201_CREATED
+        return Response([assignment._asdict() for assignment in assignments], status=response_status)
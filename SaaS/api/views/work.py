@@ -3,7 +3,6 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView, get_object_or_404
-from rest_framework.authentication import TokenAuthentication
 
 from ..models.work import Work, WorkStep, WorkStepStatus
 
@@ -11,14 +10,24 @@ from ..serializers.work import WorkSerializerRelatedID, WorkSerializerRelatedInt
     WorkStepSerializer, WorkStepMaterialSerializer, \
     WorkStepStatusSerializer
 
+from ..authentication.token import CachedTokenAuthentication
 from ..permissions.group_curators import IsMemberOfCuratorsGroup
 
+from ..pagination.cursor import IdCursorPagination
 
-class WorkBaseViewAbstract:
+from ..utils.reference_data import reference_data
+
+from .conditional import ReferenceDataListMixin
+from .selection import FieldSelectionMixin
+
+reference_data.register(WorkStepStatus, WorkStepStatusSerializer)
+
+
+class WorkBaseViewAbstract(FieldSelectionMixin):
     """
     Work base view
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsMemberOfCuratorsGroup,)  # TODO Change behavior when student app will be developed
 
     def get_work(self, pk):
@@ -37,8 +46,9 @@ class WorkList(WorkBaseViewAbstract, ListAPIView):
     get:
     READ - List of works.
     """
-    queryset = Work.objects.all()
+    queryset = WorkSerializerRelatedIntermediate.setup_eager_loading(Work.objects.order_by('id'))
     serializer_class = WorkSerializerRelatedIntermediate
+    pagination_class = IdCursorPagination
 
 
 class WorkDetail(WorkBaseView):
@@ -48,7 +58,7 @@ class WorkDetail(WorkBaseView):
     """
     def get(self, request, work_id):
         work = self.get_work(work_id)
-        serializer = WorkSerializerRelatedIntermediate(work)
+        serializer = self.get_read_serializer(WorkSerializerRelatedIntermediate, work)
         return Response(serializer.data)
 
 
@@ -60,8 +70,8 @@ class WorkStepList(WorkBaseView):
     """
     def get(self, request, work_id):
         work = self.get_work(work_id)
-        serializer = WorkStepSerializer(work.step_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        steps = WorkStepSerializer.setup_eager_loading(work.step_set.order_by('id'))
+        return Response(self.get_list_data(steps, WorkStepSerializer), status=status.HTTP_200_OK)
 
 
 class WorkStepDetail(WorkBaseView):
@@ -72,7 +82,7 @@ class WorkStepDetail(WorkBaseView):
     def get(self, request, work_id, step_id):
         work = self.get_work(work_id)
         step = self.get_related_step(work, step_id)
-        serializer = WorkStepSerializer(step)
+        serializer = self.get_read_serializer(WorkStepSerializer, step)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -85,16 +95,12 @@ class WorkStepMaterialList(WorkBaseView):
     def get(self, request, work_id, step_id):
         work = self.get_work(work_id)
         step = self.get_related_step(work, step_id)
-        serializer = WorkStepMaterialSerializer(step.material_set, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(self.get_list_data(step.material_set, WorkStepMaterialSerializer), status=status.HTTP_200_OK)
 
 
-class WorkStepStatusList(WorkBaseView):
+class WorkStepStatusList(ReferenceDataListMixin, WorkBaseView):
     """"
     get:
     READ - List of work step statuses.
     """
-    def get(self, request):
-        statuses = WorkStepStatus.objects.all()
-        serializer = WorkStepStatusSerializer(statuses, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    reference_model = WorkStepStatus